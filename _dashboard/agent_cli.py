@@ -9,7 +9,21 @@ Supports projects, tasks, comments, and full CRUD operations.
 import requests
 import sys
 import os
+import gzip
+import importlib.util
+import json
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import islice
+
+from mc_stream import iter_response_array
+
+try:
+    import fcntl
+except ImportError:  # Windows: the journal still works, without cross-process locking
+    fcntl = None
 
 # Get Convex URL from environment or use default
 BASE_URL = os.getenv("CONVEX_URL", "https://your-deployment.convex.cloud")
@@ -20,6 +34,29 @@ API_KEY = os.getenv("API_KEY", "")
 # For POC: Hardcoded demo user ID (get from Convex dashboard after setup)
 DEMO_USER_ID = os.getenv("DEMO_USER_ID", "")
 
+# Records fetched per request by list commands
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "100"))
+
+# Output formats for read commands ("text" is the human-readable default)
+OUTPUT_FORMATS = ("text", "json", "ndjson", "tsv")
+
+# Write-behind journal for mutations: "always" journals every create/update/comment
+# without touching the network, "fallback" only when the deployment is unreachable
+QUEUE_MODE = os.getenv("MC_QUEUE", "")
+QUEUE_DIR = os.path.expanduser(os.getenv("MC_QUEUE_DIR", "~/.mission-control"))
+QUEUE_BATCH_SIZE = int(os.getenv("MC_QUEUE_BATCH_SIZE", "50"))
+
+# Request timeout (seconds) for mutations in fallback mode
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "10"))
+
+# Prefix for task ids handed out before a queued create reaches the server
+LOCAL_ID_PREFIX = "local_"
+
+PROJECT_COLUMNS = ["_id", "name", "description", "color", "taskCount", "createdBy", "createdAt", "updatedAt"]
+COMMENT_COLUMNS = ["_id", "task", "author", "content", "createdAt"]
+RULE_COLUMNS = ["_id", "name", "kind", "thresholdDays", "enabled", "lastRunAt"]
+TASK_COLUMNS = ["_id", "title", "status", "priority", "project", "assignedTo", "dueDate", "createdAt", "updatedAt"]
+
 def get_headers():
     """Get headers with API key if available."""
     headers = {"Content-Type": "application/json"}
@@ -29,17 +66,92 @@ def get_headers():
 
     return headers
 
+
+def iter_cursor_pages(path, params=None):
+    """Yield (page, next_cursor) pairs from a list endpoint; next_cursor is None on the last page.
+
+    Each page is an iterator that decodes records from the response stream as
+    they arrive; consume it fully before asking for the next page.
+    Deployments without pagination support return everything as a single page.
+    """
+    params = {"limit": PAGE_SIZE, **(params or {})}
+
+    while True:
+        response = requests.get(f"{BASE_URL}{path}", params=params, headers=get_headers(), stream=True)
+
+        if response.status_code != 200:
+            print(f"❌ Error: {response.text}", file=sys.stderr)
+            sys.exit(1)
+
+        done = response.headers.get("X-Is-Done", "true") == "true"
+        next_cursor = None if done else response.headers["X-Continue-Cursor"]
+
+        yield iter_response_array(response), next_cursor
+
+        if done:
+            return
+        params["cursor"] = next_cursor
+
+
+def iter_pages(path, params=None):
+    """Yield pages of records from a list endpoint, following the pagination cursor."""
+    for page, _ in iter_cursor_pages(path, params):
+        yield page
+
+
+def tsv_value(value):
+    """Flatten a field value into a single TSV cell."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        value = value.get("name", value.get("_id", ""))
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def emit_records(pages, fmt, columns):
+    """Write records to stdout in a machine-readable format as each page arrives.
+
+    Nothing is buffered beyond the current page, so consumers such as jq can
+    start on the first record while later pages are still being fetched.
+    """
+    out = sys.stdout
+
+    try:
+        if fmt == "json":
+            first = True
+            out.write("[")
+            for page in pages:
+                for record in page:
+                    out.write(("\n" if first else ",\n") + json.dumps(record, ensure_ascii=False))
+                    first = False
+                out.flush()
+            out.write("\n]\n" if not first else "]\n")
+        elif fmt == "ndjson":
+            for page in pages:
+                out.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in page)
+                out.flush()
+        elif fmt == "tsv":
+            out.write("\t".join(columns) + "\n")
+            for page in pages:
+                out.writelines("\t".join(tsv_value(record.get(c)) for c in columns) + "\n" for record in page)
+                out.flush()
+        out.flush()
+    except BrokenPipeError:
+        # Downstream consumer (e.g. `head`) closed the pipe early
+        os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+        sys.exit(0)
+
 # ============ PROJECTS ============
 
-def list_projects():
+def list_projects(fmt="text"):
     """List all projects."""
-    response = requests.get(f"{BASE_URL}/api/projects", headers=get_headers())
+    pages = iter_pages("/api/projects")
 
-    if response.status_code != 200:
-        print(f"❌ Error: {response.text}")
+    if fmt != "text":
+        emit_records(pages, fmt, PROJECT_COLUMNS)
         return
 
-    projects = response.json()
+    projects = [project for page in pages for project in page]
 
     if not projects:
         print("📁 No projects found")
@@ -79,18 +191,29 @@ def create_project(name, description, color="#3B82F6"):
         print(f"❌ Error: {response.text}")
 
 
-def get_project(project_id):
+def get_project(project_id, fmt="text"):
     """Get project details."""
     response = requests.get(f"{BASE_URL}/api/projects/{project_id}", headers=get_headers())
 
+    # Keep stdout clean for machine-readable formats
+    err = sys.stdout if fmt == "text" else sys.stderr
+
     if response.status_code == 404:
-        print(f"❌ Project not found")
+        print(f"❌ Project not found", file=err)
         return
     elif response.status_code != 200:
-        print(f"❌ Error: {response.text}")
+        print(f"❌ Error: {response.text}", file=err)
         return
 
     project = response.json()
+
+    if fmt == "json":
+        print(json.dumps(project, ensure_ascii=False, indent=2))
+        return
+    elif fmt != "text":
+        emit_records([[project]], fmt, PROJECT_COLUMNS)
+        return
+
     print(f"\n📂 {project['name']}")
     print(f"{'=' * 60}")
     print(f"Description: {project['description']}")
@@ -101,19 +224,21 @@ def get_project(project_id):
 
 # ============ TASKS ============
 
-def list_tasks(project_id=None):
-    """List all tasks, optionally filtered by project."""
-    url = f"{BASE_URL}/api/tasks"
+def list_tasks(project_id=None, fmt="text", include_archived=False):
+    """List all tasks, optionally filtered by project and including archived ones."""
+    params = {}
     if project_id:
-        url += f"?projectId={project_id}"
+        params["projectId"] = project_id
+    if include_archived:
+        params["includeArchived"] = "true"
 
-    response = requests.get(url, headers=get_headers())
+    pages = iter_pages("/api/tasks", params)
 
-    if response.status_code != 200:
-        print(f"❌ Error: {response.text}")
+    if fmt != "text":
+        emit_records(pages, fmt, TASK_COLUMNS)
         return
 
-    tasks = response.json()
+    tasks = [task for page in pages for task in page]
 
     if not tasks:
         print("📋 No tasks found")
@@ -122,6 +247,7 @@ def list_tasks(project_id=None):
     print(f"📋 Found {len(tasks)} tasks:\n")
 
     status_emoji = {"todo": "⏳", "in_progress": "🔄", "done": "✅"}
+    archived_emoji = "🗄️"
 
     # Group by project if not filtering
     if not project_id:
@@ -136,7 +262,7 @@ def list_tasks(project_id=None):
             print(f"\n📁 {proj_name} ({len(proj_tasks)} tasks)")
             print("─" * 60)
             for task in proj_tasks:
-                emoji = status_emoji.get(task["status"], "📌")
+                emoji = archived_emoji if task.get("archived") else status_emoji.get(task["status"], "📌")
                 priority = task["priority"].upper()
                 assignee = ""
 
@@ -150,7 +276,7 @@ def list_tasks(project_id=None):
                 print()
     else:
         for task in tasks:
-            emoji = status_emoji.get(task["status"], "📌")
+            emoji = archived_emoji if task.get("archived") else status_emoji.get(task["status"], "📌")
             priority = task["priority"].upper()
             assignee = ""
 
@@ -165,6 +291,58 @@ def list_tasks(project_id=None):
             print()
 
 
+def take_records(pages, limit):
+    """Stop paging once `limit` records have been passed through."""
+    for page in pages:
+        if limit <= 0:
+            return
+        records = list(islice(page, limit))
+        limit -= len(records)
+        yield records
+
+
+def search_tasks(query, status=None, project_id=None, comments=False, limit=20, fmt="text"):
+    """Full-text search over tasks (title/description) or comments."""
+    params = {"q": query, "limit": min(limit, PAGE_SIZE)}
+    if comments:
+        params["scope"] = "comments"
+    if status:
+        params["status"] = status
+    if project_id:
+        params["projectId"] = project_id
+
+    pages = take_records(iter_pages("/api/search", params), limit)
+
+    if fmt != "text":
+        emit_records(pages, fmt, COMMENT_COLUMNS if comments else TASK_COLUMNS)
+        return
+
+    results = [record for page in pages for record in page]
+
+    if not results:
+        print(f"🔍 No matches for '{query}'")
+        return
+
+    print(f"🔍 {len(results)} matches for '{query}':\n")
+
+    status_emoji = {"todo": "⏳", "in_progress": "🔄", "done": "✅"}
+
+    for record in results:
+        if comments:
+            task = record.get("task") or {}
+            author = record["author"]["name"] if record.get("author") else "Unknown"
+            print(f"💬 {author} on {status_emoji.get(task.get('status'), '📌')} {task.get('title', 'Deleted task')}")
+            print(f"   {record['content'][:80]}")
+            print(f"   Task ID: {record['taskId']}")
+        else:
+            emoji = status_emoji.get(record["status"], "📌")
+            project = f" | 📁 {record['project']['name']}" if record.get("project") else ""
+            print(f"{emoji} [{record['priority'].upper()}] {record['title']}")
+            print(f"   Status: {record['status']}{project}")
+            print(f"   ID: {record['_id']}")
+        print()
+
+
 def create_task(title, description, priority="medium", project_id=None, assignee=None):
     """Create a new task."""
     if not DEMO_USER_ID:
@@ -184,9 +362,14 @@ def create_task(title, description, priority="medium", project_id=None, assignee
     if assignee:
         payload["assignedTo"] = assignee
 
-    response = requests.post(f"{BASE_URL}/api/tasks", json=payload, headers=get_headers())
+    entry = {"op": "create_task", "ref": LOCAL_ID_PREFIX + uuid.uuid4().hex[:16], "args": payload}
+    response = send_mutation("POST", "/api/tasks", entry)
 
-    if response.status_code == 201:
+    if response is None:
+        print(f"📥 Task queued (sync with: queue flush)")
+        print(f"   Task ID: {entry['ref']}")
+        print(f"   Title: {title}")
+    elif response.status_code == 201:
         result = response.json()
         print(f"✅ Task created successfully!")
         print(f"   Task ID: {result['taskId']}")
@@ -203,9 +386,13 @@ def update_task_status(task_id, status):
         print(f"❌ Invalid status. Use: todo, in_progress, or done")
         return
 
-    response = requests.patch(f"{BASE_URL}/api/tasks/{task_id}", json={"status": status}, headers=get_headers())
+    task_id = resolve_task_id(task_id)
+    entry = {"op": "update_task", "taskId": task_id, "args": {"status": status}}
+    response = send_mutation("PATCH", f"/api/tasks/{task_id}", entry)
 
-    if response.ok:
+    if response is None:
+        print(f"📥 Task update to '{status}' queued")
+    elif response.ok:
         print(f"✅ Task updated to '{status}'")
     else:
         print(f"❌ Error: {response.text}")
@@ -213,9 +400,13 @@ def update_task_status(task_id, status):
 
 def move_task_to_project(task_id, project_id):
     """Move a task to a different project."""
-    response = requests.patch(f"{BASE_URL}/api/tasks/{task_id}", json={"projectId": project_id}, headers=get_headers())
+    task_id = resolve_task_id(task_id)
+    entry = {"op": "update_task", "taskId": task_id, "args": {"projectId": project_id}}
+    response = send_mutation("PATCH", f"/api/tasks/{task_id}", entry)
 
-    if response.ok:
+    if response is None:
+        print(f"📥 Task move queued")
+    elif response.ok:
         print(f"✅ Task moved to project")
     else:
         print(f"❌ Error: {response.text}")
@@ -232,32 +423,95 @@ def add_comment(task_id, content):
         "authorId": DEMO_USER_ID,
     }
 
-    response = requests.post(f"{BASE_URL}/api/tasks/{task_id}/comments", json=payload, headers=get_headers())
+    task_id = resolve_task_id(task_id)
+    entry = {"op": "add_comment", "taskId": task_id, "args": payload}
+    response = send_mutation("POST", f"/api/tasks/{task_id}/comments", entry)
 
-    if response.status_code == 201:
+    if response is None:
+        print(f"📥 Comment queued")
+    elif response.status_code == 201:
         print(f"✅ Comment added successfully!")
     else:
         print(f"❌ Error: {response.text}")
 
 
-def get_task(task_id):
+def claim_task(project_id=None, priority=None, fmt="text"):
+    """Claim the next todo task for this agent and mark it in progress.
+
+    Returns the claimed task, or None when there is nothing left to claim.
+    Exits with status 1 when the request fails, so a caller polling for work
+    can tell an empty queue from an error.
+    """
+    payload = {}
+    if project_id:
+        payload["projectId"] = project_id
+    if priority:
+        payload["priority"] = priority
+
+    # Keep stdout clean for machine-readable formats
+    err = sys.stdout if fmt == "text" else sys.stderr
+
+    try:
+        response = requests.post(f"{BASE_URL}/api/tasks/claim", headers=get_headers(), json=payload, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"❌ Error: could not reach {BASE_URL}: {e}", file=err)
+        sys.exit(1)
+
+    if response.status_code == 204:
+        print(f"📭 No todo tasks to claim", file=err)
+        return None
+    elif response.status_code != 200:
+        print(f"❌ Error: {response.text}", file=err)
+        sys.exit(1)
+
+    task = response.json()
+
+    if fmt == "json":
+        print(json.dumps(task, ensure_ascii=False, indent=2))
+    elif fmt != "text":
+        emit_records([[task]], fmt, TASK_COLUMNS)
+    else:
+        print(f"✅ Claimed [{task['priority'].upper()}] {task['title']}")
+        print(f"   ID: {task['_id']}")
+        if task.get("project"):
+            print(f"   Project: {task['project']['name']}")
+
+    return task
+
+
+def get_task(task_id, fmt="text"):
     """Get detailed information about a task."""
+    task_id = resolve_task_id(task_id)
     response = requests.get(f"{BASE_URL}/api/tasks/{task_id}", headers=get_headers())
 
+    # Keep stdout clean for machine-readable formats
+    err = sys.stdout if fmt == "text" else sys.stderr
+
     if response.status_code == 404:
-        print(f"❌ Task not found")
+        print(f"❌ Task not found", file=err)
         return
     elif response.status_code != 200:
-        print(f"❌ Error: {response.text}")
+        print(f"❌ Error: {response.text}", file=err)
         return
 
     task = response.json()
 
+    if fmt == "json":
+        print(json.dumps(task, ensure_ascii=False, indent=2))
+        return
+    elif fmt != "text":
+        emit_records([[task]], fmt, TASK_COLUMNS)
+        return
+
     print(f"\n📌 {task['title']}")
     print(f"{'=' * 60}")
     print(f"Status: {task['status']}")
     print(f"Priority: {task['priority']}")
 
+    if task.get("archived"):
+        archived_at = datetime.fromtimestamp(task["archivedAt"] / 1000).strftime("%Y-%m-%d")
+        print(f"Archived: {archived_at}")
+
     if task.get('project'):
         print(f"Project: {task['project']['name']}")
 
@@ -276,6 +530,531 @@ def get_task(task_id):
             print(f"  {comment['content']}")
     print()
 
+# ============ RULES ============
+
+RULE_KINDS = ("overdue", "stale_in_progress", "unstarted_high_priority")
+
+
+def list_rules(fmt="text"):
+    """List reminder rules."""
+    response = requests.get(f"{BASE_URL}/api/rules", headers=get_headers())
+
+    if response.status_code != 200:
+        print(f"❌ Error: {response.text}", file=sys.stdout if fmt == "text" else sys.stderr)
+        return
+
+    rules = response.json()
+
+    if fmt != "text":
+        emit_records([rules], fmt, RULE_COLUMNS)
+        return
+
+    if not rules:
+        print("📏 No rules found")
+        return
+
+    print(f"📏 Found {len(rules)} rules:\n")
+
+    for rule in rules:
+        state = "✅ enabled" if rule["enabled"] else "⏸️  disabled"
+        last_run = (
+            datetime.fromtimestamp(rule["lastRunAt"] / 1000).strftime("%Y-%m-%d %H:%M")
+            if rule.get("lastRunAt") else "never"
+        )
+        print(f"{rule['name']} ({rule['kind']}, {rule['thresholdDays']} days)")
+        print(f"   {state} | Last run: {last_run}")
+        print(f"   ID: {rule['_id']}")
+        print()
+
+
+def create_rule(kind, threshold_days=None, name=None):
+    """Create a reminder rule evaluated by the server's cron."""
+    if kind not in RULE_KINDS:
+        print(f"❌ Invalid rule kind. Use: {', '.join(RULE_KINDS)}")
+        return
+
+    payload = {"kind": kind}
+    if threshold_days is not None:
+        payload["thresholdDays"] = threshold_days
+    if name:
+        payload["name"] = name
+
+    response = requests.post(f"{BASE_URL}/api/rules", headers=get_headers(), json=payload)
+
+    if response.status_code == 201:
+        print(f"✅ Rule created: {kind}")
+        print(f"   ID: {response.json()['ruleId']}")
+    else:
+        print(f"❌ Error: {response.text}")
+
+
+def update_rule(rule_id, threshold_days=None, name=None, enabled=None):
+    """Change a rule's threshold, name or enabled state."""
+    payload = {}
+    if threshold_days is not None:
+        payload["thresholdDays"] = threshold_days
+    if name:
+        payload["name"] = name
+    if enabled is not None:
+        payload["enabled"] = enabled
+
+    response = requests.patch(f"{BASE_URL}/api/rules/{rule_id}", headers=get_headers(), json=payload)
+
+    if response.ok:
+        print(f"✅ Rule updated")
+    else:
+        print(f"❌ Error: {response.text}")
+
+
+def delete_rule(rule_id):
+    """Delete a rule and its reminder history."""
+    response = requests.delete(f"{BASE_URL}/api/rules/{rule_id}", headers=get_headers())
+
+    if response.ok:
+        print(f"✅ Rule deleted")
+    else:
+        print(f"❌ Error: {response.text}")
+
+
+def run_rules(rule_id=None):
+    """Run one rule, or all enabled rules, now instead of waiting for the cron."""
+    payload = {"ruleId": rule_id} if rule_id else {}
+    response = requests.post(f"{BASE_URL}/api/rules/run", headers=get_headers(), json=payload)
+
+    if response.ok:
+        print(f"✅ Scheduled {response.json()['scheduled']} rule run(s)")
+    else:
+        print(f"❌ Error: {response.text}")
+
+# ============ EXPORT ============
+
+EXPORT_TABLES = ("users", "projects", "tasks", "comments", "archivedTasks", "archivedComments")
+
+# Rows buffered per Parquet part file
+PARQUET_PART_ROWS = 50000
+
+# Fields of each exported table ("string" or "number"), mirroring convex/schema.ts.
+# Optional fields are listed too, so every Parquet part has every column even
+# when its first rows lack them, and all parts of a table share one schema.
+TASK_FIELDS = {
+    "title": "string", "description": "string", "status": "string", "priority": "string",
+    "projectId": "string", "dueDate": "number", "assignedTo": "string", "createdBy": "string",
+    "createdAt": "number", "updatedAt": "number", "searchText": "string",
+}
+COMMENT_FIELDS = {"taskId": "string", "authorId": "string", "content": "string", "createdAt": "number"}
+EXPORT_FIELDS = {
+    "users": {
+        "name": "string", "type": "string", "email": "string", "authId": "string",
+        "rosterKey": "string", "createdAt": "number",
+    },
+    "projects": {
+        "name": "string", "description": "string", "color": "string", "createdBy": "string",
+        "createdAt": "number", "updatedAt": "number",
+    },
+    "tasks": TASK_FIELDS,
+    "comments": {**COMMENT_FIELDS, "taskStatus": "string", "projectId": "string"},
+    "archivedTasks": {"taskId": "string", **TASK_FIELDS, "archivedAt": "number"},
+    "archivedComments": {"commentId": "string", **COMMENT_FIELDS, "archivedAt": "number"},
+}
+
+
+def export_table_jsonl(table, out_dir, state, save):
+    """Append a table to <table>.jsonl.gz, one gzip member per page.
+
+    The checkpoint records the file size after each page, so a resumed export
+    first truncates any partially written page.
+    """
+    path = os.path.join(out_dir, f"{table}.jsonl.gz")
+    params = {"table": table, "limit": 500}
+    if state["cursor"]:
+        params["cursor"] = state["cursor"]
+
+    with open(path, "ab") as raw:
+        raw.truncate(state["bytes"])
+        raw.seek(state["bytes"])
+
+        for page, next_cursor in iter_cursor_pages("/api/export", params):
+            count = 0
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9) as member:
+                for record in page:
+                    member.write(json.dumps(record, ensure_ascii=False).encode() + b"\n")
+                    count += 1
+            raw.flush()
+            os.fsync(raw.fileno())
+
+            state.update(cursor=next_cursor, records=state["records"] + count, bytes=raw.tell(), done=next_cursor is None)
+            save()
+            print(f"   {table}: {state['records']} records", end="\r", flush=True)
+
+
+def parquet_table(table, rows):
+    """Build an Arrow table for rows of an exported table with its full, fixed schema.
+
+    Fields missing from EXPORT_FIELDS (added to convex/schema.ts since) are
+    kept, with their type inferred from every row rather than the first.
+    """
+    import pyarrow as pa
+
+    types = {"string": pa.string(), "number": pa.float64()}
+    columns = {"_id": "string", "_creationTime": "number", **EXPORT_FIELDS.get(table, {})}
+    fields = [pa.field(name, types[kind]) for name, kind in columns.items()]
+
+    extra = sorted({key for row in rows for key in row} - columns.keys())
+    fields += [pa.field(name, pa.array([row.get(name) for row in rows]).type) for name in extra]
+
+    return pa.Table.from_pylist(rows, schema=pa.schema(fields))
+
+
+def export_table_parquet(table, out_dir, state, save):
+    """Write a table as numbered Parquet part files under <table>/."""
+    import pyarrow.parquet as pq
+
+    table_dir = os.path.join(out_dir, table)
+    os.makedirs(table_dir, exist_ok=True)
+
+    params = {"table": table, "limit": 500}
+    if state["cursor"]:
+        params["cursor"] = state["cursor"]
+
+    rows = []
+    for page, next_cursor in iter_cursor_pages("/api/export", params):
+        rows.extend(page)
+
+        # The checkpoint only advances when a part is on disk; buffered rows are
+        # simply fetched again after an interruption
+        if len(rows) >= PARQUET_PART_ROWS or next_cursor is None:
+            if rows:
+                part = os.path.join(table_dir, f"part-{state['parts']:05d}.parquet")
+                pq.write_table(parquet_table(table, rows), part, compression="zstd")
+                state["parts"] += 1
+            state.update(cursor=next_cursor, records=state["records"] + len(rows), done=next_cursor is None)
+            save()
+            rows = []
+            print(f"   {table}: {state['records']} records", end="\r", flush=True)
+
+
+def export_data(out_dir=None, fmt="jsonl", tables=EXPORT_TABLES):
+    """Stream every table to compressed files in out_dir, resumable via checkpoint.json."""
+    if fmt == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        print("⚠️  pyarrow not installed, falling back to jsonl (pip install pyarrow)")
+        fmt = "jsonl"
+
+    out_dir = out_dir or f"export-{datetime.now().strftime('%Y%m%d')}"
+    os.makedirs(out_dir, exist_ok=True)
+
+    checkpoint_path = os.path.join(out_dir, "checkpoint.json")
+    checkpoint = read_json(checkpoint_path, {"format": fmt, "tables": {}})
+
+    if checkpoint["format"] != fmt:
+        print(f"❌ {out_dir} holds a {checkpoint['format']} export; use another directory")
+        sys.exit(1)
+
+    def save():
+        write_json(checkpoint_path, checkpoint)
+
+    print(f"📦 Exporting to {out_dir}/ ({fmt})")
+
+    for table in tables:
+        state = checkpoint["tables"].setdefault(
+            table, {"cursor": None, "records": 0, "bytes": 0, "parts": 0, "done": False}
+        )
+        if state["done"]:
+            print(f"   {table}: {state['records']} records (already exported)")
+            continue
+
+        if fmt == "parquet":
+            export_table_parquet(table, out_dir, state, save)
+        else:
+            export_table_jsonl(table, out_dir, state, save)
+        print(f"   {table}: {state['records']} records ✅")
+
+    print(f"✅ Export complete: {out_dir}/")
+
+
+# ============ QUEUE ============
+#
+# Journal layout in QUEUE_DIR:
+#   queue.jsonl           append-only journal new mutations are written to
+#   flushing.jsonl        journal being replayed by `queue flush`
+#   flushing.state.json   how many coalesced ops of flushing.jsonl have been applied
+#   ids.json              provisional id -> server id for flushed creates
+#   rejected.jsonl        ops the server refused, kept for inspection
+
+# Fields a queued update can fold into a queued create of the same task
+CREATE_FIELDS = {"title", "description", "priority", "projectId", "dueDate", "assignedTo"}
+
+
+def queue_path(name):
+    return os.path.join(QUEUE_DIR, name)
+
+
+@contextmanager
+def queue_lock(name, exclusive=True, blocking=True):
+    """Hold an advisory lock file in QUEUE_DIR; yields False if it is already taken."""
+    os.makedirs(QUEUE_DIR, exist_ok=True)
+
+    with open(queue_path(name), "a") as f:
+        if fcntl is None:
+            yield True
+            return
+
+        flags = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if blocking else fcntl.LOCK_NB)
+        try:
+            fcntl.flock(f, flags)
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_journal(path):
+    if not os.path.exists(path):
+        return []
+
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_json(path, default):
+    if not os.path.exists(path):
+        return default
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    """Replace a small JSON state file atomically."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def enqueue(entry):
+    """Append a mutation to the local journal (no network involved).
+
+    Each entry gets a unique key (unless it already has one); the server
+    records the keys it has applied, so replaying a batch whose response was
+    lost does not apply it twice.
+    """
+    line = json.dumps({"key": uuid.uuid4().hex, **entry, "queuedAt": int(time.time() * 1000)}) + "\n"
+
+    # Shared lock: many agents may append at once, but not while a flush rotates the file
+    with queue_lock("queue.lock", exclusive=False):
+        with open(queue_path("queue.jsonl"), "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def resolve_task_id(task_id):
+    """Map a provisional task id to its server id once the create has been flushed."""
+    if not task_id.startswith(LOCAL_ID_PREFIX):
+        return task_id
+    return read_json(queue_path("ids.json"), {}).get(task_id, task_id)
+
+
+def send_mutation(method, path, entry):
+    """Send a mutation, or journal it when queueing is enabled.
+
+    Returns the HTTP response, or None when the mutation went to the journal.
+    In "fallback" mode the journal is used only when the deployment cannot be
+    reached or answers with a server error. The request then carries the
+    entry's key as Idempotency-Key, since it may have been applied before the
+    error: the server records the key, and a flush skips the journaled copy.
+    Mutations that reference a task still waiting in the journal are always
+    queued behind it.
+    """
+    pending = entry.get("taskId", "").startswith(LOCAL_ID_PREFIX)
+
+    if QUEUE_MODE != "always" and not pending:
+        headers = get_headers()
+        if QUEUE_MODE == "fallback":
+            entry = dict(entry, key=uuid.uuid4().hex)
+            headers["Idempotency-Key"] = entry["key"]
+        try:
+            response = requests.request(
+                method,
+                f"{BASE_URL}{path}",
+                json=entry["args"],
+                headers=headers,
+                timeout=REQUEST_TIMEOUT if QUEUE_MODE == "fallback" else None,
+            )
+            if QUEUE_MODE != "fallback" or response.status_code < 500:
+                return response
+        except requests.RequestException:
+            if QUEUE_MODE != "fallback":
+                raise
+
+    enqueue(entry)
+    return None
+
+
+def entry_key(entry):
+    """Idempotency key of a journal entry; derived from its content for entries queued without one."""
+    return entry.get("key") or uuid.uuid5(uuid.NAMESPACE_OID, json.dumps(entry, sort_keys=True)).hex
+
+
+def coalesce(entries):
+    """Collapse journal entries into the minimal list of ops to replay.
+
+    Successive patches to the same task merge into one update (kept at the
+    position of the first patch), and patches to a task that is itself still
+    queued fold into its create. Comments are replayed as-is and in order.
+    A merged op keeps the key of the first entry it was built from, so the
+    ops of a given journal always carry the same keys.
+    """
+    ops = []
+    creates = {}
+    updates = {}
+
+    for entry in entries:
+        if entry["op"] == "update_task":
+            task_id = entry["taskId"]
+            fields = dict(entry["args"])
+
+            if task_id in creates:
+                create_args = creates[task_id]["args"]
+                for key in CREATE_FIELDS & fields.keys():
+                    create_args[key] = fields.pop(key)
+                if not fields:
+                    continue
+
+            if task_id in updates:
+                updates[task_id]["args"].update(fields)
+            else:
+                updates[task_id] = {"op": "update_task", "key": entry_key(entry), "taskId": task_id, "args": fields}
+                ops.append(updates[task_id])
+        else:
+            op = {key: value for key, value in entry.items() if key != "queuedAt"}
+            op["key"] = entry_key(entry)
+            op["args"] = dict(op["args"])
+            ops.append(op)
+            if op["op"] == "create_task":
+                creates[op["ref"]] = op
+
+    return ops
+
+
+def post_batch(session, ops, ids):
+    """Send ops to /api/batch, rewriting provisional ids flushed by earlier batches."""
+    payload = [dict(op, taskId=ids.get(op["taskId"], op["taskId"])) if "taskId" in op else op for op in ops]
+    return session.post(f"{BASE_URL}/api/batch", json={"ops": payload}, headers=get_headers(), timeout=REQUEST_TIMEOUT)
+
+
+def flush_queue(batch_size=QUEUE_BATCH_SIZE):
+    """Replay the journal against the deployment in coalesced batches.
+
+    Progress is checkpointed after every batch, so an interrupted flush
+    resumes where it stopped. Each batch is applied in a single transaction.
+    """
+    with queue_lock("flush.lock", blocking=False) as acquired:
+        if not acquired:
+            print("⏳ Another flush is already running")
+            return
+
+        flushing = queue_path("flushing.jsonl")
+        state_path = queue_path("flushing.state.json")
+
+        # Rotate the live journal unless an interrupted flush is still pending
+        if not os.path.exists(flushing):
+            with queue_lock("queue.lock"):
+                if not os.path.exists(queue_path("queue.jsonl")):
+                    print("📭 Queue is empty")
+                    return
+                os.replace(queue_path("queue.jsonl"), flushing)
+            write_json(state_path, {"done": 0})
+
+        entries = read_journal(flushing)
+        ops = coalesce(entries)
+        done = read_json(state_path, {"done": 0})["done"]
+        ids = read_json(queue_path("ids.json"), {})
+        size = batch_size
+        rejected = 0
+
+        print(f"🔄 Flushing {len(ops) - done} ops ({len(entries)} journal entries)")
+
+        session = requests.Session()
+        while done < len(ops):
+            batch = ops[done:done + size]
+
+            # Safe to resend after a lost response: the server skips op keys it has applied
+            try:
+                response = post_batch(session, batch, ids)
+            except requests.RequestException as e:
+                print(f"❌ Deployment unreachable, {len(ops) - done} ops left queued: {e}")
+                return
+
+            if response.status_code == 400 and len(batch) > 1:
+                # Isolate the op the server refuses by retrying one at a time
+                size = 1
+                continue
+
+            if response.status_code == 400:
+                # The server refuses this one op as invalid; replaying it can't help
+                failed = batch
+            elif response.ok:
+                result = response.json()
+                ids.update(result["ids"])
+                write_json(queue_path("ids.json"), ids)
+                failed = [batch[error["index"]] for error in result["errors"]]
+            else:
+                # Anything else (auth, missing route, rate limits, server errors)
+                # says nothing about the ops themselves, so keep them for later
+                print(f"❌ Error {response.status_code}: {response.text}")
+                print(f"   {len(ops) - done} ops left queued")
+                return
+
+            if failed:
+                rejected += len(failed)
+                with open(queue_path("rejected.jsonl"), "a") as f:
+                    f.writelines(json.dumps(op) + "\n" for op in failed)
+
+            done += len(batch)
+            write_json(state_path, {"done": done})
+            size = batch_size
+
+        os.remove(flushing)
+        os.remove(state_path)
+
+    print(f"✅ Queue flushed ({len(ops)} ops)")
+    if rejected:
+        print(f"⚠️  {rejected} ops rejected by the server, see {queue_path('rejected.jsonl')}")
+
+
+def queue_status():
+    """Show what is waiting in the local journal."""
+    entries = read_journal(queue_path("queue.jsonl"))
+    flushing = read_journal(queue_path("flushing.jsonl"))
+
+    print(f"📦 Queue: {QUEUE_DIR} (mode: {QUEUE_MODE or 'off'})")
+    print(f"   Pending entries: {len(entries)}")
+
+    counts = {}
+    for entry in entries:
+        counts[entry["op"]] = counts.get(entry["op"], 0) + 1
+    for op, count in sorted(counts.items()):
+        print(f"     {op}: {count}")
+
+    if entries:
+        print(f"   Ops after coalescing: {len(coalesce(entries))}")
+        oldest = datetime.fromtimestamp(entries[0]["queuedAt"] / 1000).strftime("%Y-%m-%d %H:%M")
+        print(f"   Oldest entry: {oldest}")
+
+    if flushing:
+        done = read_json(queue_path("flushing.state.json"), {"done": 0})["done"]
+        print(f"   Interrupted flush: {len(coalesce(flushing)) - done} ops remaining")
+
+    rejected = read_journal(queue_path("rejected.jsonl"))
+    if rejected:
+        print(f"   Rejected ops: {len(rejected)} (see rejected.jsonl)")
+    print()
+
 
 def print_help():
     """Print usage information."""
@@ -292,18 +1071,58 @@ Project Commands:
 
 Task Commands:
   tasks list [project_id]                    List all tasks (or filter by project)
+      [--include-archived]                   Optional: also list archived done tasks
   tasks create <title> <description>         Create a new task
       [--project <id>]                       Optional: assign to project
       [--priority low|medium|high]           Optional: set priority (default: medium)
-  tasks get <task_id>                        Get task details
+  tasks get <task_id>                        Get task details (active or archived)
+  tasks claim                                Take the next todo task and start it
+      [--project <id>]                       Optional: only claim from this project
+      [--priority low|medium|high]           Optional: only claim this priority
+                                             Exits with status 2 when nothing is left,
+                                             1 on errors
+  tasks search <query>                       Full-text search over task titles/descriptions
+      [--status todo|in_progress|done]       Optional: filter by status
+      [--project <id>]                       Optional: filter by project
+      [--comments]                           Optional: search comments instead
+      [--limit <n>]                          Optional: max results (default: 20)
   tasks update <task_id> <status>            Update task status (todo/in_progress/done)
   tasks move <task_id> <project_id>          Move task to a project
   tasks comment <task_id> <message>          Add a comment to a task
 
+Rule Commands (reminder comments posted by the server on a schedule):
+  rules list                                 List reminder rules
+  rules create <kind>                        Create a rule; kind is overdue,
+                                             stale_in_progress or unstarted_high_priority
+      [--days <n>]                           Optional: threshold in days
+      [--name <name>]                        Optional: display name
+  rules update <rule_id>                     Change a rule
+      [--days <n>] [--name <name>]
+      [--enable|--disable]
+  rules delete <rule_id>                     Delete a rule
+  rules run [rule_id]                        Run one rule (or all enabled rules) now
+
+Queue Commands (write-behind journal for offline/burst operation):
+  queue status                               Show queued mutations
+  queue flush                                Replay queued mutations in batches
+
+Export Commands:
+  export [dir]                               Stream all tables (including the archive) to dir
+      [--parquet]                            Optional: Parquet part files (needs pyarrow)
+                                             Default: gzip JSONL; re-run to resume
+
+Output Options (list/get commands):
+  --format text|json|ndjson|tsv              Output format (default: text)
+                                             json/ndjson/tsv stream records as pages arrive
+
 Environment Variables:
   CONVEX_URL      Your Convex deployment URL
   API_KEY         Your API key for authentication (required for secure access)
   DEMO_USER_ID    User ID for creating tasks/comments (get from Convex dashboard)
+  PAGE_SIZE       Records fetched per request by list commands (default: 100)
+  MC_QUEUE        always: journal task creates/updates/comments locally, never block
+                  fallback: journal only when the deployment is unreachable
+  MC_QUEUE_DIR    Journal directory (default: ~/.mission-control)
 
 Examples:
   # Projects
@@ -316,10 +1135,47 @@ Examples:
   python agent_cli.py tasks create "Fix bug" "The login button is broken" --project j97abc
   python agent_cli.py tasks update k89xyz456 in_progress
   python agent_cli.py tasks comment k89xyz456 "Working on this now"
+  python agent_cli.py tasks search "login bug" --status todo
+  python agent_cli.py tasks claim --project j97abc
+
+  # Reminder rules
+  python agent_cli.py rules create stale_in_progress --days 3
+  python agent_cli.py rules run
+
+  # Offline / burst operation
+  MC_QUEUE=always python agent_cli.py tasks create "Fix bug" "Queued locally"
+  python agent_cli.py queue flush
+
+  # Machine-readable output
+  python agent_cli.py tasks list --format ndjson | jq 'select(.status == "todo")'
+  python agent_cli.py tasks get k89xyz456 --format json
 """)
 
 
+def pop_format_option(argv):
+    """Remove --format from argv and return the requested output format."""
+    fmt = "text"
+
+    for i, arg in enumerate(argv):
+        if arg == "--format" and i + 1 < len(argv):
+            fmt = argv[i + 1]
+            del argv[i:i + 2]
+            break
+        if arg.startswith("--format="):
+            fmt = arg.split("=", 1)[1]
+            del argv[i]
+            break
+
+    if fmt not in OUTPUT_FORMATS:
+        print(f"❌ Invalid format. Use: {', '.join(OUTPUT_FORMATS)}")
+        sys.exit(1)
+
+    return fmt
+
+
 if __name__ == "__main__":
+    fmt = pop_format_option(sys.argv)
+
     if len(sys.argv) < 2:
         print_help()
         sys.exit(1)
@@ -334,7 +1190,7 @@ if __name__ == "__main__":
         command = sys.argv[2]
 
         if command == "list":
-            list_projects()
+            list_projects(fmt)
         elif command == "create":
             if len(sys.argv) < 5:
                 print("❌ Usage: projects create <name> <description>")
@@ -344,21 +1200,23 @@ if __name__ == "__main__":
             if len(sys.argv) < 4:
                 print("❌ Usage: projects get <project_id>")
                 sys.exit(1)
-            get_project(sys.argv[3])
+            get_project(sys.argv[3], fmt)
         else:
             print(f"❌ Unknown project command: {command}")
             print_help()
 
     elif category == "tasks":
         if len(sys.argv) < 3:
-            print("❌ Usage: tasks <list|create|get|update|move|comment>")
+            print("❌ Usage: tasks <list|create|get|claim|search|update|move|comment>")
             sys.exit(1)
 
         command = sys.argv[2]
 
         if command == "list":
-            project_id = sys.argv[3] if len(sys.argv) > 3 else None
-            list_tasks(project_id)
+            args = sys.argv[3:]
+            include_archived = "--include-archived" in args
+            ids = [arg for arg in args if not arg.startswith("--")]
+            list_tasks(ids[0] if ids else None, fmt, include_archived)
         elif command == "create":
             if len(sys.argv) < 5:
                 print("❌ Usage: tasks create <title> <description> [--project <id>] [--priority low|medium|high]")
@@ -387,7 +1245,48 @@ if __name__ == "__main__":
             if len(sys.argv) < 4:
                 print("❌ Usage: tasks get <task_id>")
                 sys.exit(1)
-            get_task(sys.argv[3])
+            get_task(sys.argv[3], fmt)
+        elif command == "claim":
+            options = {}
+
+            i = 3
+            while i < len(sys.argv):
+                if sys.argv[i] in ("--project", "--priority") and i + 1 < len(sys.argv):
+                    options[sys.argv[i][2:]] = sys.argv[i + 1]
+                    i += 2
+                else:
+                    i += 1
+
+            if claim_task(options.get("project"), options.get("priority"), fmt) is None:
+                sys.exit(2)
+        elif command == "search":
+            if len(sys.argv) < 4:
+                print("❌ Usage: tasks search <query> [--status <status>] [--project <id>] [--comments] [--limit <n>]")
+                sys.exit(1)
+
+            words = []
+            options = {}
+
+            i = 3
+            while i < len(sys.argv):
+                if sys.argv[i] == "--comments":
+                    options["comments"] = True
+                    i += 1
+                elif sys.argv[i] in ("--status", "--project", "--limit") and i + 1 < len(sys.argv):
+                    options[sys.argv[i][2:]] = sys.argv[i + 1]
+                    i += 2
+                else:
+                    words.append(sys.argv[i])
+                    i += 1
+
+            search_tasks(
+                " ".join(words),
+                status=options.get("status"),
+                project_id=options.get("project"),
+                comments=options.get("comments", False),
+                limit=int(options.get("limit", 20)),
+                fmt=fmt,
+            )
         elif command == "update":
             if len(sys.argv) < 5:
                 print("❌ Usage: tasks update <task_id> <status>")
@@ -407,6 +1306,70 @@ if __name__ == "__main__":
             print(f"❌ Unknown task command: {command}")
             print_help()
 
+    elif category == "export":
+        args = sys.argv[2:]
+        fmt_name = "parquet" if "--parquet" in args else "jsonl"
+        paths = [arg for arg in args if not arg.startswith("--")]
+        export_data(paths[0] if paths else None, fmt_name)
+
+    elif category == "rules":
+        command = sys.argv[2] if len(sys.argv) > 2 else "list"
+
+        # Parse optional arguments
+        args = []
+        options = {}
+
+        i = 3
+        while i < len(sys.argv):
+            if sys.argv[i] in ("--days", "--name") and i + 1 < len(sys.argv):
+                options[sys.argv[i][2:]] = sys.argv[i + 1]
+                i += 2
+            elif sys.argv[i] in ("--enable", "--disable"):
+                options["enabled"] = sys.argv[i] == "--enable"
+                i += 1
+            else:
+                args.append(sys.argv[i])
+                i += 1
+
+        days = None
+        if "days" in options:
+            days = float(options["days"])
+            days = int(days) if days.is_integer() else days
+
+        if command == "list":
+            list_rules(fmt)
+        elif command == "create":
+            if not args:
+                print("❌ Usage: rules create <kind> [--days <n>] [--name <name>]")
+                sys.exit(1)
+            create_rule(args[0], days, options.get("name"))
+        elif command == "update":
+            if not args:
+                print("❌ Usage: rules update <rule_id> [--days <n>] [--name <name>] [--enable|--disable]")
+                sys.exit(1)
+            update_rule(args[0], days, options.get("name"), options.get("enabled"))
+        elif command == "delete":
+            if not args:
+                print("❌ Usage: rules delete <rule_id>")
+                sys.exit(1)
+            delete_rule(args[0])
+        elif command == "run":
+            run_rules(args[0] if args else None)
+        else:
+            print(f"❌ Unknown rules command: {command}")
+            print_help()
+
+    elif category == "queue":
+        command = sys.argv[2] if len(sys.argv) > 2 else "status"
+
+        if command == "status":
+            queue_status()
+        elif command == "flush":
+            flush_queue()
+        else:
+            print(f"❌ Unknown queue command: {command}")
+            print_help()
+
     elif category == "help" or category == "--help" or category == "-h":
         print_help()
     else:
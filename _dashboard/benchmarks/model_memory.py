@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: task snapshot as API dicts vs. mc_models records
+
+Decodes synthetic API task documents (same shape as GET /api/tasks, with
+the assignee, creator and project embedded in every task) and compares the
+memory held by the plain list of dicts with a slotted mc_models Snapshot.
+
+Usage:
+  python benchmarks/model_memory.py            # 100k tasks
+  python benchmarks/model_memory.py 250000
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from mc_models import Snapshot
+
+
+def fake_task_json(i, users, projects):
+    """One task document as the API would serialize it."""
+    rng = random.Random(i)
+    project = rng.choice(projects + [None])
+    assignee = rng.choice(users + [None])
+    return json.dumps({
+        "_id": f"k57{i:013d}",
+        "_creationTime": 1.7e12 + i,
+        "title": f"Task {i}: follow up on item {rng.randint(1, 10**6)}",
+        "description": "Details " * rng.randint(2, 12),
+        "status": rng.choice(["todo", "in_progress", "done"]),
+        "priority": rng.choice(["low", "medium", "high"]),
+        "projectId": project["_id"] if project else None,
+        "dueDate": 1.7e12 + rng.randint(0, 10**9) if rng.random() < 0.3 else None,
+        "createdAt": 1.7e12 + i,
+        "updatedAt": 1.7e12 + i + rng.randint(0, 10**8),
+        "assignedTo": assignee,
+        "createdBy": rng.choice(users),
+        "project": project,
+    })
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    users = [
+        {"_id": f"j97user{n:06d}", "_creationTime": 1.7e12, "name": f"Agent {n}",
+         "type": "agent" if n % 3 else "human", "createdAt": 1.7e12}
+        for n in range(50)
+    ]
+    projects = [
+        {"_id": f"m12proj{n:06d}", "_creationTime": 1.7e12, "name": f"Project {n}",
+         "description": "Project description", "color": "#3B82F6",
+         "createdBy": users[n]["_id"], "createdAt": 1.7e12, "updatedAt": 1.7e12}
+        for n in range(20)
+    ]
+
+    def stream():
+        return (json.loads(fake_task_json(i, users, projects)) for i in range(count))
+
+    dicts, dict_bytes = measure(lambda: list(stream()))
+    del dicts
+    snapshot, slot_bytes = measure(lambda: Snapshot.from_tasks(stream()))
+
+    print(f"Tasks: {count:,} ({len(snapshot.users)} users, {len(snapshot.projects)} projects)")
+    print(f"  dicts:     {dict_bytes / 2**20:8.1f} MiB  ({dict_bytes / count:6.0f} B/task)")
+    print(f"  snapshot:  {slot_bytes / 2**20:8.1f} MiB  ({slot_bytes / count:6.0f} B/task)")
+    print(f"  ratio:     {dict_bytes / slot_bytes:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import { v } from "convex/values";
-import { mutation, query } from "./_generated/server";
+import { internalMutation, mutation, query } from "./_generated/server";
 import { getAuthUserId } from "@convex-dev/auth/server";
 
 // Generate a random API key
@@ -57,6 +57,77 @@ export const create = mutation({
   },
 });
 
+// Onboard many users at once: creates each user and an API key for it in a
+// single transaction (used by `onboard.py --from roster.csv` through the
+// admin-only /api/onboard/batch route).
+// Users are keyed by `rosterKey` (the client's run id plus the user's slug):
+// a user this run created before (for instance in a chunk whose response was
+// lost) is not created again. Its key was already shown once and is never
+// returned; with `rotate` it is replaced by a new key instead.
+export const onboardBatch = internalMutation({
+  args: {
+    users: v.array(
+      v.object({
+        name: v.string(),
+        type: v.union(v.literal("human"), v.literal("agent")),
+        keyName: v.optional(v.string()),
+        rosterKey: v.optional(v.string()),
+      })
+    ),
+    rotate: v.optional(v.boolean()),
+  },
+  handler: async (ctx, args) => {
+    const results = [];
+
+    for (const user of args.users) {
+      const keyName = user.keyName || `${user.name} key`;
+      const existing = user.rosterKey
+        ? await ctx.db
+            .query("users")
+            .withIndex("by_roster_key", (q) => q.eq("rosterKey", user.rosterKey))
+            .first()
+        : null;
+
+      if (existing) {
+        const keys = await ctx.db
+          .query("apiKeys")
+          .withIndex("by_user", (q) => q.eq("userId", existing._id))
+          .collect();
+        const key = keys.find((k) => k.name === keyName) ?? keys[0];
+        if (key && !args.rotate) {
+          results.push({ name: user.name, userId: existing._id, keyId: key._id, existing: true });
+          continue;
+        }
+        if (key) {
+          await ctx.db.delete(key._id);
+        }
+      }
+
+      const now = Date.now();
+      const userId = existing?._id ?? await ctx.db.insert("users", {
+        name: user.name,
+        type: user.type,
+        rosterKey: user.rosterKey,
+        createdAt: now,
+      });
+
+      const apiKey = generateApiKey();
+      const keyId = await ctx.db.insert("apiKeys", {
+        key: hashKey(apiKey),
+        name: keyName,
+        userId,
+        permissions: ["read", "write"],
+        createdAt: now,
+      });
+
+      // Return the plain key ONCE (it won't be shown again)
+      results.push({ name: user.name, userId, keyId, apiKey, existing: existing !== null });
+    }
+
+    return results;
+  },
+});
+
 // List user's API keys (without revealing the actual key)
 export const list = query({
   args: {
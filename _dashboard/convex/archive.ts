@@ -0,0 +1,149 @@
+import { v } from "convex/values";
+import { paginationOptsValidator } from "convex/server";
+import { internalMutation, query, QueryCtx } from "./_generated/server";
+import { Doc } from "./_generated/dataModel";
+import { internal } from "./_generated/api";
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Done tasks untouched for this many days are archived (Convex env var)
+const DEFAULT_ARCHIVE_AFTER_DAYS = 30;
+
+// Tasks moved per mutation; the sweep reschedules itself until caught up
+const SWEEP_BATCH_SIZE = 100;
+
+function archiveAfterDays() {
+  const days = Number(process.env.ARCHIVE_AFTER_DAYS);
+  return Number.isFinite(days) && days > 0 ? days : DEFAULT_ARCHIVE_AFTER_DAYS;
+}
+
+// Archived tasks keep their original id, so clients can look them up as before
+async function withDetails(ctx: QueryCtx, task: Doc<"archivedTasks">) {
+  const { _id, _creationTime, taskId, ...fields } = task;
+  const assignee = task.assignedTo ? await ctx.db.get(task.assignedTo) : null;
+  const creator = await ctx.db.get(task.createdBy);
+  const project = task.projectId ? await ctx.db.get(task.projectId) : null;
+
+  return {
+    ...fields,
+    _id: taskId,
+    archived: true,
+    assignedTo: assignee,
+    createdBy: creator,
+    project: project,
+  };
+}
+
+// Move done tasks older than ARCHIVE_AFTER_DAYS, with their comments, into
+// the archive tables. Runs from crons.ts.
+export const sweep = internalMutation({
+  args: {},
+  handler: async (ctx) => {
+    const cutoff = Date.now() - archiveAfterDays() * DAY_MS;
+    const tasks = await ctx.db
+      .query("tasks")
+      .withIndex("by_status_updated", (q) => q.eq("status", "done").lt("updatedAt", cutoff))
+      .take(SWEEP_BATCH_SIZE);
+
+    const archivedAt = Date.now();
+
+    for (const task of tasks) {
+      const { _id, _creationTime, ...fields } = task;
+
+      await ctx.db.insert("archivedTasks", {
+        ...fields,
+        status: "done",
+        taskId: _id,
+        archivedAt,
+      });
+
+      const comments = await ctx.db
+        .query("comments")
+        .withIndex("by_task", (q) => q.eq("taskId", _id))
+        .collect();
+
+      for (const comment of comments) {
+        // taskStatus/projectId are search filters only; the archived task keeps them
+        const { _id: commentId, _creationTime, taskStatus, projectId, ...commentFields } = comment;
+        await ctx.db.insert("archivedComments", { ...commentFields, commentId, archivedAt });
+        await ctx.db.delete(commentId);
+      }
+
+      await ctx.db.delete(_id);
+    }
+
+    if (tasks.length === SWEEP_BATCH_SIZE) {
+      await ctx.scheduler.runAfter(0, internal.archive.sweep, {});
+    }
+
+    return tasks.length;
+  },
+});
+
+// List all archived tasks (optionally filter by project)
+export const list = query({
+  args: {
+    projectId: v.optional(v.id("projects")),
+  },
+  handler: async (ctx, args) => {
+    const tasks = args.projectId
+      ? await ctx.db
+          .query("archivedTasks")
+          .withIndex("by_project", (q) => q.eq("projectId", args.projectId))
+          .collect()
+      : await ctx.db.query("archivedTasks").collect();
+
+    return await Promise.all(tasks.map((task) => withDetails(ctx, task)));
+  },
+});
+
+// List one page of archived tasks (optionally filter by project)
+export const listPage = query({
+  args: {
+    projectId: v.optional(v.id("projects")),
+    paginationOpts: paginationOptsValidator,
+  },
+  handler: async (ctx, args) => {
+    const results = args.projectId
+      ? await ctx.db
+          .query("archivedTasks")
+          .withIndex("by_project", (q) => q.eq("projectId", args.projectId))
+          .paginate(args.paginationOpts)
+      : await ctx.db.query("archivedTasks").paginate(args.paginationOpts);
+
+    return {
+      ...results,
+      page: await Promise.all(results.page.map((task) => withDetails(ctx, task))),
+    };
+  },
+});
+
+// Get a single archived task with its comments, by original task id
+export const get = query({
+  args: { taskId: v.id("tasks") },
+  handler: async (ctx, args) => {
+    const task = await ctx.db
+      .query("archivedTasks")
+      .withIndex("by_task", (q) => q.eq("taskId", args.taskId))
+      .unique();
+    if (!task) return null;
+
+    const comments = await ctx.db
+      .query("archivedComments")
+      .withIndex("by_task", (q) => q.eq("taskId", args.taskId))
+      .collect();
+
+    const commentsWithAuthors = await Promise.all(
+      comments.map(async ({ commentId, ...comment }) => ({
+        ...comment,
+        _id: commentId,
+        author: await ctx.db.get(comment.authorId),
+      }))
+    );
+
+    return {
+      ...(await withDetails(ctx, task)),
+      comments: commentsWithAuthors,
+    };
+  },
+});
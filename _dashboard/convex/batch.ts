@@ -0,0 +1,163 @@
+import { v } from "convex/values";
+import { internalMutation, mutation } from "./_generated/server";
+import { Id } from "./_generated/dataModel";
+import { internal } from "./_generated/api";
+import { commentFilters, refreshCommentFilters, refreshSearchText, searchText } from "./tasks";
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Applied op keys are kept this long; a client retrying a flush later than
+// this could apply an op twice
+const KEEP_APPLIED_DAYS = 30;
+const PRUNE_BATCH_SIZE = 500;
+
+const status = v.union(v.literal("todo"), v.literal("in_progress"), v.literal("done"));
+const priority = v.union(v.literal("low"), v.literal("medium"), v.literal("high"));
+
+// Replay a batch of queued agent mutations in one transaction.
+// Tasks created earlier in the batch are referenced by their client-side
+// provisional id (`ref`); the mapping to real ids is returned to the caller.
+// Each op carries a client-generated `key`: ops whose key was applied before
+// are skipped (a create returns its earlier id), so a batch whose response
+// was lost can be sent again safely.
+export const apply = mutation({
+  args: {
+    ops: v.array(
+      v.union(
+        v.object({
+          op: v.literal("create_task"),
+          key: v.optional(v.string()),
+          ref: v.string(),
+          args: v.object({
+            title: v.string(),
+            description: v.string(),
+            priority: priority,
+            projectId: v.optional(v.id("projects")),
+            dueDate: v.optional(v.number()),
+            createdBy: v.id("users"),
+            assignedTo: v.optional(v.id("users")),
+          }),
+        }),
+        v.object({
+          op: v.literal("update_task"),
+          key: v.optional(v.string()),
+          taskId: v.string(),
+          args: v.object({
+            title: v.optional(v.string()),
+            description: v.optional(v.string()),
+            status: v.optional(status),
+            priority: v.optional(priority),
+            projectId: v.optional(v.id("projects")),
+            dueDate: v.optional(v.number()),
+            assignedTo: v.optional(v.id("users")),
+          }),
+        }),
+        v.object({
+          op: v.literal("add_comment"),
+          key: v.optional(v.string()),
+          taskId: v.string(),
+          args: v.object({
+            content: v.string(),
+            authorId: v.id("users"),
+          }),
+        })
+      )
+    ),
+  },
+  handler: async (ctx, args) => {
+    const ids: Record<string, Id<"tasks">> = {};
+    const errors: { index: number; error: string }[] = [];
+
+    const markApplied = async (key: string | undefined, appliedAt: number, taskId?: Id<"tasks">) => {
+      if (key) {
+        await ctx.db.insert("batchOps", { key, taskId, appliedAt });
+      }
+    };
+
+    // Skip ops that point at missing tasks instead of failing the whole batch
+    const resolve = async (taskId: string) => {
+      const id = ids[taskId] ?? ctx.db.normalizeId("tasks", taskId);
+      return id && (await ctx.db.get(id)) ? id : null;
+    };
+
+    for (const [index, op] of args.ops.entries()) {
+      const now = Date.now();
+
+      // Already applied by an earlier attempt at this batch
+      const applied = op.key
+        ? await ctx.db
+            .query("batchOps")
+            .withIndex("by_key", (q) => q.eq("key", op.key!))
+            .unique()
+        : null;
+      if (applied) {
+        if (op.op === "create_task" && applied.taskId) {
+          ids[op.ref] = applied.taskId;
+        }
+        continue;
+      }
+
+      if (op.op === "create_task") {
+        ids[op.ref] = await ctx.db.insert("tasks", {
+          ...op.args,
+          status: "todo",
+          createdAt: now,
+          updatedAt: now,
+          searchText: searchText(op.args.title, op.args.description),
+        });
+        await markApplied(op.key, now, ids[op.ref]);
+        continue;
+      }
+
+      const taskId = await resolve(op.taskId);
+      if (!taskId) {
+        errors.push({ index, error: `Task not found: ${op.taskId}` });
+        continue;
+      }
+
+      if (op.op === "update_task") {
+        await ctx.db.patch(taskId, { ...op.args, updatedAt: now });
+        if (op.args.title !== undefined || op.args.description !== undefined) {
+          await refreshSearchText(ctx, taskId);
+        }
+        if (op.args.status !== undefined || op.args.projectId !== undefined) {
+          await refreshCommentFilters(ctx, taskId);
+        }
+      } else {
+        const task = await ctx.db.get(taskId);
+        await ctx.db.insert("comments", {
+          taskId,
+          authorId: op.args.authorId,
+          content: op.args.content,
+          createdAt: now,
+          ...(task && commentFilters(task)),
+        });
+      }
+      await markApplied(op.key, now);
+    }
+
+    return { ids, errors };
+  },
+});
+
+// Forget applied op keys older than KEEP_APPLIED_DAYS. Runs from crons.ts.
+export const prune = internalMutation({
+  args: {},
+  handler: async (ctx) => {
+    const cutoff = Date.now() - KEEP_APPLIED_DAYS * DAY_MS;
+    const old = await ctx.db
+      .query("batchOps")
+      .withIndex("by_applied", (q) => q.lt("appliedAt", cutoff))
+      .take(PRUNE_BATCH_SIZE);
+
+    for (const row of old) {
+      await ctx.db.delete(row._id);
+    }
+
+    if (old.length === PRUNE_BATCH_SIZE) {
+      await ctx.scheduler.runAfter(0, internal.batch.prune, {});
+    }
+
+    return old.length;
+  },
+});
@@ -1,5 +1,9 @@
 import { v } from "convex/values";
+import { paginationOptsValidator } from "convex/server";
 import { mutation, query } from "./_generated/server";
+import { commentFilters } from "./tasks";
+
+const status = v.union(v.literal("todo"), v.literal("in_progress"), v.literal("done"));
 
 // Create a comment
 export const create = mutation({
@@ -9,11 +13,13 @@ export const create = mutation({
     content: v.string(),
   },
   handler: async (ctx, args) => {
+    const task = await ctx.db.get(args.taskId);
     const commentId = await ctx.db.insert("comments", {
       taskId: args.taskId,
       authorId: args.authorId,
       content: args.content,
       createdAt: Date.now(),
+      ...(task && commentFilters(task)),
     });
 
     return commentId;
@@ -43,3 +49,44 @@ export const list = query({
     return commentsWithAuthors;
   },
 });
+
+// Full-text search over comment content, optionally within one task or
+// filtered by the parent task's status and project
+export const search = query({
+  args: {
+    query: v.string(),
+    taskId: v.optional(v.id("tasks")),
+    status: v.optional(status),
+    projectId: v.optional(v.id("projects")),
+    paginationOpts: paginationOptsValidator,
+  },
+  handler: async (ctx, args) => {
+    const results = await ctx.db
+      .query("comments")
+      .withSearchIndex("search_content", (q) => {
+        let search = q.search("content", args.query);
+        if (args.taskId) search = search.eq("taskId", args.taskId);
+        if (args.status) search = search.eq("taskStatus", args.status);
+        if (args.projectId) search = search.eq("projectId", args.projectId);
+        return search;
+      })
+      .paginate(args.paginationOpts);
+
+    // Populate author and the parent task's title/status
+    const page = await Promise.all(
+      results.page.map(async (comment) => {
+        const author = await ctx.db.get(comment.authorId);
+        const task = await ctx.db.get(comment.taskId);
+        return {
+          ...comment,
+          author,
+          task: task
+            ? { _id: task._id, title: task.title, status: task.status, projectId: task.projectId }
+            : null,
+        };
+      })
+    );
+
+    return { ...results, page };
+  },
+});
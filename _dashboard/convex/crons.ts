@@ -0,0 +1,15 @@
+import { cronJobs } from "convex/server";
+import { internal } from "./_generated/api";
+
+const crons = cronJobs();
+
+// Move old done tasks out of the hot tables (see archive.ts)
+crons.hourly("archive done tasks", { minuteUTC: 15 }, internal.archive.sweep, {});
+
+// Evaluate reminder rules in-database (see rules.ts)
+crons.hourly("run reminder rules", { minuteUTC: 0 }, internal.rules.sweep, {});
+
+// Forget the keys of batch ops applied long ago (see batch.ts)
+crons.daily("prune applied batch ops", { hourUTC: 4, minuteUTC: 30 }, internal.batch.prune, {});
+
+export default crons;
@@ -0,0 +1,22 @@
+import { v } from "convex/values";
+import { paginationOptsValidator } from "convex/server";
+import { query } from "./_generated/server";
+
+// Raw (un-joined) page of documents from one table, for backups and analysis.
+// API keys are never exported.
+export const page = query({
+  args: {
+    table: v.union(
+      v.literal("users"),
+      v.literal("projects"),
+      v.literal("tasks"),
+      v.literal("comments"),
+      v.literal("archivedTasks"),
+      v.literal("archivedComments")
+    ),
+    paginationOpts: paginationOptsValidator,
+  },
+  handler: async (ctx, args) => {
+    return await ctx.db.query(args.table).paginate(args.paginationOpts);
+  },
+});
@@ -1,6 +1,6 @@
 import { httpRouter } from "convex/server";
 import { httpAction } from "./_generated/server";
-import { api } from "./_generated/api";
+import { api, internal } from "./_generated/api";
 import { Id } from "./_generated/dataModel";
 // users and apiKeys are accessed via api.users / api.apiKeys
 
@@ -28,6 +28,46 @@ async function authenticateRequest(ctx: any, request: Request) {
   return { authenticated: true, userId: auth.userId, permissions: auth.permissions };
 }
 
+// Pagination helpers: `?limit=N&cursor=...` switches a list route to paged mode.
+// The body stays a plain JSON array; the next cursor travels in response headers
+// so existing clients that read the array keep working unchanged.
+const MAX_PAGE_SIZE = 500;
+
+function getPaginationOpts(url: URL) {
+  const limit = url.searchParams.get("limit");
+  if (!limit) return null;
+
+  return {
+    numItems: Math.min(Math.max(parseInt(limit, 10) || 100, 1), MAX_PAGE_SIZE),
+    cursor: url.searchParams.get("cursor") || null,
+  };
+}
+
+function pageResponse(result: { page: unknown[]; isDone: boolean; continueCursor: string }) {
+  return new Response(JSON.stringify(result.page), {
+    headers: {
+      "Content-Type": "application/json",
+      "Access-Control-Allow-Origin": "*",
+      "Access-Control-Expose-Headers": "X-Continue-Cursor, X-Is-Done",
+      "X-Continue-Cursor": result.continueCursor,
+      "X-Is-Done": String(result.isDone),
+    },
+  });
+}
+
+// Whether a function call failed because its arguments did not match the
+// validator. Anything else (conflicts, overload, timeouts) is worth retrying.
+function isValidationError(error: unknown) {
+  return String(error).includes("ArgumentValidationError");
+}
+
+// Writes sent with an Idempotency-Key header (agent_cli.py in fallback mode)
+// go through batch.apply as a single keyed op, so the same op replayed later
+// from the client's journal is recognised and skipped.
+function idempotencyKey(request: Request) {
+  return request.headers.get("Idempotency-Key") || undefined;
+}
+
 // ============ PROJECTS ============
 
 // List all projects
@@ -35,6 +75,11 @@ http.route({
   path: "/api/projects",
   method: "GET",
   handler: httpAction(async (ctx, request) => {
+    const paginationOpts = getPaginationOpts(new URL(request.url));
+    if (paginationOpts) {
+      return pageResponse(await ctx.runQuery(api.projects.listPage, { paginationOpts }));
+    }
+
     const projects = await ctx.runQuery(api.projects.list);
     return new Response(JSON.stringify(projects), {
       headers: {
@@ -135,6 +180,8 @@ http.route({
 
 // ============ TASKS ============
 
+const ARCHIVE_CURSOR = "archived:";
+
 // List all tasks (optionally filter by project)
 http.route({
   path: "/api/tasks",
@@ -153,11 +200,33 @@ http.route({
     }
 
     const url = new URL(request.url);
-    const projectId = url.searchParams.get("projectId");
+    const projectId = (url.searchParams.get("projectId") as Id<"projects">) || undefined;
+    const includeArchived = url.searchParams.get("includeArchived") === "true";
+
+    const paginationOpts = getPaginationOpts(url);
+    if (paginationOpts) {
+      // With includeArchived, active tasks are paged first, then the archive;
+      // cursors into the archive carry an "archived:" prefix
+      const cursor = paginationOpts.cursor ?? "";
+      if (includeArchived && cursor.startsWith(ARCHIVE_CURSOR)) {
+        const result = await ctx.runQuery(api.archive.listPage, {
+          projectId,
+          paginationOpts: { ...paginationOpts, cursor: cursor.slice(ARCHIVE_CURSOR.length) || null },
+        });
+        return pageResponse({ ...result, continueCursor: ARCHIVE_CURSOR + result.continueCursor });
+      }
 
-    const tasks = await ctx.runQuery(api.tasks.list, {
-      projectId: projectId as Id<"projects"> | undefined,
-    });
+      const result = await ctx.runQuery(api.tasks.listPage, { projectId, paginationOpts });
+      if (includeArchived && result.isDone) {
+        return pageResponse({ ...result, isDone: false, continueCursor: ARCHIVE_CURSOR });
+      }
+      return pageResponse(result);
+    }
+
+    const tasks = await ctx.runQuery(api.tasks.list, { projectId });
+    if (includeArchived) {
+      tasks.push(...(await ctx.runQuery(api.archive.list, { projectId })));
+    }
 
     return new Response(JSON.stringify(tasks), {
       headers: {
@@ -174,7 +243,10 @@ http.route({
   method: "POST",
   handler: httpAction(async (ctx, request) => {
     const body = await request.json();
-    const taskId = await ctx.runMutation(api.tasks.create, body);
+    const key = idempotencyKey(request);
+    const taskId = key
+      ? (await ctx.runMutation(api.batch.apply, { ops: [{ op: "create_task", key, ref: key, args: body }] })).ids[key]
+      : await ctx.runMutation(api.tasks.create, body);
     return new Response(JSON.stringify({ taskId }), {
       status: 201,
       headers: {
@@ -185,6 +257,48 @@ http.route({
   }),
 });
 
+// Claim the next todo task for the calling agent (see tasks.claim)
+http.route({
+  path: "/api/tasks/claim",
+  method: "POST",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const body = await request.json().catch(() => ({}));
+
+    if (body.priority && !["low", "medium", "high"].includes(body.priority)) {
+      return new Response(JSON.stringify({ error: "priority must be one of: low, medium, high" }), {
+        status: 400,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const task = await ctx.runMutation(api.tasks.claim, {
+      userId: auth.userId,
+      projectId: body.projectId || undefined,
+      priority: body.priority || undefined,
+    });
+
+    // Nothing left to claim is a normal outcome for a polling agent
+    if (!task) {
+      return new Response(null, {
+        status: 204,
+        headers: { "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    return new Response(JSON.stringify(task), {
+      headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+    });
+  }),
+});
+
 // Get single task
 http.route({
   path: "/api/tasks/{id}",
@@ -193,7 +307,10 @@ http.route({
     const url = new URL(request.url);
     const taskId = url.pathname.split("/").pop() as Id<"tasks">;
 
-    const task = await ctx.runQuery(api.tasks.get, { taskId });
+    // Fall back to the archive for done tasks moved there by archive.sweep
+    const task =
+      (await ctx.runQuery(api.tasks.get, { taskId })) ??
+      (await ctx.runQuery(api.archive.get, { taskId }));
 
     if (!task) {
       return new Response(JSON.stringify({ error: "Task not found" }), {
@@ -222,11 +339,22 @@ http.route({
     const url = new URL(request.url);
     const taskId = url.pathname.split("/").pop() as Id<"tasks">;
     const body = await request.json();
-
-    await ctx.runMutation(api.tasks.update, {
-      taskId,
-      ...body,
-    });
+    const key = idempotencyKey(request);
+
+    if (key) {
+      const result = await ctx.runMutation(api.batch.apply, { ops: [{ op: "update_task", key, taskId, args: body }] });
+      if (result.errors.length) {
+        return new Response(JSON.stringify({ error: result.errors[0].error }), {
+          status: 404,
+          headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+        });
+      }
+    } else {
+      await ctx.runMutation(api.tasks.update, {
+        taskId,
+        ...body,
+      });
+    }
 
     return new Response(JSON.stringify({ success: true }), {
       headers: {
@@ -246,6 +374,18 @@ http.route({
     const pathParts = url.pathname.split("/");
     const taskId = pathParts[pathParts.length - 2] as Id<"tasks">;
     const body = await request.json();
+    const key = idempotencyKey(request);
+
+    if (key) {
+      // batch.apply doesn't report comment ids; the caller only needs to know it landed
+      const result = await ctx.runMutation(api.batch.apply, {
+        ops: [{ op: "add_comment", key, taskId, args: { content: body.content, authorId: body.authorId } }],
+      });
+      return new Response(JSON.stringify(result.errors.length ? { error: result.errors[0].error } : { success: true }), {
+        status: result.errors.length ? 404 : 201,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
 
     const commentId = await ctx.runMutation(api.comments.create, {
       taskId,
@@ -263,6 +403,261 @@ http.route({
   }),
 });
 
+// ============ SEARCH ============
+
+// Full-text search: GET /api/search?q=...&status=&projectId=&scope=tasks|comments&limit=&cursor=
+http.route({
+  path: "/api/search",
+  method: "GET",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const url = new URL(request.url);
+    const query = url.searchParams.get("q");
+    if (!query) {
+      return new Response(JSON.stringify({ error: "q is required" }), {
+        status: 400,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const paginationOpts = getPaginationOpts(url) ?? { numItems: 20, cursor: null };
+
+    const status = url.searchParams.get("status");
+
+    if (url.searchParams.get("scope") === "comments") {
+      return pageResponse(await ctx.runQuery(api.comments.search, {
+        query,
+        taskId: (url.searchParams.get("taskId") as Id<"tasks">) || undefined,
+        status: (status as "todo" | "in_progress" | "done") || undefined,
+        projectId: (url.searchParams.get("projectId") as Id<"projects">) || undefined,
+        paginationOpts,
+      }));
+    }
+
+    return pageResponse(await ctx.runQuery(api.tasks.search, {
+      query,
+      status: (status as "todo" | "in_progress" | "done") || undefined,
+      projectId: (url.searchParams.get("projectId") as Id<"projects">) || undefined,
+      paginationOpts,
+    }));
+  }),
+});
+
+// ============ EXPORT ============
+
+const EXPORT_TABLES = ["users", "projects", "tasks", "comments", "archivedTasks", "archivedComments"] as const;
+
+// Stream a table page by page: GET /api/export?table=tasks&limit=500&cursor=...
+http.route({
+  path: "/api/export",
+  method: "GET",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const url = new URL(request.url);
+    const table = url.searchParams.get("table") as (typeof EXPORT_TABLES)[number];
+    if (!EXPORT_TABLES.includes(table)) {
+      return new Response(JSON.stringify({ error: `table must be one of: ${EXPORT_TABLES.join(", ")}` }), {
+        status: 400,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const paginationOpts = getPaginationOpts(url) ?? { numItems: MAX_PAGE_SIZE, cursor: null };
+
+    return pageResponse(await ctx.runQuery(api.export.page, { table, paginationOpts }));
+  }),
+});
+
+// ============ RULES ============
+
+// List reminder rules
+http.route({
+  path: "/api/rules",
+  method: "GET",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const rules = await ctx.runQuery(api.rules.list);
+    return new Response(JSON.stringify(rules), {
+      headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+    });
+  }),
+});
+
+// Create a reminder rule; comments are posted as the caller unless authorId is given
+http.route({
+  path: "/api/rules",
+  method: "POST",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const body = await request.json();
+
+    let ruleId;
+    try {
+      ruleId = await ctx.runMutation(api.rules.create, { authorId: auth.userId, ...body });
+    } catch (error) {
+      return new Response(JSON.stringify({ error: String(error) }), {
+        status: 400,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    return new Response(JSON.stringify({ ruleId }), {
+      status: 201,
+      headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+    });
+  }),
+});
+
+// Run one rule ({ "ruleId": ... }) or all enabled rules now
+http.route({
+  path: "/api/rules/run",
+  method: "POST",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const body = await request.json().catch(() => ({}));
+    const scheduled = await ctx.runMutation(api.rules.runNow, { ruleId: body.ruleId || undefined });
+
+    return new Response(JSON.stringify({ scheduled }), {
+      status: 202,
+      headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+    });
+  }),
+});
+
+// Update a rule: PATCH /api/rules/<rule_id>
+http.route({
+  pathPrefix: "/api/rules/",
+  method: "PATCH",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const url = new URL(request.url);
+    const ruleId = url.pathname.split("/").pop() as Id<"rules">;
+    const body = await request.json();
+
+    try {
+      await ctx.runMutation(api.rules.update, { ...body, ruleId });
+    } catch (error) {
+      return new Response(JSON.stringify({ error: String(error) }), {
+        status: 400,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    return new Response(JSON.stringify({ success: true }), {
+      headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+    });
+  }),
+});
+
+// Delete a rule: DELETE /api/rules/<rule_id>
+http.route({
+  pathPrefix: "/api/rules/",
+  method: "DELETE",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const url = new URL(request.url);
+    const ruleId = url.pathname.split("/").pop() as Id<"rules">;
+
+    try {
+      await ctx.runMutation(api.rules.remove, { ruleId });
+    } catch (error) {
+      return new Response(JSON.stringify({ error: String(error) }), {
+        status: 400,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    return new Response(JSON.stringify({ success: true }), {
+      headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+    });
+  }),
+});
+
+// ============ BATCH ============
+
+// Replay queued mutations (create task, update task, add comment) in one
+// transaction — used by `agent_cli.py queue flush`
+http.route({
+  path: "/api/batch",
+  method: "POST",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const body = await request.json();
+
+    let result;
+    try {
+      result = await ctx.runMutation(api.batch.apply, { ops: body.ops });
+    } catch (error) {
+      // Invalid ops are the client's problem; any other failure is the server's,
+      // and the client keeps its ops queued to retry
+      return new Response(JSON.stringify({ error: String(error) }), {
+        status: isValidationError(error) ? 400 : 500,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    return new Response(JSON.stringify(result), {
+      headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+    });
+  }),
+});
+
 // ============ ONBOARDING ============
 
 // Create a user + API key in one shot — returns ready-to-use credentials
@@ -325,6 +720,73 @@ http.route({
   }),
 });
 
+// Bulk onboarding — users + API keys for a roster chunk in one transaction
+const MAX_ONBOARD_BATCH = 100;
+
+http.route({
+  path: "/api/onboard/batch",
+  method: "POST",
+  handler: httpAction(async (ctx, request) => {
+    const auth = await authenticateRequest(ctx, request);
+    if (!auth.authenticated) {
+      return new Response(JSON.stringify({ error: auth.error }), {
+        status: 401,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+    if (!auth.permissions.includes("admin")) {
+      return new Response(JSON.stringify({ error: "Bulk onboarding needs an API key with the admin permission" }), {
+        status: 403,
+        headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+      });
+    }
+
+    const body = await request.json();
+    const users = Array.isArray(body.users) ? body.users : [];
+
+    if (users.length === 0 || users.length > MAX_ONBOARD_BATCH || users.some((u: any) => !u?.name)) {
+      return new Response(
+        JSON.stringify({ error: `users must be 1-${MAX_ONBOARD_BATCH} entries, each with a name` }),
+        {
+          status: 400,
+          headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+        }
+      );
+    }
+
+    const results = await ctx.runMutation(internal.apiKeys.onboardBatch, {
+      users: users.map((u: any) => ({
+        name: String(u.name),
+        type: u.type === "human" ? "human" : "agent",
+        keyName: u.keyName ? String(u.keyName) : undefined,
+        rosterKey: u.rosterKey ? String(u.rosterKey) : undefined,
+      })),
+      rotate: body.rotate === true,
+    });
+
+    const convexUrl = process.env.CONVEX_SITE_URL || process.env.CONVEX_URL || "";
+
+    return new Response(JSON.stringify({ convexUrl, users: results }), {
+      status: 201,
+      headers: { "Content-Type": "application/json", "Access-Control-Allow-Origin": "*" },
+    });
+  }),
+});
+
+http.route({
+  path: "/api/onboard/batch",
+  method: "OPTIONS",
+  handler: httpAction(async () => {
+    return new Response(null, {
+      headers: {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Methods": "POST, OPTIONS",
+        "Access-Control-Allow-Headers": "Content-Type, Authorization",
+      },
+    });
+  }),
+});
+
 // CORS preflight
 http.route({
   path: "/api/tasks",
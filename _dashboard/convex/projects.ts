@@ -1,5 +1,25 @@
 import { v } from "convex/values";
-import { mutation, query } from "./_generated/server";
+import { paginationOptsValidator } from "convex/server";
+import { mutation, query, QueryCtx } from "./_generated/server";
+import { Doc } from "./_generated/dataModel";
+import { refreshCommentFilters } from "./tasks";
+
+// Populate creator details and task count
+async function withDetails(ctx: QueryCtx, project: Doc<"projects">) {
+  const creator = await ctx.db.get(project.createdBy);
+
+  // Count tasks in this project
+  const tasks = await ctx.db
+    .query("tasks")
+    .withIndex("by_project", (q) => q.eq("projectId", project._id))
+    .collect();
+
+  return {
+    ...project,
+    createdBy: creator,
+    taskCount: tasks.length,
+  };
+}
 
 // List all projects
 export const list = query({
@@ -7,26 +27,20 @@ export const list = query({
   handler: async (ctx) => {
     const projects = await ctx.db.query("projects").collect();
 
-    // Populate creator details
-    const projectsWithUsers = await Promise.all(
-      projects.map(async (project) => {
-        const creator = await ctx.db.get(project.createdBy);
-
-        // Count tasks in this project
-        const tasks = await ctx.db
-          .query("tasks")
-          .withIndex("by_project", (q) => q.eq("projectId", project._id))
-          .collect();
-
-        return {
-          ...project,
-          createdBy: creator,
-          taskCount: tasks.length,
-        };
-      })
-    );
-
-    return projectsWithUsers;
+    return await Promise.all(projects.map((project) => withDetails(ctx, project)));
+  },
+});
+
+// List one page of projects
+export const listPage = query({
+  args: { paginationOpts: paginationOptsValidator },
+  handler: async (ctx, args) => {
+    const results = await ctx.db.query("projects").paginate(args.paginationOpts);
+
+    return {
+      ...results,
+      page: await Promise.all(results.page.map((project) => withDetails(ctx, project))),
+    };
   },
 });
 
@@ -101,6 +115,16 @@ export const remove = mutation({
     // Remove project reference from all tasks
     for (const task of tasks) {
       await ctx.db.patch(task._id, { projectId: undefined });
+      await refreshCommentFilters(ctx, task._id);
+    }
+
+    const archivedTasks = await ctx.db
+      .query("archivedTasks")
+      .withIndex("by_project", (q) => q.eq("projectId", args.projectId))
+      .collect();
+
+    for (const task of archivedTasks) {
+      await ctx.db.patch(task._id, { projectId: undefined });
     }
 
     await ctx.db.delete(args.projectId);
@@ -0,0 +1,251 @@
+import { v } from "convex/values";
+import { internalMutation, mutation, query, MutationCtx } from "./_generated/server";
+import { Doc } from "./_generated/dataModel";
+import { internal } from "./_generated/api";
+import { commentFilters } from "./tasks";
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Tasks checked per mutation; a rule run reschedules itself until done
+const RULE_BATCH_SIZE = 100;
+
+const kind = v.union(
+  v.literal("overdue"),
+  v.literal("stale_in_progress"),
+  v.literal("unstarted_high_priority")
+);
+
+// Same defaults as examples/task_reminder_agent.py
+const DEFAULT_THRESHOLD_DAYS = {
+  overdue: 0,
+  stale_in_progress: 7,
+  unstarted_high_priority: 0,
+};
+
+// Indexed range scans for the tasks a rule matches, one per status involved.
+// `now` is fixed for a whole run so pagination cursors stay valid.
+function ruleScans(ctx: MutationCtx, rule: Doc<"rules">, now: number) {
+  const cutoff = now - rule.thresholdDays * DAY_MS;
+
+  switch (rule.kind) {
+    case "overdue":
+      return (["todo", "in_progress"] as const).map((status) => () =>
+        ctx.db
+          .query("tasks")
+          .withIndex("by_status_due", (q) =>
+            q.eq("status", status).gte("dueDate", 0).lt("dueDate", cutoff)
+          )
+      );
+    case "stale_in_progress":
+      return [
+        () =>
+          ctx.db
+            .query("tasks")
+            .withIndex("by_status_updated", (q) =>
+              q.eq("status", "in_progress").lt("updatedAt", cutoff)
+            ),
+      ];
+    case "unstarted_high_priority":
+      return [
+        () =>
+          ctx.db
+            .query("tasks")
+            .withIndex("by_status_priority", (q) =>
+              q.eq("status", "todo").eq("priority", "high").lt("_creationTime", cutoff)
+            ),
+      ];
+  }
+}
+
+// Reminder comment text, matching the external reminder agent
+function reminder(rule: Doc<"rules">, task: Doc<"tasks">, assignee: string | null, now: number) {
+  switch (rule.kind) {
+    case "overdue": {
+      const days = Math.floor((now - (task.dueDate ?? now)) / DAY_MS);
+      let message = `⚠️ Reminder: This task is overdue by ${days} day(s). Current status: ${task.status}`;
+      if (assignee) {
+        message += `\n\n@${assignee} - Please update the status or due date.`;
+      }
+      return message;
+    }
+    case "stale_in_progress": {
+      const days = Math.floor((now - task.updatedAt) / DAY_MS);
+      let message = `⏰ Status Check: This task has been in progress for ${days} days without updates.\n\n`;
+      message += assignee
+        ? `@${assignee} - Is this task still being worked on?`
+        : "This task is unassigned. Should it be assigned or moved back to todo?";
+      return message;
+    }
+    case "unstarted_high_priority": {
+      let message = `🔴 High Priority Reminder: This task is marked as high priority but hasn't been started yet.\n\nAssigned to: ${assignee ?? "No one"}`;
+      if (!assignee) {
+        message += "\n\n💡 Tip: Consider assigning this task to someone.";
+      }
+      return message;
+    }
+  }
+}
+
+async function scheduleRuns(ctx: MutationCtx, rules: Doc<"rules">[]) {
+  const startedAt = Date.now();
+  for (const rule of rules) {
+    await ctx.scheduler.runAfter(0, internal.rules.runRule, {
+      ruleId: rule._id,
+      startedAt,
+      stage: 0,
+      cursor: null,
+    });
+  }
+  return rules.length;
+}
+
+// List all rules
+export const list = query({
+  args: {},
+  handler: async (ctx) => {
+    return await ctx.db.query("rules").collect();
+  },
+});
+
+// Create a rule; threshold and name default per kind
+export const create = mutation({
+  args: {
+    kind: kind,
+    authorId: v.id("users"),
+    name: v.optional(v.string()),
+    thresholdDays: v.optional(v.number()),
+    enabled: v.optional(v.boolean()),
+  },
+  handler: async (ctx, args) => {
+    const now = Date.now();
+    return await ctx.db.insert("rules", {
+      name: args.name ?? args.kind,
+      kind: args.kind,
+      thresholdDays: args.thresholdDays ?? DEFAULT_THRESHOLD_DAYS[args.kind],
+      authorId: args.authorId,
+      enabled: args.enabled ?? true,
+      createdAt: now,
+      updatedAt: now,
+    });
+  },
+});
+
+// Update a rule
+export const update = mutation({
+  args: {
+    ruleId: v.id("rules"),
+    name: v.optional(v.string()),
+    thresholdDays: v.optional(v.number()),
+    authorId: v.optional(v.id("users")),
+    enabled: v.optional(v.boolean()),
+  },
+  handler: async (ctx, args) => {
+    const { ruleId, ...updates } = args;
+    await ctx.db.patch(ruleId, { ...updates, updatedAt: Date.now() });
+    return true;
+  },
+});
+
+// Delete a rule and its reminder history
+export const remove = mutation({
+  args: { ruleId: v.id("rules") },
+  handler: async (ctx, args) => {
+    const hits = await ctx.db
+      .query("ruleHits")
+      .withIndex("by_rule_task", (q) => q.eq("ruleId", args.ruleId))
+      .collect();
+
+    for (const hit of hits) {
+      await ctx.db.delete(hit._id);
+    }
+
+    await ctx.db.delete(args.ruleId);
+    return true;
+  },
+});
+
+// Run one rule (or all enabled rules) now instead of waiting for the cron
+export const runNow = mutation({
+  args: { ruleId: v.optional(v.id("rules")) },
+  handler: async (ctx, args) => {
+    if (args.ruleId) {
+      const rule = await ctx.db.get(args.ruleId);
+      return await scheduleRuns(ctx, rule ? [rule] : []);
+    }
+
+    const rules = await ctx.db.query("rules").collect();
+    return await scheduleRuns(ctx, rules.filter((rule) => rule.enabled));
+  },
+});
+
+// Cron entry point: start a run of every enabled rule
+export const sweep = internalMutation({
+  args: {},
+  handler: async (ctx) => {
+    const rules = await ctx.db.query("rules").collect();
+    return await scheduleRuns(ctx, rules.filter((rule) => rule.enabled));
+  },
+});
+
+// Check one page of a rule's matching tasks and comment on the new ones.
+// A task is reminded again only after it has been updated since the last reminder.
+export const runRule = internalMutation({
+  args: {
+    ruleId: v.id("rules"),
+    startedAt: v.number(),
+    stage: v.number(),
+    cursor: v.union(v.string(), v.null()),
+  },
+  handler: async (ctx, args) => {
+    const rule = await ctx.db.get(args.ruleId);
+    if (!rule) return 0;
+
+    const scans = ruleScans(ctx, rule, args.startedAt);
+    const { page, isDone, continueCursor } = await scans[args.stage]().paginate({
+      numItems: RULE_BATCH_SIZE,
+      cursor: args.cursor,
+    });
+
+    let fired = 0;
+
+    for (const task of page) {
+      const hit = await ctx.db
+        .query("ruleHits")
+        .withIndex("by_rule_task", (q) => q.eq("ruleId", rule._id).eq("taskId", task._id))
+        .unique();
+      if (hit && hit.firedAt >= task.updatedAt) continue;
+
+      const assignee = task.assignedTo ? await ctx.db.get(task.assignedTo) : null;
+      const now = Date.now();
+
+      await ctx.db.insert("comments", {
+        taskId: task._id,
+        authorId: rule.authorId,
+        content: reminder(rule, task, assignee?.name ?? null, args.startedAt),
+        createdAt: now,
+        ...commentFilters(task),
+      });
+
+      if (hit) {
+        await ctx.db.patch(hit._id, { firedAt: now });
+      } else {
+        await ctx.db.insert("ruleHits", { ruleId: rule._id, taskId: task._id, firedAt: now });
+      }
+      fired++;
+    }
+
+    if (!isDone) {
+      await ctx.scheduler.runAfter(0, internal.rules.runRule, { ...args, cursor: continueCursor });
+    } else if (args.stage + 1 < scans.length) {
+      await ctx.scheduler.runAfter(0, internal.rules.runRule, {
+        ...args,
+        stage: args.stage + 1,
+        cursor: null,
+      });
+    } else {
+      await ctx.db.patch(rule._id, { lastRunAt: args.startedAt });
+    }
+
+    return fired;
+  },
+});
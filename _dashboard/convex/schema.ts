@@ -11,9 +11,11 @@ export default defineSchema({
     type: v.union(v.literal("human"), v.literal("agent")),
     email: v.optional(v.string()), // For human users
     authId: v.optional(v.string()), // Link to Convex Auth
+    rosterKey: v.optional(v.string()), // Set by bulk onboarding, one user per key
     createdAt: v.number(),
   }).index("by_auth_id", ["authId"])
-    .index("by_email", ["email"]),
+    .index("by_email", ["email"])
+    .index("by_roster_key", ["rosterKey"]),
 
   // API Keys for agent authentication
   apiKeys: defineTable({
@@ -57,10 +59,21 @@ export default defineSchema({
     createdBy: v.id("users"),
     createdAt: v.number(),
     updatedAt: v.number(),
+    searchText: v.optional(v.string()), // title + description, for full-text search
   })
     .index("by_status", ["status"])
     .index("by_assignee", ["assignedTo"])
-    .index("by_project", ["projectId"]),
+    .index("by_project", ["projectId"])
+    .index("by_status_priority", ["status", "priority"])
+    // claim reads the unassigned (or caller's) todo tasks of one priority directly
+    .index("by_status_assigned_priority", ["status", "assignedTo", "priority"])
+    .index("by_project_status_assigned_priority", ["projectId", "status", "assignedTo", "priority"])
+    .index("by_status_updated", ["status", "updatedAt"])
+    .index("by_status_due", ["status", "dueDate"])
+    .searchIndex("search_text", {
+      searchField: "searchText",
+      filterFields: ["status", "projectId"],
+    }),
 
   // Comments
   comments: defineTable({
@@ -68,6 +81,86 @@ export default defineSchema({
     authorId: v.id("users"),
     content: v.string(),
     createdAt: v.number(),
+    // Copied from the parent task (see tasks.refreshCommentFilters), so comment
+    // search can filter by them
+    taskStatus: v.optional(
+      v.union(
+        v.literal("todo"),
+        v.literal("in_progress"),
+        v.literal("done")
+      )
+    ),
+    projectId: v.optional(v.id("projects")),
+  })
+    .index("by_task", ["taskId"])
+    .searchIndex("search_content", {
+      searchField: "content",
+      filterFields: ["taskId", "taskStatus", "projectId"],
+    }),
+
+  // Archive - done tasks moved out of the hot tables by archive.sweep
+  archivedTasks: defineTable({
+    taskId: v.id("tasks"), // Original task id, still used by clients
+    title: v.string(),
+    description: v.string(),
+    status: v.literal("done"),
+    priority: v.union(
+      v.literal("low"),
+      v.literal("medium"),
+      v.literal("high")
+    ),
+    projectId: v.optional(v.id("projects")),
+    dueDate: v.optional(v.number()),
+    assignedTo: v.optional(v.id("users")),
+    createdBy: v.id("users"),
+    createdAt: v.number(),
+    updatedAt: v.number(),
+    searchText: v.optional(v.string()),
+    archivedAt: v.number(),
+  })
+    .index("by_task", ["taskId"])
+    .index("by_project", ["projectId"]),
+
+  archivedComments: defineTable({
+    commentId: v.id("comments"), // Original comment id
+    taskId: v.id("tasks"),
+    authorId: v.id("users"),
+    content: v.string(),
+    createdAt: v.number(),
+    archivedAt: v.number(),
+  }).index("by_task", ["taskId"]),
+
+  // Queued ops already applied by batch.apply, keyed by the client's op key,
+  // so a batch replayed after a lost response is not applied twice
+  batchOps: defineTable({
+    key: v.string(),
+    taskId: v.optional(v.id("tasks")), // Task a create_task op inserted
+    appliedAt: v.number(),
   })
-    .index("by_task", ["taskId"]),
+    .index("by_key", ["key"])
+    .index("by_applied", ["appliedAt"]),
+
+  // Reminder rules evaluated in-database by rules.sweep
+  rules: defineTable({
+    name: v.string(),
+    kind: v.union(
+      v.literal("overdue"),
+      v.literal("stale_in_progress"),
+      v.literal("unstarted_high_priority")
+    ),
+    thresholdDays: v.number(), // Days past due / without update / since created
+    authorId: v.id("users"), // Posts the reminder comments
+    enabled: v.boolean(),
+    lastRunAt: v.optional(v.number()),
+    createdAt: v.number(),
+    updatedAt: v.number(),
+  }),
+
+  // One row per task a rule has reminded about, so a task is only reminded
+  // again after it has been updated
+  ruleHits: defineTable({
+    ruleId: v.id("rules"),
+    taskId: v.id("tasks"),
+    firedAt: v.number(),
+  }).index("by_rule_task", ["ruleId", "taskId"]),
 });
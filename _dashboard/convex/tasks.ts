@@ -1,5 +1,33 @@
 import { v } from "convex/values";
-import { mutation, query } from "./_generated/server";
+import { paginationOptsValidator } from "convex/server";
+import { internalMutation, mutation, query, MutationCtx, QueryCtx } from "./_generated/server";
+import { Doc, Id } from "./_generated/dataModel";
+import { internal } from "./_generated/api";
+
+const status = v.union(v.literal("todo"), v.literal("in_progress"), v.literal("done"));
+const priority = v.union(v.literal("low"), v.literal("medium"), v.literal("high"));
+
+// Order in which claim hands out work
+const CLAIM_PRIORITIES = ["high", "medium", "low"] as const;
+
+// Single field covering title and description, so one search index serves both
+export function searchText(title: string, description: string) {
+  return `${title}\n${description}`;
+}
+
+// Populate assignedTo user details and project
+export async function withDetails(ctx: QueryCtx, task: Doc<"tasks">) {
+  const assignee = task.assignedTo ? await ctx.db.get(task.assignedTo) : null;
+  const creator = await ctx.db.get(task.createdBy);
+  const project = task.projectId ? await ctx.db.get(task.projectId) : null;
+
+  return {
+    ...task,
+    assignedTo: assignee,
+    createdBy: creator,
+    project: project,
+  };
+}
 
 // List all tasks (optionally filter by project)
 export const list = query({
@@ -20,27 +48,29 @@ export const list = query({
       tasks = await ctx.db.query("tasks").collect();
     }
 
-    // Populate assignedTo user details and project
-    const tasksWithDetails = await Promise.all(
-      tasks.map(async (task) => {
-        const assignee = task.assignedTo
-          ? await ctx.db.get(task.assignedTo)
-          : null;
-        const creator = await ctx.db.get(task.createdBy);
-        const project = task.projectId
-          ? await ctx.db.get(task.projectId)
-          : null;
+    return await Promise.all(tasks.map((task) => withDetails(ctx, task)));
+  },
+});
 
-        return {
-          ...task,
-          assignedTo: assignee,
-          createdBy: creator,
-          project: project,
-        };
-      })
-    );
+// List one page of tasks (optionally filter by project) so agents can
+// stream large backlogs instead of loading every task in a single response
+export const listPage = query({
+  args: {
+    projectId: v.optional(v.id("projects")),
+    paginationOpts: paginationOptsValidator,
+  },
+  handler: async (ctx, args) => {
+    const results = args.projectId
+      ? await ctx.db
+          .query("tasks")
+          .withIndex("by_project", (q) => q.eq("projectId", args.projectId))
+          .paginate(args.paginationOpts)
+      : await ctx.db.query("tasks").paginate(args.paginationOpts);
 
-    return tasksWithDetails;
+    return {
+      ...results,
+      page: await Promise.all(results.page.map((task) => withDetails(ctx, task))),
+    };
   },
 });
 
@@ -104,6 +134,7 @@ export const create = mutation({
       assignedTo: args.assignedTo,
       createdAt: Date.now(),
       updatedAt: Date.now(),
+      searchText: searchText(args.title, args.description),
     });
 
     return taskId;
@@ -134,6 +165,171 @@ export const update = mutation({
       updatedAt: Date.now(),
     });
 
+    if (updates.title !== undefined || updates.description !== undefined) {
+      await refreshSearchText(ctx, taskId);
+    }
+    if (updates.status !== undefined || updates.projectId !== undefined) {
+      await refreshCommentFilters(ctx, taskId);
+    }
+
     return taskId;
   },
 });
+
+// Atomically claim the next todo task for a user: highest priority first,
+// oldest first within a priority. Only unassigned tasks (or tasks already
+// assigned to the caller) are eligible. The claimed task is assigned to the
+// caller and moved to in_progress in the same transaction, so two agents can
+// never claim the same task.
+export const claim = mutation({
+  args: {
+    userId: v.id("users"),
+    projectId: v.optional(v.id("projects")),
+    priority: v.optional(priority),
+  },
+  handler: async (ctx, args) => {
+    // Oldest todo task of one priority with exactly this assignee, read
+    // straight from the index (no scanning past other agents' tasks)
+    const oldest = (p: Doc<"tasks">["priority"], assignedTo: Id<"users"> | undefined) =>
+      args.projectId
+        ? ctx.db
+            .query("tasks")
+            .withIndex("by_project_status_assigned_priority", (q) =>
+              q.eq("projectId", args.projectId).eq("status", "todo").eq("assignedTo", assignedTo).eq("priority", p)
+            )
+            .order("asc")
+            .first()
+        : ctx.db
+            .query("tasks")
+            .withIndex("by_status_assigned_priority", (q) =>
+              q.eq("status", "todo").eq("assignedTo", assignedTo).eq("priority", p)
+            )
+            .order("asc")
+            .first();
+
+    for (const p of args.priority ? [args.priority] : CLAIM_PRIORITIES) {
+      const [unassigned, mine] = await Promise.all([oldest(p, undefined), oldest(p, args.userId)]);
+      const task =
+        unassigned && mine
+          ? unassigned._creationTime <= mine._creationTime ? unassigned : mine
+          : unassigned ?? mine;
+
+      if (task) {
+        await ctx.db.patch(task._id, {
+          status: "in_progress",
+          assignedTo: args.userId,
+          updatedAt: Date.now(),
+        });
+        await refreshCommentFilters(ctx, task._id);
+        const claimed = await ctx.db.get(task._id);
+        return claimed && (await withDetails(ctx, claimed));
+      }
+    }
+
+    return null;
+  },
+});
+
+// Keep searchText in sync after a title/description change
+export async function refreshSearchText(ctx: MutationCtx, taskId: Id<"tasks">) {
+  const task = await ctx.db.get(taskId);
+  if (task) {
+    await ctx.db.patch(taskId, { searchText: searchText(task.title, task.description) });
+  }
+}
+
+// Fields comments copy from their task, for filtering comment search
+export function commentFilters(task: Doc<"tasks">) {
+  return { taskStatus: task.status, projectId: task.projectId };
+}
+
+// Keep the copied fields of a task's comments in sync after a status/project change
+export async function refreshCommentFilters(ctx: MutationCtx, taskId: Id<"tasks">) {
+  const task = await ctx.db.get(taskId);
+  if (!task) return;
+
+  const filters = commentFilters(task);
+  const comments = await ctx.db
+    .query("comments")
+    .withIndex("by_task", (q) => q.eq("taskId", taskId))
+    .collect();
+
+  for (const comment of comments) {
+    if (comment.taskStatus !== filters.taskStatus || comment.projectId !== filters.projectId) {
+      await ctx.db.patch(comment._id, filters);
+    }
+  }
+}
+
+// Full-text search over task titles and descriptions
+export const search = query({
+  args: {
+    query: v.string(),
+    status: v.optional(status),
+    projectId: v.optional(v.id("projects")),
+    paginationOpts: paginationOptsValidator,
+  },
+  handler: async (ctx, args) => {
+    const results = await ctx.db
+      .query("tasks")
+      .withSearchIndex("search_text", (q) => {
+        let search = q.search("searchText", args.query);
+        if (args.status) search = search.eq("status", args.status);
+        if (args.projectId) search = search.eq("projectId", args.projectId);
+        return search;
+      })
+      .paginate(args.paginationOpts);
+
+    return {
+      ...results,
+      page: await Promise.all(results.page.map((task) => withDetails(ctx, task))),
+    };
+  },
+});
+
+// One-off backfill of searchText for tasks created before search existed:
+// npx convex run tasks:backfillSearchText
+export const backfillSearchText = internalMutation({
+  args: { cursor: v.optional(v.union(v.string(), v.null())) },
+  handler: async (ctx, args) => {
+    const results = await ctx.db
+      .query("tasks")
+      .paginate({ numItems: 200, cursor: args.cursor ?? null });
+
+    for (const task of results.page) {
+      if (task.searchText === undefined) {
+        await ctx.db.patch(task._id, { searchText: searchText(task.title, task.description) });
+      }
+    }
+
+    if (!results.isDone) {
+      await ctx.scheduler.runAfter(0, internal.tasks.backfillSearchText, {
+        cursor: results.continueCursor,
+      });
+    }
+  },
+});
+
+// One-off backfill of the task fields copied onto comments created before
+// comment search could filter by them: npx convex run tasks:backfillCommentFilters
+export const backfillCommentFilters = internalMutation({
+  args: { cursor: v.optional(v.union(v.string(), v.null())) },
+  handler: async (ctx, args) => {
+    const results = await ctx.db
+      .query("comments")
+      .paginate({ numItems: 200, cursor: args.cursor ?? null });
+
+    for (const comment of results.page) {
+      const task = await ctx.db.get(comment.taskId);
+      if (task && comment.taskStatus === undefined) {
+        await ctx.db.patch(comment._id, commentFilters(task));
+      }
+    }
+
+    if (!results.isDone) {
+      await ctx.scheduler.runAfter(0, internal.tasks.backfillCommentFilters, {
+        cursor: results.continueCursor,
+      });
+    }
+  },
+});
@@ -11,25 +11,44 @@ Usage:
 Environment Variables:
   CONVEX_URL      - Your Convex deployment URL
   DEMO_USER_ID    - Bot user ID
+  API_KEY         - API key (required by deployments that authenticate /api/tasks)
 """
 
 import requests
 import os
+import sys
 from datetime import datetime, timedelta
 
+# Shared streaming decoder lives next to agent_cli.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from mc_stream import iter_response_array
+
+# Tasks fetched per request
+PAGE_SIZE = 100
+
 
 class MissionControlAPI:
     """Wrapper for Mission Control API"""
 
-    def __init__(self, base_url, user_id):
+    def __init__(self, base_url, user_id, api_key=None):
         self.base_url = base_url.rstrip("/")
         self.user_id = user_id
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
 
-    def list_tasks(self):
-        """Get all tasks"""
-        response = requests.get(f"{self.base_url}/api/tasks")
-        response.raise_for_status()
-        return response.json()
+    def iter_tasks(self):
+        """Yield all tasks one at a time, decoding each page as it streams in"""
+        params = {"limit": PAGE_SIZE}
+
+        while True:
+            with requests.get(
+                f"{self.base_url}/api/tasks", params=params, headers=self.headers, stream=True
+            ) as response:
+                response.raise_for_status()
+                yield from iter_response_array(response)
+
+            if response.headers.get("X-Is-Done", "true") == "true":
+                return
+            params["cursor"] = response.headers["X-Continue-Cursor"]
 
     def create_task(self, title, description, priority="medium", assignee=None):
         """Create a new task"""
@@ -64,19 +83,22 @@ class MissionControlAPI:
 
 def generate_standup_summary(api):
     """Generate a summary of completed tasks"""
-    tasks = api.list_tasks()
-
     # Get tasks completed in the last 24 hours
     yesterday = datetime.now() - timedelta(days=1)
     yesterday_timestamp = yesterday.timestamp() * 1000
 
-    completed_tasks = [
-        task
-        for task in tasks
-        if task["status"] == "done" and task["updatedAt"] > yesterday_timestamp
-    ]
+    completed_tasks = []
+    in_progress_tasks = []
+    todo_count = 0
 
-    in_progress_tasks = [task for task in tasks if task["status"] == "in_progress"]
+    # Single pass over the task stream, keeping only the tasks the summary lists
+    for task in api.iter_tasks():
+        if task["status"] == "done" and task["updatedAt"] > yesterday_timestamp:
+            completed_tasks.append(task)
+        elif task["status"] == "in_progress":
+            in_progress_tasks.append(task)
+        elif task["status"] == "todo":
+            todo_count += 1
 
     summary = []
     summary.append(f"# Daily Standup - {datetime.now().strftime('%A, %B %d, %Y')}\n")
@@ -99,8 +121,7 @@ def generate_standup_summary(api):
     else:
         summary.append("- No tasks in progress")
 
-    todo_tasks = [task for task in tasks if task["status"] == "todo"]
-    summary.append(f"\n## ⏳ Todo: {len(todo_tasks)} tasks")
+    summary.append(f"\n## ⏳ Todo: {todo_count} tasks")
 
     return "\n".join(summary)
 
@@ -132,7 +153,7 @@ def main():
         return 1
 
     # Initialize API client
-    api = MissionControlAPI(convex_url, user_id)
+    api = MissionControlAPI(convex_url, user_id, os.getenv("API_KEY"))
 
     # Create standup task
     try:
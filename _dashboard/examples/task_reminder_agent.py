@@ -11,25 +11,44 @@ Usage:
 Environment Variables:
   CONVEX_URL      - Your Convex deployment URL
   DEMO_USER_ID    - Bot user ID
+  API_KEY         - API key (required by deployments that authenticate /api/tasks)
 """
 
 import requests
 import os
+import sys
 from datetime import datetime
 
+# Shared streaming decoder lives next to agent_cli.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from mc_stream import iter_response_array
+
+# Tasks fetched per request
+PAGE_SIZE = 100
+
 
 class MissionControlAPI:
     """Wrapper for Mission Control API"""
 
-    def __init__(self, base_url, user_id):
+    def __init__(self, base_url, user_id, api_key=None):
         self.base_url = base_url.rstrip("/")
         self.user_id = user_id
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
 
-    def list_tasks(self):
-        """Get all tasks"""
-        response = requests.get(f"{self.base_url}/api/tasks")
-        response.raise_for_status()
-        return response.json()
+    def iter_tasks(self):
+        """Yield all tasks one at a time, decoding each page as it streams in"""
+        params = {"limit": PAGE_SIZE}
+
+        while True:
+            with requests.get(
+                f"{self.base_url}/api/tasks", params=params, headers=self.headers, stream=True
+            ) as response:
+                response.raise_for_status()
+                yield from iter_response_array(response)
+
+            if response.headers.get("X-Is-Done", "true") == "true":
+                return
+            params["cursor"] = response.headers["X-Continue-Cursor"]
 
     def add_comment(self, task_id, content):
         """Add a comment to a task"""
@@ -49,12 +68,11 @@ class MissionControlAPI:
 
 def check_overdue_tasks(api):
     """Find and remind about overdue tasks"""
-    tasks = api.list_tasks()
     now = datetime.now().timestamp() * 1000
 
     overdue_count = 0
 
-    for task in tasks:
+    for task in api.iter_tasks():
         # Skip completed tasks
         if task["status"] == "done":
             continue
@@ -78,10 +96,9 @@ def check_overdue_tasks(api):
 
 def check_high_priority_todo(api):
     """Remind about high-priority tasks that haven't been started"""
-    tasks = api.list_tasks()
     reminder_count = 0
 
-    for task in tasks:
+    for task in api.iter_tasks():
         # Look for high-priority tasks still in "todo" status
         if task["priority"] == "high" and task["status"] == "todo":
             assignee_name = task.get("assignedTo", {}).get("name", "No one")
@@ -100,13 +117,12 @@ def check_high_priority_todo(api):
 
 def check_stale_in_progress(api):
     """Find tasks stuck in 'in_progress' for too long"""
-    tasks = api.list_tasks()
     now = datetime.now().timestamp() * 1000
     stale_threshold = 7 * 24 * 60 * 60 * 1000  # 7 days in milliseconds
 
     stale_count = 0
 
-    for task in tasks:
+    for task in api.iter_tasks():
         if task["status"] == "in_progress":
             time_in_progress = now - task["updatedAt"]
 
@@ -137,7 +153,7 @@ def main():
         return 1
 
     # Initialize API client
-    api = MissionControlAPI(convex_url, user_id)
+    api = MissionControlAPI(convex_url, user_id, os.getenv("API_KEY"))
 
     print("🤖 Task Reminder Agent Starting...\n")
 
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Compact task/project models for client-side Mission Control snapshots
+
+The HTTP API embeds the full assignee, creator and project documents in
+every task. Agents that keep thousands of tasks in memory can load them
+into these slotted records instead: a Snapshot interns users and projects
+by id so each one exists once, and enum fields (status, priority, user
+type) are stored as small ints.
+
+    snapshot = Snapshot.from_tasks(api.iter_tasks())
+    todo = [task for task in snapshot.tasks.values() if task.status == "todo"]
+"""
+
+STATUSES = ("todo", "in_progress", "done")
+PRIORITIES = ("low", "medium", "high")
+USER_TYPES = ("human", "agent")
+
+_STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+_PRIORITY_CODES = {name: code for code, name in enumerate(PRIORITIES)}
+_USER_TYPE_CODES = {name: code for code, name in enumerate(USER_TYPES)}
+
+
+def _decode(names, code):
+    return names[code] if code is not None else None
+
+
+class User:
+    __slots__ = ("id", "name", "_type", "email", "created_at")
+
+    def __init__(self, id, name=None, type=None, email=None, created_at=None):
+        self.id = id
+        self.name = name
+        self._type = _USER_TYPE_CODES.get(type)
+        self.email = email
+        self.created_at = created_at
+
+    @property
+    def type(self):
+        return _decode(USER_TYPES, self._type)
+
+    def to_dict(self):
+        return {"_id": self.id, "name": self.name, "type": self.type, "email": self.email, "createdAt": self.created_at}
+
+    def __repr__(self):
+        return f"User({self.id!r}, {self.name!r})"
+
+
+class Project:
+    __slots__ = ("id", "name", "description", "color", "created_by", "created_at", "updated_at")
+
+    def __init__(self, id, name=None, description=None, color=None, created_by=None, created_at=None, updated_at=None):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.color = color
+        self.created_by = created_by
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def to_dict(self):
+        return {
+            "_id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "color": self.color,
+            "createdBy": self.created_by.id if self.created_by else None,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+        }
+
+    def __repr__(self):
+        return f"Project({self.id!r}, {self.name!r})"
+
+
+class Task:
+    __slots__ = (
+        "id", "title", "description", "_status", "_priority", "project",
+        "assigned_to", "created_by", "due_date", "created_at", "updated_at",
+    )
+
+    def __init__(self, id, title, description, status, priority, project=None,
+                 assigned_to=None, created_by=None, due_date=None, created_at=None, updated_at=None):
+        self.id = id
+        self.title = title
+        self.description = description
+        self._status = _STATUS_CODES[status]
+        self._priority = _PRIORITY_CODES[priority]
+        self.project = project
+        self.assigned_to = assigned_to
+        self.created_by = created_by
+        self.due_date = due_date
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @property
+    def status(self):
+        return STATUSES[self._status]
+
+    @status.setter
+    def status(self, value):
+        self._status = _STATUS_CODES[value]
+
+    @property
+    def priority(self):
+        return PRIORITIES[self._priority]
+
+    @priority.setter
+    def priority(self, value):
+        self._priority = _PRIORITY_CODES[value]
+
+    def to_dict(self):
+        """Rebuild the API's joined task document."""
+        return {
+            "_id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": self.status,
+            "priority": self.priority,
+            "projectId": self.project.id if self.project else None,
+            "project": self.project.to_dict() if self.project else None,
+            "assignedTo": self.assigned_to.to_dict() if self.assigned_to else None,
+            "createdBy": self.created_by.to_dict() if self.created_by else None,
+            "dueDate": self.due_date,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+        }
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.title!r}, {self.status!r})"
+
+
+class Comment:
+    __slots__ = ("id", "task_id", "author", "content", "created_at")
+
+    def __init__(self, id, task_id, author, content, created_at=None):
+        self.id = id
+        self.task_id = task_id
+        self.author = author
+        self.content = content
+        self.created_at = created_at
+
+    def to_dict(self):
+        return {
+            "_id": self.id,
+            "taskId": self.task_id,
+            "author": self.author.to_dict() if self.author else None,
+            "content": self.content,
+            "createdAt": self.created_at,
+        }
+
+    def __repr__(self):
+        return f"Comment({self.id!r}, task={self.task_id!r})"
+
+
+class Snapshot:
+    """Tasks keyed by id, with users and projects interned by id.
+
+    Users and projects may first be seen as bare ids (e.g. a project's
+    createdBy inside a task); the shared record is filled in when the full
+    document shows up, so every task keeps pointing at the same object.
+    """
+
+    __slots__ = ("users", "projects", "tasks")
+
+    def __init__(self):
+        self.users = {}
+        self.projects = {}
+        self.tasks = {}
+
+    @classmethod
+    def from_tasks(cls, docs):
+        """Build a snapshot from an iterable of API task documents (e.g. a stream)."""
+        snapshot = cls()
+        for doc in docs:
+            snapshot.add_task(doc)
+        return snapshot
+
+    def user(self, doc):
+        """Return the interned User for a user document or id."""
+        if not doc:
+            return None
+
+        user_id = doc if isinstance(doc, str) else doc["_id"]
+        user = self.users.get(user_id)
+        if user is None:
+            user = self.users[user_id] = User(user_id)
+
+        if not isinstance(doc, str) and user.name is None:
+            user.name = doc.get("name")
+            user._type = _USER_TYPE_CODES.get(doc.get("type"))
+            user.email = doc.get("email")
+            user.created_at = doc.get("createdAt")
+
+        return user
+
+    def project(self, doc):
+        """Return the interned Project for a project document or id."""
+        if not doc:
+            return None
+
+        project_id = doc if isinstance(doc, str) else doc["_id"]
+        project = self.projects.get(project_id)
+        if project is None:
+            project = self.projects[project_id] = Project(project_id)
+
+        if not isinstance(doc, str) and project.name is None:
+            project.name = doc.get("name")
+            project.description = doc.get("description")
+            project.color = doc.get("color")
+            project.created_by = self.user(doc.get("createdBy"))
+            project.created_at = doc.get("createdAt")
+            project.updated_at = doc.get("updatedAt")
+
+        return project
+
+    def add_task(self, doc):
+        """Add (or replace) a task from an API task document."""
+        task = Task(
+            doc["_id"],
+            doc["title"],
+            doc["description"],
+            doc["status"],
+            doc["priority"],
+            project=self.project(doc.get("project") or doc.get("projectId")),
+            assigned_to=self.user(doc.get("assignedTo")),
+            created_by=self.user(doc.get("createdBy")),
+            due_date=doc.get("dueDate"),
+            created_at=doc.get("createdAt"),
+            updated_at=doc.get("updatedAt"),
+        )
+        self.tasks[task.id] = task
+        return task
+
+    def comment(self, doc):
+        """Build a Comment from an API comment document, interning its author."""
+        return Comment(
+            doc["_id"],
+            doc["taskId"],
+            self.user(doc.get("author") or doc.get("authorId")),
+            doc["content"],
+            doc.get("createdAt"),
+        )
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON decoding for Mission Control API responses
+
+List endpoints return a top-level JSON array. Instead of holding the raw
+body and the fully decoded list in memory, these helpers decode the array
+from the response stream and yield one element at a time, so memory stays
+bounded by the size of a single record.
+"""
+
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_whitespace = " \t\n\r"
+_delimiters = ",]" + _whitespace
+
+
+def iter_json_array(chunks):
+    """Yield the elements of a top-level JSON array from an iterable of text chunks.
+
+    Raises ValueError for a body that is not a well-formed array, such as a
+    missing or doubled comma, a trailing comma, or a truncated stream.
+    """
+    chunks = iter(chunks)
+    buf = ""
+    pos = 0
+    # What may come next: "[" (start), a value or "]" (first), a value
+    # (value), or "," / "]" (after)
+    expect = "start"
+    eof = False
+
+    while True:
+        while pos < len(buf) and buf[pos] in _whitespace:
+            pos += 1
+
+        if pos < len(buf):
+            ch = buf[pos]
+
+            if expect == "start":
+                if ch != "[":
+                    raise ValueError("Expected a JSON array")
+                expect = "first"
+                pos += 1
+                continue
+
+            if expect == "after":
+                if ch == "]":
+                    return
+                if ch != ",":
+                    raise ValueError(f"Expected ',' or ']' after an array element, got {ch!r}")
+                expect = "value"
+                pos += 1
+                continue
+
+            if ch == "]" and expect == "first":
+                return
+            if ch in ",]":
+                raise ValueError(f"Expected an array element, got {ch!r}")
+
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Element is split across chunks: read more and retry
+                if eof:
+                    raise
+            else:
+                # Only accept a value followed by a delimiter: a number cut at the
+                # chunk edge ("12" of "123", "4." of "4.5") still decodes
+                if eof or (end < len(buf) and buf[end] in _delimiters):
+                    yield value
+                    pos = end
+                    expect = "after"
+                    continue
+
+        if eof:
+            raise ValueError("Truncated JSON array")
+
+        # Drop what has already been decoded before appending the next chunk
+        buf = buf[pos:]
+        pos = 0
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+        else:
+            buf += chunk
+
+
+def iter_response_array(response, chunk_size=CHUNK_SIZE):
+    """Yield the elements of a JSON array body from a streamed `requests` response."""
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    def text_chunks():
+        for chunk in response.iter_content(chunk_size):
+            yield utf8.decode(chunk)
+        yield utf8.decode(b"", final=True)
+
+    return iter_json_array(text_chunks())
@@ -8,13 +8,30 @@ Usage:
   python onboard.py                        # interactive prompts
   python onboard.py "My Agent" agent       # non-interactive
   python onboard.py "Alice" human          # human user
+
+Bulk onboarding from a CSV roster (columns: name, type, keyName — only name
+is required) writes one .env file per user, or a single JSON secrets file.
+It needs an API key with the admin permission (API_KEY or --api-key):
+  python onboard.py --from roster.csv --out-dir agents/
+  python onboard.py --from roster.csv --secrets secrets.json --concurrency 8
 """
 
+import argparse
+import csv
+import re
 import sys
 import os
 import json
 import urllib.request
 import urllib.error
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Users created per /api/onboard/batch request (server limit: 100)
+CHUNK_SIZE = 25
+
+# Roster chunks in flight at once
+CONCURRENCY = 4
 
 def load_convex_url():
     """Try to read CONVEX_URL from .env.local or environment."""
@@ -34,16 +51,19 @@ def load_convex_url():
     return None
 
 
-def onboard(name, user_type="agent", key_name=None, convex_url=None):
-    if not convex_url:
-        convex_url = load_convex_url()
+def require_convex_url(convex_url=None):
+    convex_url = convex_url or load_convex_url()
 
     if not convex_url:
         print("ERROR: Could not find CONVEX_URL.")
         print("  Run 'npx convex dev' first, or set CONVEX_URL in your environment.")
         sys.exit(1)
 
-    convex_url = convex_url.rstrip("/")
+    return convex_url.rstrip("/")
+
+
+def onboard(name, user_type="agent", key_name=None, convex_url=None):
+    convex_url = require_convex_url(convex_url)
     endpoint = f"{convex_url}/api/onboard"
 
     payload = json.dumps({
@@ -98,16 +118,220 @@ USER_ID={result['userId']}
     print()
 
 
+# ============ BULK ONBOARDING ============
+
+def read_roster(path):
+    """Read roster rows (name, type, keyName) from a CSV file with a header row."""
+    with open(path, newline="") as f:
+        rows = []
+        for row in csv.DictReader(f):
+            row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+            if not row.get("name"):
+                continue
+            rows.append({
+                "name": row["name"],
+                "type": "human" if row.get("type", "").lower() == "human" else "agent",
+                "keyName": row.get("keyName") or row.get("key_name") or None,
+            })
+        return rows
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "user"
+
+
+def run_id_path(out_dir=None, secrets_path=None):
+    return os.path.join(out_dir, ".roster-run") if out_dir else f"{secrets_path}.run"
+
+
+def load_run_id(path):
+    """The id of this roster run, created on first use and kept next to the output.
+
+    Roster keys are the run id plus each user's slug, so repeating a run finds
+    the users it already created, while another roster (or another output
+    directory) with the same names gets users of its own.
+    """
+    if os.path.exists(path):
+        with open(path) as f:
+            return f.read().strip()
+
+    run_id = uuid.uuid4().hex
+    write_private(path, run_id + "\n")
+    return run_id
+
+
+def post_chunk(endpoint, api_key, users, rotate=False):
+    """Create one chunk of users + keys; raises on any HTTP or network error."""
+    req = urllib.request.Request(
+        endpoint,
+        data=json.dumps({"users": users, "rotate": rotate}).encode(),
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        return json.loads(resp.read())
+
+
+def env_block(convex_url, user):
+    return f"CONVEX_URL={convex_url}\nAPI_KEY={user['apiKey']}\nUSER_ID={user['userId']}\n"
+
+
+def write_private(path, text):
+    """Write a credentials file readable only by the current user."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+
+
+def onboard_roster(roster_path, out_dir=None, secrets_path=None, api_key=None, rotate=False,
+                   chunk_size=CHUNK_SIZE, concurrency=CONCURRENCY, convex_url=None):
+    """Onboard every user in a CSV roster through the batch route.
+
+    Users that already have credentials in the output (an .env file in
+    out_dir, or an entry in the secrets file) are skipped, so an interrupted
+    run can simply be repeated. Each user is sent with a roster key (this
+    run's id plus the slug of its name), so a chunk that failed after the
+    server committed it is not created twice on the retry. The server never
+    hands back a key it issued before: such users are reported, and
+    `rotate` replaces their key with a new one.
+    """
+    convex_url = require_convex_url(convex_url)
+    endpoint = f"{convex_url}/api/onboard/batch"
+
+    if not api_key:
+        print("ERROR: Bulk onboarding needs an admin API key (set API_KEY or pass --api-key).")
+        return 1
+
+    roster = read_roster(roster_path)
+    secrets = {}
+
+    if out_dir:
+        os.makedirs(out_dir, mode=0o700, exist_ok=True)
+        done = {name[:-4] for name in os.listdir(out_dir) if name.endswith(".env")}
+    else:
+        if os.path.exists(secrets_path):
+            with open(secrets_path) as f:
+                secrets = json.load(f)
+        done = {slugify(name) for name in secrets}
+
+    run_id = load_run_id(run_id_path(out_dir, secrets_path))
+
+    pending = []
+    seen = set()
+    for user in roster:
+        slug = slugify(user["name"])
+        if slug in seen:
+            print(f"WARNING: duplicate roster name '{user['name']}', skipping")
+            continue
+        seen.add(slug)
+        if slug not in done:
+            pending.append(dict(user, rosterKey=f"{run_id}:{slug}"))
+
+    skipped = len(seen) - len(pending)
+    if skipped:
+        print(f"Skipping {skipped} users that already have credentials")
+    if not pending:
+        print("Nothing to onboard.")
+        return 0
+
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    print(f"Onboarding {len(pending)} users in {len(chunks)} chunks ({concurrency} concurrent) via {endpoint}")
+
+    created = 0
+    rotated = 0
+    failed = []
+    lost = []
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(post_chunk, endpoint, api_key, chunk, rotate): chunk for chunk in chunks}
+
+        # Results are written from this thread only, as each chunk completes
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                result = future.result()
+            except urllib.error.HTTPError as e:
+                print(f"ERROR {e.code} for chunk starting at '{chunk[0]['name']}': {e.read().decode()}")
+                failed.extend(chunk)
+                continue
+            except (urllib.error.URLError, OSError) as e:
+                print(f"ERROR: chunk starting at '{chunk[0]['name']}' failed: {e}")
+                failed.extend(chunk)
+                continue
+
+            url = result["convexUrl"] or convex_url
+            for user in result["users"]:
+                if "apiKey" not in user:
+                    # Created by an earlier attempt whose response never arrived
+                    lost.append(user["name"])
+                    continue
+                if user.get("existing"):
+                    rotated += 1
+                if out_dir:
+                    write_private(os.path.join(out_dir, f"{slugify(user['name'])}.env"), env_block(url, user))
+                else:
+                    secrets[user["name"]] = {
+                        "CONVEX_URL": url,
+                        "API_KEY": user["apiKey"],
+                        "USER_ID": user["userId"],
+                        "KEY_ID": user["keyId"],
+                    }
+            created += sum(1 for user in result["users"] if "apiKey" in user)
+
+            # Save after every chunk so a crash never loses keys already issued
+            if secrets_path:
+                write_private(secrets_path, json.dumps(secrets, indent=2) + "\n")
+
+            print(f"  {created}/{len(pending)} onboarded")
+
+    print()
+    print(f"Onboarded {created} users + API keys -> {out_dir or secrets_path}")
+    if rotated:
+        print(f"  ({rotated} of them already existed on the server and got a new key)")
+    if lost:
+        print(f"NO KEY: {len(lost)} users were created by an earlier attempt whose keys never arrived:")
+        for name in lost:
+            print(f"  {name}")
+        print("  Re-run with --rotate to issue them new keys.")
+    if failed:
+        print(f"FAILED: {len(failed)} users (re-run the same command to retry them)")
+    if lost or failed:
+        return 1
+
+    print("WARNING: These files contain API keys — keep them out of version control.")
+    return 0
+
+
 def main():
-    args = sys.argv[1:]
+    parser = argparse.ArgumentParser(description="Create Mission Control users + API keys.")
+    parser.add_argument("name", nargs="?", help="user or agent name")
+    parser.add_argument("type", nargs="?", help="agent (default) or human")
+    parser.add_argument("--from", dest="roster", metavar="CSV", help="bulk onboard every row of a roster CSV")
+    parser.add_argument("--out-dir", help="write one <name>.env file per user into this directory")
+    parser.add_argument("--secrets", help="write all credentials into this JSON file")
+    parser.add_argument("--api-key", default=os.getenv("API_KEY"), help="admin API key for --from (default: $API_KEY)")
+    parser.add_argument("--rotate", action="store_true", help="issue new keys for users an earlier attempt created but whose keys were lost")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"users per request (default: {CHUNK_SIZE})")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help=f"requests in flight (default: {CONCURRENCY})")
+    args = parser.parse_args()
+
+    if args.roster:
+        if bool(args.out_dir) == bool(args.secrets):
+            parser.error("--from needs exactly one of --out-dir or --secrets")
+        sys.exit(onboard_roster(
+            args.roster,
+            out_dir=args.out_dir,
+            secrets_path=args.secrets,
+            api_key=args.api_key,
+            rotate=args.rotate,
+            chunk_size=max(1, min(args.chunk_size, 100)),
+            concurrency=max(1, args.concurrency),
+        ))
 
-    if len(args) >= 2:
+    if args.name:
         # Non-interactive: python onboard.py "Name" agent
-        name = args[0]
-        user_type = args[1] if args[1] in ("human", "agent") else "agent"
-    elif len(args) == 1:
-        name = args[0]
-        user_type = "agent"
+        name = args.name
+        user_type = args.type if args.type in ("human", "agent") else "agent"
     else:
         # Interactive
         print("Mission Control — New User Onboarding")
@@ -0,0 +1,84 @@
+"""Parquet export keeps optional fields that the first rows of a part lack.
+
+Run from _dashboard/: python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent_cli
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+TASKS = [
+    {"_id": "t1", "_creationTime": 1.5, "title": "First", "description": "", "status": "todo",
+     "priority": "low", "createdBy": "u1", "createdAt": 1, "updatedAt": 1},
+    {"_id": "t2", "_creationTime": 2.5, "title": "Second", "description": "d", "status": "done",
+     "priority": "high", "createdBy": "u1", "createdAt": 2, "updatedAt": 3,
+     "dueDate": 1700000000000, "assignedTo": "u2", "projectId": "p1", "searchText": "Second\nd"},
+]
+
+
+@unittest.skipIf(pq is None, "pyarrow not installed")
+class ParquetExportTest(unittest.TestCase):
+    def export(self, table, pages):
+        """Run export_table_parquet over canned pages; returns the rows of every part."""
+        cursors = [str(i + 1) for i in range(len(pages) - 1)] + [None]
+
+        with tempfile.TemporaryDirectory() as out_dir, \
+                mock.patch.object(agent_cli, "iter_cursor_pages", return_value=zip(map(iter, pages), cursors)), \
+                mock.patch.object(agent_cli, "PARQUET_PART_ROWS", 1):
+            state = {"cursor": None, "records": 0, "parts": 0, "done": False}
+            agent_cli.export_table_parquet(table, out_dir, state, lambda: None)
+
+            table_dir = os.path.join(out_dir, table)
+            parts = [pq.read_table(os.path.join(table_dir, name)) for name in sorted(os.listdir(table_dir))]
+
+        self.assertEqual(state["records"], sum(len(page) for page in pages))
+        return parts
+
+    def test_optional_fields_missing_from_first_row(self):
+        (part,) = self.export("tasks", [TASKS])
+
+        self.assertIn("dueDate", part.column_names)
+        self.assertIn("assignedTo", part.column_names)
+        rows = part.to_pylist()
+        self.assertIsNone(rows[0]["dueDate"])
+        self.assertEqual(rows[1]["dueDate"], 1700000000000)
+        self.assertEqual(rows[1]["assignedTo"], "u2")
+        self.assertEqual(rows[1]["searchText"], "Second\nd")
+
+    def test_parts_share_one_schema(self):
+        parts = self.export("tasks", [TASKS[:1], TASKS[1:]])
+
+        self.assertEqual(len(parts), 2)
+        self.assertEqual(parts[0].schema, parts[1].schema)
+
+    def test_users_without_email(self):
+        users = [
+            {"_id": "u1", "_creationTime": 1.0, "name": "Bot", "type": "agent", "createdAt": 1},
+            {"_id": "u2", "_creationTime": 2.0, "name": "Ann", "type": "human", "createdAt": 2,
+             "email": "ann@example.com", "authId": "auth|1"},
+        ]
+        (part,) = self.export("users", [users])
+
+        self.assertEqual(part.to_pylist()[1]["email"], "ann@example.com")
+        self.assertEqual(part.to_pylist()[1]["authId"], "auth|1")
+
+    def test_unknown_fields_are_kept(self):
+        rows = [dict(TASKS[0]), dict(TASKS[1], estimate=3)]
+        (part,) = self.export("tasks", [rows])
+
+        self.assertEqual([row["estimate"] for row in part.to_pylist()], [None, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Streaming decode of JSON array bodies, with elements split across chunks.
+
+Run from _dashboard/: python -m unittest discover tests
+"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mc_stream import iter_json_array, iter_response_array
+
+RECORDS = [
+    {"_id": "t1", "title": "Fix \"login\" bug", "tags": ["a", "b"], "n": 123, "x": 4.5},
+    {"_id": "t2", "title": "Café \\ path\\to\\file", "escaped": "☃ 🚀 \\u0041", "done": True},
+    [],
+    {},
+    "plain",
+    -0.25e3,
+    None,
+]
+
+
+def split_every(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        return iter(split_every(self.body, chunk_size))
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def decode(self, chunks):
+        return list(iter_json_array(chunks))
+
+    def test_every_chunk_boundary(self):
+        for text in (json.dumps(RECORDS), json.dumps(RECORDS, indent=2), json.dumps(RECORDS, ensure_ascii=False)):
+            for size in range(1, 12):
+                with self.subTest(size=size, text=text[:20]):
+                    self.assertEqual(self.decode(split_every(text, size)), RECORDS)
+
+    def test_boundary_inside_string_escapes(self):
+        text = '["a\\"b", "\\\\", "\\u00e9", "x\\ny"]'
+        for cut in range(1, len(text)):
+            with self.subTest(cut=cut):
+                self.assertEqual(self.decode([text[:cut], text[cut:]]), ['a"b', "\\", "é", "x\ny"])
+
+    def test_number_cut_at_chunk_edge(self):
+        self.assertEqual(self.decode(["[12", "3, 4.", "5]"]), [123, 4.5])
+
+    def test_empty_arrays(self):
+        self.assertEqual(self.decode(["[]"]), [])
+        self.assertEqual(self.decode([" [ ", "\n ] "]), [])
+        self.assertEqual(self.decode(["[", "]"]), [])
+        self.assertEqual(self.decode(["[[], [[]]]"]), [[], [[]]])
+
+    def test_missing_comma(self):
+        for chunks in (["[1 2]"], ["[1", " 2]"], ['[{"a": 1} {"b": 2}]'], ['["a""b"]']):
+            with self.subTest(chunks=chunks), self.assertRaises(ValueError):
+                self.decode(chunks)
+
+    def test_bad_separators(self):
+        for text in ("[,1]", "[1,,2]", "[1,]", "[1;2]", "[,]"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                self.decode([text])
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            self.decode(['{"a": 1}'])
+
+    def test_truncated(self):
+        for text in ("", "[", "[1,", '[{"a": 1', '["abc'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                self.decode([text])
+
+    def test_elements_are_yielded_before_the_end(self):
+        elements = iter_json_array(iter(["[1, 2, ", "3"]))
+        self.assertEqual([next(elements), next(elements)], [1, 2])
+
+
+class IterResponseArrayTest(unittest.TestCase):
+    def test_multibyte_characters_split_across_chunks(self):
+        body = json.dumps(RECORDS, ensure_ascii=False).encode()
+        for size in (1, 2, 3, 7):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_response_array(FakeResponse(body), size)), RECORDS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Compare flyer render backends: startup time, render time, peak RSS and output size.
+
+Each backend runs generate_pdf.py in its own process (so memory is measured
+per backend) over the same events file, writing into a scratch directory.
+
+Usage:
+  python benchmark_backends.py                       # every backend, flyers.json
+  python benchmark_backends.py --backends chrome weasyprint --repeat 3
+  python benchmark_backends.py --copies 20           # each flyer 20 times over
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from generate_pdf import DEFAULT_EVENTS, RENDERERS, script_dir
+
+
+def season(events_path, copies, out_path):
+    """Write an events file with every flyer repeated `copies` times."""
+    with open(events_path) as f:
+        data = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(events_path))
+    defaults = data.get("defaults", {})
+    flyers = []
+
+    for i in range(copies):
+        for flyer in data["flyers"]:
+            event = {**defaults, **flyer, "slug": f"{flyer['slug']}-{i}"}
+            # Image paths are relative to the events file, which moves
+            event["hero"] = os.path.join(base_dir, event["hero"])
+            event["sponsors"] = [
+                {**sponsor, "logo": os.path.join(base_dir, sponsor["logo"])}
+                for sponsor in event["sponsors"]
+            ]
+            flyers.append(event)
+
+    with open(out_path, "w") as f:
+        json.dump({"flyers": flyers}, f)
+
+
+def run_backend(backend, events_path, workers, out_dir):
+    """Run one generate_pdf.py pass; returns its JSON report, or an error string."""
+    result = subprocess.run(
+        [
+            sys.executable, os.path.join(script_dir, "generate_pdf.py"),
+            "--backend", backend,
+            "--events", events_path,
+            "--out-dir", out_dir,
+            "--workers", str(workers),
+            "--json",
+            # Every repeat must actually render, not hit the build manifest
+            "--force",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    # Exit status 2: backend not installed
+    if result.returncode == 2 or not result.stdout.strip():
+        return (result.stderr.strip().splitlines() or [f"exit {result.returncode}"])[-1]
+    return json.loads(result.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark flyer render backends.")
+    parser.add_argument("--backends", nargs="+", choices=list(RENDERERS), default=list(RENDERERS))
+    parser.add_argument("--events", default=DEFAULT_EVENTS)
+    parser.add_argument("--copies", type=int, default=1, help="render each flyer this many times")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per backend; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    print(f"{'backend':<12} {'startup s':>10} {'render s':>9} {'total s':>8} {'RSS MB':>8} {'child MB':>9} {'PDF KB':>8}")
+    print("-" * 70)
+
+    with tempfile.TemporaryDirectory(prefix="flyer-bench-") as tmp:
+        events_path = os.path.join(tmp, "events.json")
+        season(args.events, args.copies, events_path)
+
+        for backend in args.backends:
+            runs = [run_backend(backend, events_path, args.workers, os.path.join(tmp, backend)) for _ in range(args.repeat)]
+            errors = [run for run in runs if isinstance(run, str)]
+            if errors:
+                print(f"{backend:<12} unavailable: {errors[0]}")
+                continue
+
+            best = min(runs, key=lambda run: run["wall"])
+            flyers = [flyer for flyer in best["flyers"] if not flyer["error"]]
+            if not flyers:
+                print(f"{backend:<12} failed: {best['flyers'][0]['error']}")
+                continue
+
+            render = sum(flyer["seconds"] for flyer in flyers) / len(flyers)
+            size = sum(flyer["bytes"] for flyer in flyers) / len(flyers) / 1024
+            rss = best["peak_rss_kb"]
+            print(
+                f"{backend:<12} {best['startup']:>10.2f} {render:>9.2f} {best['wall']:>8.2f} "
+                f"{rss['self'] / 1024:>8.0f} {rss['children'] / 1024:>9.0f} {size:>8.1f}"
+            )
+
+    print("\nrender s and PDF KB are per flyer; child MB is the largest browser process.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Downsample and recompress images before they are inlined into a flyer.
+
+Source artwork is often several thousand pixels wide, far more than a
+letter-size page can use. prepare_image() resizes an image to its printed
+size at the target DPI and re-encodes it: JPEG for photos, palette PNG for
+logos (which need transparency and sharp edges). Results are cached on disk
+keyed by the source bytes and the parameters, so repeated builds skip the
+image work entirely.
+
+    data, mime = prepare_image("hero-banner.png", "photo", width_in=5.33)
+
+Run directly to see what each image shrinks to:
+
+    python flyer_assets.py hero-banner.png:photo:5.33 ten31-logo.png:logo::0.58
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import os
+import sys
+
+from PIL import Image
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_DPI = 300
+CACHE_DIR = os.path.join(script_dir, ".asset-cache")
+JPEG_QUALITY = 85
+PALETTE_COLORS = 256
+
+# Bump when the encoding logic changes so stale cache entries are ignored
+CACHE_VERSION = 1
+
+KINDS = ("photo", "logo")
+
+
+def target_size(size, width_in=None, height_in=None, dpi=DEFAULT_DPI):
+    """Pixel size for printing at `dpi`, keeping the aspect ratio and never upscaling."""
+    w, h = size
+    scale = 1.0
+    if width_in:
+        scale = min(scale, width_in * dpi / w)
+    if height_in:
+        scale = min(scale, height_in * dpi / h)
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+def encode(img, kind):
+    """Encode a resized image; returns (bytes, mime type)."""
+    buffer = io.BytesIO()
+
+    if kind == "photo":
+        # Flyers print on white, so transparency is flattened rather than kept
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        img.convert("RGB").save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return buffer.getvalue(), "image/jpeg"
+
+    img = img.convert("RGBA").quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+    img.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue(), "image/png"
+
+
+def cache_key(source, kind, width_in, height_in, dpi):
+    digest = hashlib.sha256(source)
+    digest.update(f"|{CACHE_VERSION}|{kind}|{width_in}|{height_in}|{dpi}".encode())
+    return digest.hexdigest()
+
+
+def prepare_image(path, kind, width_in=None, height_in=None, dpi=DEFAULT_DPI, cache_dir=CACHE_DIR):
+    """Return (bytes, mime type) for `path` sized for print; cached on disk when cache_dir is set."""
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}")
+
+    with open(path, "rb") as f:
+        source = f.read()
+
+    ext = ".jpg" if kind == "photo" else ".png"
+    cached = None
+    if cache_dir:
+        cached = os.path.join(cache_dir, cache_key(source, kind, width_in, height_in, dpi) + ext)
+        if os.path.exists(cached):
+            with open(cached, "rb") as f:
+                return f.read(), "image/jpeg" if kind == "photo" else "image/png"
+
+    img = Image.open(io.BytesIO(source))
+    size = target_size(img.size, width_in, height_in, dpi)
+    if size != img.size:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+
+    data, mime = encode(img, kind)
+
+    if cached:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cached}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, cached)
+
+    return data, mime
+
+
+def image_data_uri(path, kind, width_in=None, height_in=None, dpi=DEFAULT_DPI, cache_dir=CACHE_DIR):
+    data, mime = prepare_image(path, kind, width_in, height_in, dpi, cache_dir)
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show how flyer images shrink when prepared for print.")
+    parser.add_argument("images", nargs="+", help="path:kind[:width_in[:height_in]]")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    args = parser.parse_args(argv)
+
+    for spec in args.images:
+        path, kind, *dims = spec.split(":")
+        width_in, height_in = [float(d) if d else None for d in (dims + ["", ""])[:2]]
+
+        data, mime = prepare_image(path, kind, width_in, height_in, args.dpi)
+        before = os.path.getsize(path)
+        print(f"{path}: {before / 1024:.0f} KB -> {len(data) / 1024:.0f} KB ({mime})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
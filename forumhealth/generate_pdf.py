@@ -1,331 +1,550 @@
 #!/usr/bin/env python3
-"""Generate a one-page PDF flyer for Park Forum: The Case for Bitcoin in Healthcare."""
-
-import base64
-import io
+"""Generate one-page PDF flyers for Park Forum events.
+
+Each event in flyers.json (title, date, sponsors, QR target, ...) is filled
+into flyer_template.html and printed to PDF by a small pool of long-lived
+headless browser workers running in parallel.
+
+Usage:
+  python generate_pdf.py                          # every flyer in flyers.json
+  python generate_pdf.py forum-health-flyer       # only the named flyers
+  python generate_pdf.py --events season.json --out-dir out --workers 4
+  python generate_pdf.py --force                  # rebuild even if nothing changed
+
+Builds are incremental: flyers-manifest.json in the output directory records
+a hash of every input of each PDF (template, event data, images, QR payload,
+renderer version, generator code), and flyers whose inputs are unchanged are
+skipped without starting a browser.
+
+Backends:
+  playwright  one Chromium per worker, reused for every flyer it renders
+              (pip install playwright && playwright install chromium)
+  chrome      headless Chrome CLI, one process per flyer, run in parallel;
+              found via $CHROME_PATH or google-chrome/chromium on $PATH
+  weasyprint  in-process HTML/CSS-to-PDF engine, no browser needed, opt-in
+              (pip install weasyprint, plus the system Pango library:
+              apt install libpango-1.0-0 libpangoft2-1.0-0)
+
+  auto (default) picks playwright if installed, otherwise chrome. WeasyPrint
+  is never picked automatically: it needs Pango from the OS, and its layout
+  of the flyer template has not been checked against Chrome's yet. Compare
+  the backends with benchmark_backends.py.
+"""
+
+import argparse
+import hashlib
+import importlib.metadata
+import importlib.util
+import json
 import os
+import queue
+import resource
+import shutil
+import string
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 
-sys.path.insert(0, os.path.expanduser("~/Library/Python/3.9/lib/python/site-packages"))
-import qrcode
-from qrcode.image.styledpil import StyledPilImage
-from qrcode.image.styles.colormasks import SolidFillColorMask
-
-# Generate QR code
-qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_H, box_size=10, border=4)
-qr.add_data("https://pay.zaprite.com/pl_XsT26aenI2")
-qr.make(fit=True)
-qr_img = qr.make_image(fill_color=(3, 17, 105), back_color=(255, 255, 255))
-# Crop to exact square to ensure centering
-from PIL import Image
-qr_pil = qr_img.get_image()
-w, h = qr_pil.size
-size = max(w, h)
-centered = Image.new("RGB", (size, size), (255, 255, 255))
-centered.paste(qr_pil, ((size - w) // 2, (size - h) // 2))
-qr_buffer = io.BytesIO()
-centered.save(qr_buffer, format="PNG")
-qr_b64 = base64.b64encode(qr_buffer.getvalue()).decode()
-
-# Read images and base64 encode them
-def img_to_b64(path):
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
+from flyer_assets import DEFAULT_DPI, image_data_uri
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
-hero_b64 = img_to_b64(os.path.join(script_dir, "hero-banner.png"))
-sound_hsa_b64 = img_to_b64(os.path.join(script_dir, "sound-hsa-logo.png"))
-unchained_b64 = img_to_b64(os.path.join(script_dir, "unchained-logo.png"))
-ten31_b64 = img_to_b64(os.path.join(script_dir, "ten31-logo.png"))
-
-html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="utf-8">
-<style>
-  @page {{
-    size: letter;
-    margin: 0;
-  }}
-
-  * {{
-    margin: 0;
-    padding: 0;
-    box-sizing: border-box;
-  }}
-
-  body {{
-    font-family: 'Optima', 'Candara', 'Palatino', Georgia, serif;
-    background: #FFFFFF;
-    color: #1A3A6B;
-    width: 8.5in;
-    height: 11in;
-    overflow: hidden;
-  }}
-
-  .page {{
-    width: 8.5in;
-    height: 11in;
-    padding: 0.35in 0.55in 0.3in;
-    display: flex;
-    flex-direction: column;
-    align-items: center;
-    overflow: hidden;
-  }}
-
-  /* Hero Banner */
-  .hero-banner {{
-    width: 100%;
-    max-width: 5.33in;
-    border-radius: 10px;
-    margin-bottom: 10px;
-  }}
-
-  /* Title Block */
-  .title-block {{
-    text-align: center;
-    margin-bottom: 4px;
-  }}
-
-  .eyebrow {{
-    font-size: 8pt;
-    font-weight: 600;
-    text-transform: uppercase;
-    letter-spacing: 0.2em;
-    color: #2B80C9;
-    margin-bottom: 3px;
-  }}
-
-  h1 {{
-    font-size: 22pt;
-    font-weight: 700;
-    color: #031169;
-    line-height: 1.1;
-    letter-spacing: -0.02em;
-    margin-bottom: 4px;
-  }}
-
-  h1 .accent {{
-    color: #2B80C9;
-  }}
-
-  .subtitle {{
-    font-size: 10.5pt;
-    color: #5B7FA6;
-    font-weight: 500;
-    margin-bottom: 3px;
-  }}
-
-  .location {{
-    font-size: 11pt;
-    color: #031169;
-    font-weight: 700;
-    margin-bottom: 2px;
-  }}
-
-  .date {{
-    font-size: 10pt;
-    color: #5B7FA6;
-    font-weight: 500;
-  }}
-
-  /* Sponsors */
-  .sponsors {{
-    text-align: center;
-    margin: 4px 0;
-  }}
-
-  .sponsors-label {{
-    font-size: 7pt;
-    font-weight: 600;
-    text-transform: uppercase;
-    letter-spacing: 0.18em;
-    color: #5B7FA6;
-    margin-bottom: 4px;
-  }}
-
-  .sponsors-logos {{
-    display: flex;
-    justify-content: center;
-    align-items: center;
-    gap: 36px;
-    flex-direction: row;
-    flex-wrap: nowrap;
-  }}
-
-  .sponsor-logo {{
-    height: 100px;
-    width: auto;
-    object-fit: contain;
-  }}
-
-  .sponsor-logo-unchained {{
-    height: 16px;
-  }}
-
-  .sponsor-logo-ten31 {{
-    height: 56px;
-  }}
-
-  /* Divider */
-  .divider {{
-    width: 60px;
-    height: 2.5px;
-    background: linear-gradient(90deg, #2B80C9, #4EA1E9);
-    margin: 0 auto 6px;
-    border-radius: 2px;
-  }}
-
-  /* About Section */
-  .about {{
-    text-align: center;
-    max-width: 6.8in;
-    margin: 0 auto;
-  }}
-
-  .about h2 {{
-    font-size: 17pt;
-    font-weight: 700;
-    color: #031169;
-    margin-bottom: 5px;
-    letter-spacing: -0.02em;
-  }}
-
-  .about h2 .orange {{
-    color: #2B80C9;
-  }}
-
-  .about p {{
-    font-size: 9.5pt;
-    color: #1A3A6B;
-    line-height: 1.6;
-    margin-bottom: 8px;
-    text-align: center;
-  }}
-
-  /* QR Section */
-  .qr-section {{
-    text-align: center;
-    margin-top: 20px;
-    padding-top: 8px;
-    width: 100%;
-    display: flex;
-    flex-direction: column;
-    align-items: center;
-  }}
-
-  .qr-section img {{
-    width: 1.5in;
-    height: 1.5in;
-    display: block;
-    margin: 0 auto;
-  }}
-
-  .qr-label {{
-    font-size: 10pt;
-    font-weight: 700;
-    color: #031169;
-    margin-top: 4px;
-    text-transform: uppercase;
-    letter-spacing: 0.08em;
-  }}
-
-  .qr-sublabel {{
-    font-size: 7.5pt;
-    color: #5B7FA6;
-    margin-top: 2px;
-  }}
-
-  /* Footer */
-  .footer {{
-    text-align: center;
-    margin-top: 8px;
-    padding-top: 6px;
-    border-top: 1px solid rgba(78, 161, 233, 0.2);
-    width: 100%;
-  }}
-
-  .footer p {{
-    font-size: 7.5pt;
-    color: #5B7FA6;
-  }}
-</style>
-</head>
-<body>
-<div class="page">
-
-  <!-- Hero Banner -->
-  <img src="data:image/png;base64,{hero_b64}" alt="Park Forum" class="hero-banner">
-
-  <!-- Title -->
-  <div class="title-block">
-    <p class="eyebrow">Bitcoin Park Presents</p>
-    <h1>Park Forum: <span class="accent">The Case for</span><br>Bitcoin in Healthcare</h1>
-    <p class="subtitle">Sound Health Through Sound Money</p>
-    <p class="location">Nashville, Tennessee</p>
-    <p class="date">April 8, 2026 &middot; Bitcoin Park</p>
-  </div>
-
-  <!-- Sponsors -->
-  <div class="sponsors">
-    <p class="sponsors-label">Thank You to Our Sponsors</p>
-    <div class="sponsors-logos">
-      <img src="data:image/png;base64,{sound_hsa_b64}" alt="Sound HSA" class="sponsor-logo">
-      <img src="data:image/png;base64,{unchained_b64}" alt="Unchained" class="sponsor-logo sponsor-logo-unchained">
-      <img src="data:image/png;base64,{ten31_b64}" alt="Ten31" class="sponsor-logo sponsor-logo-ten31">
-    </div>
-  </div>
-
-  <!-- About the Forum -->
-  <div class="about">
-    <h2>About the <span class="orange">Forum</span></h2>
-    <div class="divider"></div>
-    <p>The Case for Bitcoin in Healthcare is a curated gathering of physicians, hospital administrators, healthcare entrepreneurs, capital allocators, and policymakers who are shaping the future of health and sound money. United by a shared mission, we are pioneering new models for how healthcare is delivered, financed, and incentivized in the age of Bitcoin and beyond.</p>
-    <p>Hosted in the spirit of Bitcoin Park experiences, this gathering centers on the transformative theme of sound health through sound money, and how Bitcoin can address the systemic inefficiencies of fiat-driven healthcare.</p>
-  </div>
-
-  <!-- QR Code -->
-  <div class="qr-section">
-    <img src="data:image/png;base64,{qr_b64}" alt="Register QR Code">
-    <p class="qr-label">Register Now</p>
-    <p class="qr-sublabel">Scan to secure your seat</p>
-  </div>
-
-  <!-- Footer -->
-  <div class="footer">
-    <p>Bitcoin Park &middot; Nashville, TN &middot; bitcoinpark.com</p>
-  </div>
-
-</div>
-</body>
-</html>"""
-
-# Write HTML to temp file, then use Chrome headless to convert to PDF
-html_path = os.path.join(script_dir, "_flyer_temp.html")
-with open(html_path, "w") as f:
-    f.write(html)
-
-output_path = os.path.join(script_dir, "forum-health-flyer.pdf")
-chrome = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-
-result = subprocess.run([
-    chrome,
-    "--headless",
-    "--disable-gpu",
-    "--no-sandbox",
-    "--print-to-pdf=" + output_path,
-    "--print-to-pdf-no-header",
-    "--no-margins",
-    "file://" + html_path,
-], capture_output=True, text=True, timeout=30)
-
-# Clean up temp HTML
-os.remove(html_path)
-
-if result.returncode == 0 or os.path.exists(output_path):
-    print(f"PDF saved to: {output_path}")
-else:
-    print(f"Error: {result.stderr}")
-    sys.exit(1)
+
+# Shared QR code module lives in the repo's scripts/ directory
+sys.path.insert(0, os.path.join(script_dir, "..", "scripts"))
+import qr_codes
+from qr_codes import Style, qr_data_uri
+
+DEFAULT_EVENTS = os.path.join(script_dir, "flyers.json")
+DEFAULT_TEMPLATE = os.path.join(script_dir, "flyer_template.html")
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_TIMEOUT = 30
+MANIFEST_NAME = "flyers-manifest.json"
+
+# Printed sizes from flyer_template.html, used to downsample images
+HERO_WIDTH_IN = 5.33          # .hero-banner max-width
+LOGO_HEIGHT = "100px"         # .sponsor-logo height, unless the sponsor sets one
+CSS_UNITS_IN = {"px": 1 / 96, "pt": 1 / 72, "in": 1.0}
+
+QR_STYLE = Style(fill="#031169", background="#FFFFFF", error="H", border=4)
+
+CHROME_CANDIDATES = (
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+)
+
+
+# ============ ASSETS ============
+
+def css_inches(length):
+    """Convert a CSS length such as "56px" to inches."""
+    for unit, inches in CSS_UNITS_IN.items():
+        if length.endswith(unit):
+            return float(length[:-len(unit)]) * inches
+    raise ValueError(f"Unsupported CSS length: {length}")
+
+
+# ============ TEMPLATE ============
+
+def load_events(path):
+    """Return the flyers in an events file, each merged over the file's defaults.
+
+    Text fields are trusted HTML fragments (they may contain markup such as
+    <span class="accent">); image paths are relative to the events file.
+    """
+    with open(path) as f:
+        data = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    events = []
+
+    for flyer in data["flyers"]:
+        event = {**data.get("defaults", {}), **flyer}
+        event["hero"] = os.path.join(base_dir, event["hero"])
+        event["sponsors"] = [
+            {**sponsor, "logo": os.path.join(base_dir, sponsor["logo"])}
+            for sponsor in event["sponsors"]
+        ]
+        events.append(event)
+
+    return events
+
+
+def render_html(template, event, dpi=DEFAULT_DPI):
+    """Fill the flyer template for one event, with images sized for `dpi`."""
+    def logo_uri(sponsor):
+        height_in = css_inches(sponsor.get("height") or LOGO_HEIGHT)
+        return image_data_uri(sponsor["logo"], "logo", height_in=height_in, dpi=dpi)
+
+    sponsor_logos = "\n".join(
+        f'      <img src="{logo_uri(sponsor)}" alt="{sponsor["name"]}" class="sponsor-logo"'
+        + (f' style="height: {sponsor["height"]}"' if sponsor.get("height") else "")
+        + ">"
+        for sponsor in event["sponsors"]
+    )
+    about = "\n".join(f"    <p>{paragraph}</p>" for paragraph in event["about"])
+
+    return template.substitute(
+        event,
+        hero=image_data_uri(event["hero"], "photo", width_in=HERO_WIDTH_IN, dpi=dpi),
+        sponsor_logos=sponsor_logos,
+        about=about,
+        qr=qr_data_uri(event["qr_url"], QR_STYLE),
+    )
+
+
+# ============ RENDERERS ============
+
+def find_chrome():
+    """Locate a Chrome/Chromium binary: $CHROME_PATH, then well-known names."""
+    if os.getenv("CHROME_PATH"):
+        return os.environ["CHROME_PATH"]
+
+    for candidate in CHROME_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+
+    return None
+
+
+class ChromeRenderer:
+    """Headless Chrome CLI, one short-lived process per flyer."""
+
+    name = "chrome"
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.binary = find_chrome()
+        if not self.binary:
+            raise RuntimeError("Chrome not found; set CHROME_PATH")
+        self.timeout = timeout
+
+    @staticmethod
+    def version():
+        binary = find_chrome()
+        if not binary:
+            raise RuntimeError("Chrome not found; set CHROME_PATH")
+        result = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=DEFAULT_TIMEOUT)
+        return result.stdout.strip() or binary
+
+    def __enter__(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="flyer-")
+        return self
+
+    def __exit__(self, *exc):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def render(self, html, pdf_path):
+        html_path = os.path.join(self.tmp_dir, "flyer.html")
+        with open(html_path, "w") as f:
+            f.write(html)
+
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+
+        result = subprocess.run([
+            self.binary,
+            "--headless",
+            "--disable-gpu",
+            "--no-sandbox",
+            "--user-data-dir=" + os.path.join(self.tmp_dir, "profile"),
+            "--print-to-pdf=" + pdf_path,
+            "--print-to-pdf-no-header",
+            "--no-margins",
+            "file://" + html_path,
+        ], capture_output=True, text=True, timeout=self.timeout)
+
+        # Chrome sometimes exits non-zero after writing a good PDF
+        if not os.path.exists(pdf_path):
+            raise RuntimeError(result.stderr.strip() or f"Chrome exited with {result.returncode}")
+
+
+class PlaywrightRenderer:
+    """One Chromium launched per worker and kept open for all of its flyers."""
+
+    name = "playwright"
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        from playwright.sync_api import sync_playwright
+        self._sync_playwright = sync_playwright
+        self.timeout = timeout
+
+    @staticmethod
+    def version():
+        # Each playwright release pins its Chromium build
+        return f"playwright {importlib.metadata.version('playwright')} {os.getenv('CHROME_PATH', '')}".strip()
+
+    def __enter__(self):
+        self._playwright = self._sync_playwright().start()
+        self.browser = self._playwright.chromium.launch(
+            executable_path=os.getenv("CHROME_PATH") or None,
+            args=["--no-sandbox"],
+        )
+        return self
+
+    def __exit__(self, *exc):
+        self.browser.close()
+        self._playwright.stop()
+
+    def render(self, html, pdf_path):
+        page = self.browser.new_page()
+        try:
+            page.set_content(html, wait_until="load", timeout=self.timeout * 1000)
+            page.pdf(path=pdf_path, prefer_css_page_size=True, print_background=True)
+        finally:
+            page.close()
+
+
+class WeasyPrintRenderer:
+    """Python layout engine (on top of the system Pango) rendering in-process.
+
+    Opt-in with --backend weasyprint. Rendering holds the GIL, so extra
+    workers add little; use --workers 1.
+    """
+
+    name = "weasyprint"
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        from weasyprint import HTML
+        self._html = HTML
+
+    @staticmethod
+    def version():
+        # The import loads Pango, so a missing system library fails here, before any rendering
+        import weasyprint
+        return f"weasyprint {weasyprint.__version__}"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def render(self, html, pdf_path):
+        self._html(string=html, base_url=script_dir).write_pdf(pdf_path)
+
+
+RENDERERS = {
+    "playwright": PlaywrightRenderer,
+    "chrome": ChromeRenderer,
+    "weasyprint": WeasyPrintRenderer,
+}
+
+
+def pick_backend(name):
+    """Resolve "auto" to playwright if installed, else chrome; weasyprint is opt-in only."""
+    if name != "auto":
+        return name
+    if importlib.util.find_spec("playwright"):
+        return "playwright"
+    return "chrome"
+
+
+# ============ MANIFEST ============
+
+# Code that shapes the output; a change to any of it invalidates every flyer
+GENERATOR_SOURCES = (
+    os.path.abspath(__file__),
+    os.path.join(script_dir, "flyer_assets.py"),
+    os.path.abspath(qr_codes.__file__),
+)
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def flyer_inputs(template_text, event, dpi, renderer_version):
+    """Hashes of everything a flyer PDF is built from."""
+    fields = {k: v for k, v in event.items() if k not in ("hero", "sponsors")}
+    sponsors = [{**sponsor, "logo": file_hash(sponsor["logo"])} for sponsor in event["sponsors"]]
+
+    return {
+        "template": text_hash(template_text),
+        "event": text_hash(json.dumps(fields, sort_keys=True)),
+        "assets": {
+            "hero": file_hash(event["hero"]),
+            "sponsors": text_hash(json.dumps(sponsors, sort_keys=True)),
+            "dpi": dpi,
+        },
+        "qr": text_hash(json.dumps([event["qr_url"], list(QR_STYLE)])),
+        "renderer": renderer_version,
+        "generator": text_hash("".join(file_hash(path) for path in GENERATOR_SOURCES)),
+    }
+
+
+def inputs_key(inputs):
+    return text_hash(json.dumps(inputs, sort_keys=True))
+
+
+def read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_manifest(path, manifest):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+# ============ POOL ============
+
+def render_all(jobs, backend, workers, timeout):
+    """Render (slug, html, pdf_path) jobs on `workers` threads, each holding one renderer.
+
+    Returns (results, startup) where results has one dict per job and startup
+    is the slowest worker's renderer start time in seconds. Raises if the
+    backend is unavailable (missing binary or package).
+    """
+    pending = queue.Queue()
+    for job in jobs:
+        pending.put(job)
+
+    renderers = [RENDERERS[backend](timeout=timeout) for _ in range(max(1, min(workers, len(jobs))))]
+    results = []
+    startups = []
+    start_errors = []
+    lock = threading.Lock()
+
+    def worker(renderer):
+        start = time.perf_counter()
+        try:
+            renderer.__enter__()
+        except Exception as e:
+            with lock:
+                start_errors.append(f"worker failed to start: {e}".strip().splitlines()[0])
+            return
+        with lock:
+            startups.append(time.perf_counter() - start)
+
+        try:
+            while True:
+                try:
+                    slug, html, pdf_path = pending.get_nowait()
+                except queue.Empty:
+                    return
+
+                start = time.perf_counter()
+                error = None
+                try:
+                    renderer.render(html, pdf_path)
+                except Exception as e:
+                    error = str(e).strip().splitlines()[-1] if str(e).strip() else repr(e)
+
+                with lock:
+                    results.append({
+                        "slug": slug,
+                        "path": pdf_path,
+                        "seconds": time.perf_counter() - start,
+                        "error": error,
+                    })
+        finally:
+            renderer.__exit__(None, None, None)
+
+    threads = [threading.Thread(target=worker, args=(renderer,)) for renderer in renderers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Jobs left over when every worker failed to start
+    while not pending.empty():
+        slug, _, pdf_path = pending.get_nowait()
+        error = start_errors[0] if start_errors else "no renderer available"
+        results.append({"slug": slug, "path": pdf_path, "seconds": 0.0, "error": error})
+
+    return results, max(startups, default=0.0)
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process and of its largest finished child, in KB."""
+    # ru_maxrss is in bytes on macOS, KB on Linux
+    unit = 1024 if sys.platform == "darwin" else 1
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // unit,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // unit,
+    }
+
+
+def json_report(results, skipped, backend, workers, startup, wall):
+    return {
+        "backend": backend,
+        "skipped": skipped,
+        "workers": workers,
+        "startup": startup,
+        "wall": wall,
+        "peak_rss_kb": peak_rss_kb(),
+        "flyers": [
+            {
+                "slug": result["slug"],
+                "seconds": result["seconds"],
+                "bytes": None if result["error"] else os.path.getsize(result["path"]),
+                "error": result["error"],
+            }
+            for result in results
+        ],
+    }
+
+
+def print_report(results, skipped, backend, workers, startup, wall):
+    if not results:
+        print(f"All {len(skipped)} flyers up to date (use --force to rebuild)")
+        return
+
+    print(f"\n{'flyer':<40} {'render s':>9} {'size KB':>9}")
+    print("-" * 60)
+    for slug in sorted(skipped):
+        print(f"{slug:<40} {'up to date':>9}")
+    for result in sorted(results, key=lambda r: r["slug"]):
+        if result["error"]:
+            print(f"{result['slug']:<40} {'FAILED':>9}  {result['error']}")
+        else:
+            size = os.path.getsize(result["path"]) / 1024
+            print(f"{result['slug']:<40} {result['seconds']:>9.2f} {size:>9.1f}")
+    print("-" * 60)
+    ok = sum(1 for result in results if not result["error"])
+    print(f"{ok}/{len(results)} flyers in {wall:.2f}s ({backend}, {workers} workers, startup {startup:.2f}s)"
+          + (f", {len(skipped)} up to date" if skipped else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Park Forum flyers to PDF.")
+    parser.add_argument("slugs", nargs="*", help="only render these flyers (default: all)")
+    parser.add_argument("--events", default=DEFAULT_EVENTS, help="events JSON file (default: flyers.json)")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="flyer HTML template")
+    parser.add_argument("--out-dir", default=script_dir, help="where to write <slug>.pdf")
+    parser.add_argument("--backend", choices=["auto", *RENDERERS], default="auto")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="parallel browser workers")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="per-flyer timeout in seconds")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI, help="print resolution for embedded images")
+    parser.add_argument("--json", action="store_true", help="print the timing report as JSON")
+    parser.add_argument("--force", action="store_true", help="rebuild flyers even if their inputs are unchanged")
+    parser.add_argument("--manifest", help=f"build manifest (default: <out-dir>/{MANIFEST_NAME})")
+    args = parser.parse_args(argv)
+
+    events = load_events(args.events)
+    if args.slugs:
+        unknown = set(args.slugs) - {event["slug"] for event in events}
+        if unknown:
+            parser.error(f"unknown flyer(s): {', '.join(sorted(unknown))}")
+        events = [event for event in events if event["slug"] in args.slugs]
+
+    with open(args.template) as f:
+        template_text = f.read()
+    template = string.Template(template_text)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    manifest_path = args.manifest or os.path.join(args.out_dir, MANIFEST_NAME)
+    manifest = read_manifest(manifest_path)
+    started = time.perf_counter()
+
+    backend = pick_backend(args.backend)
+    try:
+        renderer_version = RENDERERS[backend].version()
+    except (ImportError, OSError, RuntimeError) as e:
+        print(f"Error: {backend} backend unavailable: {e}", file=sys.stderr)
+        return 2
+
+    # Only flyers whose inputs changed (or whose PDF is missing) are rendered
+    jobs = []
+    keys = {}
+    skipped = []
+
+    for event in events:
+        slug = event["slug"]
+        pdf_path = os.path.join(args.out_dir, slug + ".pdf")
+        inputs = flyer_inputs(template_text, event, args.dpi, renderer_version)
+        keys[slug] = (inputs_key(inputs), inputs)
+
+        entry = manifest.get(slug, {})
+        if not args.force and entry.get("key") == keys[slug][0] and os.path.exists(pdf_path):
+            skipped.append(slug)
+            continue
+
+        jobs.append((slug, render_html(template, event, args.dpi), pdf_path))
+
+    results, startup = [], 0.0
+    if jobs:
+        try:
+            results, startup = render_all(jobs, backend, args.workers, args.timeout)
+        except (ImportError, OSError, RuntimeError) as e:
+            print(f"Error: {backend} backend unavailable: {e}", file=sys.stderr)
+            return 2
+
+    for result in results:
+        if not result["error"]:
+            key, inputs = keys[result["slug"]]
+            manifest[result["slug"]] = {"key": key, "inputs": inputs, "bytes": os.path.getsize(result["path"])}
+    if results:
+        write_manifest(manifest_path, manifest)
+
+    report = (results, skipped, backend, min(args.workers, len(jobs)), startup, time.perf_counter() - started)
+
+    if args.json:
+        print(json.dumps(json_report(*report), indent=2))
+    else:
+        print_report(*report)
+        for result in results:
+            if not result["error"]:
+                print(f"PDF saved to: {result['path']}")
+
+    return 1 if any(result["error"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
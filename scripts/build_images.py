@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""Responsive images for the static site: AVIF/WebP variants plus <picture> markup.
+
+Pages link straight to camera originals and print-resolution posters (the
+Park-Images photos alone are 14 MB). This script finds every local raster
+<img> on the site, encodes AVIF and WebP copies at a few widths, and writes
+a copy of the site to build/site where each of those <img> tags becomes
+
+    <picture style="display:contents">
+      <source type="image/avif" srcset="/_img/front-3fa2…-480.avif 480w, …" sizes="100vw">
+      <source type="image/webp" srcset="…" sizes="100vw">
+      <img src="front.jpg" alt="…" width="1600" height="1067" loading="lazy" decoding="async">
+    </picture>
+
+The original stays as the fallback src. `display:contents` keeps the
+<picture> out of layout, so the <img> is still the flex or grid item its
+page's CSS expects; pages whose CSS picks images by position (img:first-child,
+> img, img + img, ...) are left alone, since the <picture> would change
+which element those selectors match. `sizes` comes from the <img>'s width
+(or height) attribute when it has one, so small images don't fetch the
+widest variant. Variant names contain a hash of the
+source bytes, so an edited image gets new URLs, and build/site/_img/manifest.json
+records what each source produced: unchanged images are skipped on the next
+run. Nothing here is committed: scripts/publish.py runs this step when
+.github/workflows/deploy-site.yml builds build/site for GitHub Pages.
+
+Usage:
+  python scripts/build_images.py                   # build/site with image variants
+  python scripts/build_images.py --widths 640 1280 --jobs 8
+  python scripts/build_images.py --dry-run         # list the images that would be processed
+"""
+
+import argparse
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import shutil
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urljoin, urlsplit
+
+from PIL import Image
+
+from redirect_stubs import REPO_ROOT, SKIP_DIRS, iter_html_files, parse_attrs, site_url
+
+OUT_DIR = os.path.join(REPO_ROOT, "build", "site")
+IMG_DIR = "_img"
+MANIFEST_NAME = "manifest.json"
+
+WIDTHS = (480, 960, 1600)
+FORMATS = ("avif", "webp")
+QUALITY = {"avif": 55, "webp": 78}
+SIZES = "100vw"
+
+# Smaller images are served as-is; a <picture> wrapper would cost more than it saves
+MIN_BYTES = 40 * 1024
+RASTER_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Bump when the encoding settings change so existing variants are rebuilt
+MANIFEST_VERSION = 1
+
+# Hidden directories the site serves (listed under `include` in _config.yml),
+# and repo files that are not part of it
+PUBLISHED_DOT_DIRS = {".well-known"}
+UNPUBLISHED_FILES = {"_config.yml"}
+
+IMG_TAG = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+STYLE_BLOCK = re.compile(r"<style\b[^>]*>(.*?)</style\s*>", re.IGNORECASE | re.DOTALL)
+LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+# Selectors that depend on the <img> being a direct child or a sibling
+STRUCTURAL_IMG = re.compile(r"\bimg\s*:(?:first|last|nth|only)-|>\s*img\b|\bimg\s*[+~]|[+~]\s*img\b", re.IGNORECASE)
+PIXELS = re.compile(r"\s*(\d+(?:\.\d+)?)\s*(?:px)?\s*$", re.IGNORECASE)
+PICTURE = re.compile(r"<picture\b.*?</picture\s*>", re.IGNORECASE | re.DOTALL)
+
+# One encoded file: `url` is site-absolute
+Variant = namedtuple("Variant", ["format", "width", "url"])
+
+
+def format_attrs(attrs):
+    return "".join(f' {name}="{html.escape(value)}"' for name, value in attrs.items())
+
+
+def local_path(src, site_path, base, root=REPO_ROOT):
+    """Repo-relative path of an image `src` on the page at `site_path`, or None if it isn't ours."""
+    url = urljoin(urljoin(base, site_path), src.strip())
+    parts = urlsplit(url)
+    if f"{parts.scheme}://{parts.netloc}/" != base:
+        return None
+    path = unquote(parts.path).lstrip("/")
+    if not path.lower().endswith(RASTER_EXTS) or not os.path.isfile(os.path.join(root, path)):
+        return None
+    return path
+
+
+def slug(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", stem).strip("-").lower() or "img"
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def encode_variants(path, digest, widths, out_dir, root=REPO_ROOT):
+    """Encode every width/format variant of one image; returns its manifest entry."""
+    img = Image.open(os.path.join(root, path))
+    img.load()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "P", "PA") else "RGB")
+
+    width, height = img.size
+    # Never upscale; the largest variant is at most the original width
+    targets = sorted({w for w in widths if w < width} | {min(width, max(widths))})
+    name = f"{slug(path)}-{digest[:10]}"
+    variants = []
+
+    for target in targets:
+        resized = img if target == width else img.resize((target, round(height * target / width)), Image.Resampling.LANCZOS)
+        for fmt in FORMATS:
+            rel = f"{IMG_DIR}/{name}-{target}.{fmt}"
+            buffer = io.BytesIO()
+            resized.save(buffer, format=fmt.upper(), quality=QUALITY[fmt])
+            with open(os.path.join(out_dir, rel), "wb") as f:
+                f.write(buffer.getvalue())
+            variants.append(Variant(fmt, target, "/" + rel))
+
+    return {"hash": digest, "width": width, "height": height, "variants": [list(v) for v in variants]}
+
+
+def read_manifest(path):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return manifest["images"] if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+def write_manifest(path, images):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "images": images}, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def build_variants(paths, widths=WIDTHS, out_dir=OUT_DIR, jobs=None, root=REPO_ROOT):
+    """Make sure every image in `paths` has variants in out_dir; returns (manifest, encoded paths)."""
+    os.makedirs(os.path.join(out_dir, IMG_DIR), exist_ok=True)
+    manifest_path = os.path.join(out_dir, IMG_DIR, MANIFEST_NAME)
+    manifest = read_manifest(manifest_path)
+
+    def current(path, digest):
+        entry = manifest.get(path)
+        return (
+            entry and entry["hash"] == digest and entry.get("widths") == list(widths)
+            and all(os.path.exists(os.path.join(out_dir, url.lstrip("/"))) for _, _, url in entry["variants"])
+        )
+
+    todo = []
+    for path in sorted(set(paths)):
+        digest = file_hash(os.path.join(root, path))
+        if not current(path, digest):
+            todo.append((path, digest))
+
+    # Pillow releases the GIL while encoding, so threads scale across cores
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        entries = pool.map(lambda job: encode_variants(*job, widths, out_dir, root), todo)
+        for (path, _), entry in zip(todo, entries):
+            manifest[path] = {**entry, "widths": list(widths)}
+
+    write_manifest(manifest_path, manifest)
+    return manifest, [path for path, _ in todo]
+
+
+def display_width(attrs, entry):
+    """CSS pixel width the <img> asks for through its width/height attributes, or None."""
+    width = PIXELS.match(attrs.get("width", ""))
+    if width:
+        return round(float(width.group(1)))
+    height = PIXELS.match(attrs.get("height", ""))
+    if height:
+        return round(float(height.group(1)) * entry["width"] / entry["height"])
+    return None
+
+
+def default_sizes(attrs, entry):
+    width = display_width(attrs, entry)
+    return f"(max-width: {width}px) 100vw, {width}px" if width else SIZES
+
+
+def picture(attrs, entry, lazy):
+    """<picture> markup replacing an <img> whose source has variants.
+
+    The first image rewritten on a page (`lazy` false) is most likely the
+    largest one above the fold, so it is fetched early instead of lazily.
+    """
+    sizes = attrs.pop("sizes", None) or default_sizes(attrs, entry)
+    sources = []
+    for fmt in FORMATS:
+        srcset = ", ".join(f"{url} {width}w" for variant_fmt, width, url in entry["variants"] if variant_fmt == fmt)
+        sources.append(f'<source type="image/{fmt}" srcset="{srcset}" sizes="{html.escape(sizes)}">')
+
+    # Explicit dimensions let the browser reserve space before the image loads
+    if "width" not in attrs and "height" not in attrs:
+        attrs["width"], attrs["height"] = str(entry["width"]), str(entry["height"])
+    if lazy:
+        attrs.setdefault("loading", "lazy")
+    else:
+        attrs.setdefault("fetchpriority", "high")
+    attrs.setdefault("decoding", "async")
+
+    return f'<picture style="display:contents">{"".join(sources)}<img{format_attrs(attrs)}></picture>'
+
+
+def page_css(page, site_path, base, root=REPO_ROOT):
+    """The CSS that applies to a page: its <style> blocks and local stylesheets."""
+    css = [match.group(1) for match in STYLE_BLOCK.finditer(page)]
+    for match in LINK_TAG.finditer(page):
+        attrs = parse_attrs(match.group(0))
+        if "stylesheet" not in attrs.get("rel", "").lower().split() or not attrs.get("href"):
+            continue
+        parts = urlsplit(urljoin(urljoin(base, site_path), attrs["href"].strip()))
+        file = os.path.join(root, unquote(parts.path).lstrip("/"))
+        if f"{parts.scheme}://{parts.netloc}/" == base and os.path.isfile(file):
+            with open(file, encoding="utf-8", errors="replace") as f:
+                css.append(f.read())
+    return "\n".join(css)
+
+
+def image_refs(page, site_path, base, root=REPO_ROOT):
+    """(match, attrs, repo path) for every large local <img> not already in a <picture>.
+
+    Empty for pages whose CSS selects images by their position among siblings.
+    """
+    if STRUCTURAL_IMG.search(page_css(page, site_path, base, root)):
+        return []
+
+    taken = [m.span() for m in PICTURE.finditer(page)]
+    refs = []
+
+    for match in IMG_TAG.finditer(page):
+        if any(start <= match.start() < end for start, end in taken):
+            continue
+        attrs = parse_attrs(match.group(0))
+        path = local_path(attrs.get("src", ""), site_path, base, root)
+        if path and os.path.getsize(os.path.join(root, path)) >= MIN_BYTES:
+            refs.append((match, attrs, path))
+
+    return refs
+
+
+def rewrite_page(page, site_path, manifest, base, root=REPO_ROOT):
+    """Return `page` with its large local <img> tags turned into <picture> elements."""
+    refs = image_refs(page, site_path, base, root)
+    if not refs:
+        return page
+
+    # The first large image is usually the hero (the LCP element), so it isn't
+    # lazy-loaded; smaller images before it, such as a header logo, don't count
+    first = refs[0][0].start()
+    out = []
+    pos = 0
+    for match, attrs, path in refs:
+        out.append(page[pos:match.start()])
+        out.append(picture(attrs, manifest[path], lazy=match.start() != first))
+        pos = match.end()
+    out.append(page[pos:])
+    return "".join(out)
+
+
+def mirror_file(src, dst):
+    """Put `src` at `dst`, hard-linking when possible; skipped when dst is already the same file."""
+    if os.path.exists(dst):
+        if os.path.samefile(src, dst):
+            return
+        os.remove(dst)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def iter_site_files(root=REPO_ROOT):
+    """Repo-relative paths of every published file."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if d not in SKIP_DIRS and (not d.startswith(".") or d in PUBLISHED_DOT_DIRS)
+        )
+        for name in sorted(filenames):
+            if not name.startswith(".") and name not in UNPUBLISHED_FILES:
+                yield os.path.relpath(os.path.join(dirpath, name), root)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build responsive image variants and <picture> markup.")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--widths", type=int, nargs="+", default=list(WIDTHS))
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--dry-run", action="store_true", help="list the images that would be processed")
+    args = parser.parse_args(argv)
+
+    base = site_url()
+    pages = {}
+    for path in iter_html_files():
+        with open(os.path.join(REPO_ROOT, path), encoding="utf-8", errors="replace") as f:
+            pages[path] = f.read()
+
+    images = {}
+    for path, page in pages.items():
+        for _, _, image in image_refs(page, "/" + path.replace(os.sep, "/"), base):
+            images.setdefault(image, []).append(path)
+
+    if args.dry_run:
+        for image, used_by in sorted(images.items()):
+            print(f"{os.path.getsize(os.path.join(REPO_ROOT, image)) / 1024:>8.0f} KB  {image}  ({len(used_by)} pages)")
+        return 0
+
+    manifest, encoded = build_variants(images, args.widths, args.out_dir, args.jobs)
+
+    for path in iter_site_files():
+        dst = os.path.join(args.out_dir, path)
+        if path not in pages:
+            mirror_file(os.path.join(REPO_ROOT, path), dst)
+            continue
+        page = rewrite_page(pages[path], "/" + path.replace(os.sep, "/"), manifest, base)
+        if os.path.exists(dst):
+            os.remove(dst)  # may be a hard link to the source page
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        with open(dst, "w", encoding="utf-8") as f:
+            f.write(page)
+
+    original = sum(os.path.getsize(os.path.join(REPO_ROOT, image)) for image in images)
+    print(f"{len(images)} images ({len(encoded)} encoded, {len(images) - len(encoded)} unchanged), "
+          f"{original / 1024 / 1024:.1f} MB of originals -> {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""Make every short link reach its final URL in one hop.
+
+The live site is on GitHub Pages, which ignores _redirects: there, the
+redirects are the meta-refresh stub pages. Compiler.stub_pages() gives the
+pages scripts/publish.py writes into build/site so each one is a single hop:
+
+  - a stub whose target is itself a redirect points at the final URL instead
+  - a _redirects rule whose path no page serves gets a stub page of its own
+
+The _redirects file only takes effect on a mirror of the site on a host that
+reads it (Netlify, Cloudflare Pages). For such a mirror, short links like /ark are rules that 301 to a meta-refresh stub page
+(/ark.html), which then sends the browser on to Zaprite: two round trips
+plus an HTML parse. This script follows each rule through any further rules
+and stub pages to the final URL and rewrites it to point there directly. It
+also emits a generated block of rules for the stub pages themselves
+(/ark.html and /ark), so old links to the stubs skip the HTML too.
+
+The hop a rule was written against is kept as a "# via" comment, so the
+stub pages stay the source of truth: edit ark.html and re-run this script.
+Rules that pass through a stub are compiled to 302, since a stub's target
+is expected to change and a cached 301 would outlive it.
+
+A rule whose source is an existing file is ignored by _redirects hosts
+unless its status ends in "!" (forced). The generated stub rules exist to
+bypass the stub files, so they are forced; a hand-written rule that shadows
+a real page must be forced too, or it is reported.
+
+Problems are reported on stderr:
+  chain     a rule that needed more than one hop (collapsed in the output)
+  conflict  one source with two different targets, a rule shadowing a real page,
+            or a rule that no stub page can stand in for on GitHub Pages
+  dead      a rule or stub pointing at a page that doesn't exist, or a redirect loop
+            (with --check-urls, also external targets that answer 4xx/5xx)
+
+Problems listed in KNOWN_ISSUES are still printed, marked "known", but
+don't fail the run, so --check passes on the tree as it ships.
+
+Usage:
+  python scripts/compile_redirects.py               # print the compiled _redirects
+  python scripts/compile_redirects.py --write       # rewrite _redirects in place
+  python scripts/compile_redirects.py --check       # exit 1 if _redirects is stale or has errors
+  python scripts/compile_redirects.py --check-urls  # also request every external target
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from redirect_stubs import REPO_ROOT, find_stubs, iter_html_files, read_rules, site_url
+
+REDIRECTS_FILE = os.path.join(REPO_ROOT, "_redirects")
+STUB_STATUS = 302
+MAX_HOPS = 10
+
+BEGIN_MARKER = "# --- stub pages: generated by scripts/compile_redirects.py, do not edit ---"
+END_MARKER = "# --- end stub pages ---"
+VIA = re.compile(r"#\s*via\s+(\S+)")
+
+# (kind, source) of problems that predate this script and are left as they
+# are on purpose; remove an entry once the rule or page is fixed
+KNOWN_ISSUES = {
+    ("conflict", "/custody-treasury"): "unforced, so the custody-treasury/ section still wins",
+    ("conflict", "/schedule"): "unforced, so schedule.html still wins over the old IF schedule",
+    ("dead", "/september"): "september.html was removed; kept so the old link fails visibly",
+    ("dead", "/custody-whitepaper"): "whitepaper not published yet",
+    ("dead", "/reservation"): "reservation.html was removed",
+    ("dead", "/custody-spotlight.html"): "the spotlight PDF is not in the repo",
+    ("conflict", "/IF"): "only the _redirects mirror serves /IF; GitHub Pages has /if",
+}
+
+STUB_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta http-equiv="refresh" content="{delay:g}; url={url}">
+    <link rel="canonical" href="{url}">
+    <title>Redirecting</title>
+</head>
+<body>
+    <p>Redirecting to <a href="{url}">{url}</a>...</p>
+</body>
+</html>
+"""
+
+# Where a redirect ends up: `hops` counts redirects followed, `error` is set for dead ends and loops
+Resolution = namedtuple("Resolution", ["target", "hops", "via_stub", "error"])
+
+# A problem found while compiling; `kind` is "chain", "conflict" or "dead"
+Issue = namedtuple("Issue", ["kind", "source", "message"])
+
+
+def page_file(path, root=REPO_ROOT):
+    """Repo-relative file served for a site path, or None."""
+    rel = path.lstrip("/")
+    candidates = [rel, rel + ".html", os.path.join(rel, "index.html")] if rel else ["index.html"]
+    for candidate in candidates:
+        if candidate and os.path.isfile(os.path.join(root, candidate)):
+            return os.path.normpath(candidate)
+    return None
+
+
+def status_field(status, force=False):
+    return f"{status}!" if force else str(status)
+
+
+def stub_aliases(stub):
+    """Site paths that serve a stub page: /ark.html and /ark, or /dir/index.html and /dir/."""
+    if stub.site_path.endswith("/index.html"):
+        return [stub.site_path, stub.site_path[:-len("index.html")]]
+    if stub.site_path.endswith(".html"):
+        return [stub.site_path, stub.site_path[:-len(".html")]]
+    return [stub.site_path]
+
+
+def stub_file(source):
+    """Repo-relative HTML file that GitHub Pages serves for a rule's source path, or None."""
+    rel = source.lstrip("/")
+    if not rel or rel.endswith("/"):
+        return os.path.normpath(rel + "index.html")
+    if rel.endswith(".html"):
+        return os.path.normpath(rel)
+    if "." in os.path.basename(rel) or "*" in rel or ":" in rel:
+        return None  # another file type, or a splat/placeholder rule
+    return os.path.normpath(rel + ".html")
+
+
+def stub_page(url, delay=0):
+    return STUB_PAGE.format(url=html.escape(url), delay=delay)
+
+
+def generated_lines(lines):
+    """Line numbers (1-based) inside the generated stub block."""
+    inside = set()
+    active = False
+    for number, line in enumerate(lines, 1):
+        if line.strip() == BEGIN_MARKER:
+            active = True
+        elif line.strip() == END_MARKER:
+            active = False
+        elif active:
+            inside.add(number)
+    return inside
+
+
+class Compiler:
+    def __init__(self, root=REPO_ROOT):
+        self.root = root
+        self.base = site_url(root)
+        self.stubs = {os.path.normpath(stub.path): stub for stub in find_stubs(root)}
+
+        with open(os.path.join(root, "_redirects")) as f:
+            self.lines = f.read().splitlines()
+        generated = generated_lines(self.lines)
+
+        # Hand-written rules; a "# via" comment holds the target the rule was written against
+        self.rules = []
+        for rule in read_rules(root):
+            if rule.line in generated:
+                continue
+            via = VIA.search(self.lines[rule.line - 1])
+            self.rules.append(rule._replace(target=via.group(1)) if via else rule)
+        self.by_source = {}
+        for rule in self.rules:
+            self.by_source.setdefault(rule.source, rule)
+
+    def internal_path(self, target):
+        """Site path for a target on this site, or None for external URLs."""
+        if target.startswith(self.base):
+            target = "/" + target[len(self.base):]
+        if "://" in target:
+            return None
+        return unquote(urlsplit(target).path) or "/"
+
+    def shadowed_page(self, path):
+        """A real (non-stub) file served at `path`, or None."""
+        rel = path.lstrip("/")
+        candidates = [rel, rel + ".html", os.path.join(rel, "index.html")] if rel else ["index.html"]
+        for candidate in candidates:
+            file = os.path.normpath(candidate)
+            if candidate and os.path.isfile(os.path.join(self.root, candidate)) and file not in self.stubs:
+                return file
+        return None
+
+    def same_destination(self, a, b):
+        """Whether two resolved targets are the same page (/tems/ and /tems/index.html are)."""
+        path_a, path_b = self.internal_path(a), self.internal_path(b)
+        if path_a is None or path_b is None:
+            return a == b
+        return page_file(path_a, self.root) == page_file(path_b, self.root)
+
+    def resolve(self, target):
+        hops = 0
+        via_stub = False
+        seen = set()
+
+        while True:
+            path = self.internal_path(target)
+            if path is None:
+                return Resolution(target, hops, via_stub, None)
+            if path in seen or hops > MAX_HOPS:
+                return Resolution(target, hops, via_stub, f"redirect loop at {path}")
+            seen.add(path)
+
+            # A real page beats an unforced rule for the same path
+            rule = self.by_source.get(path)
+            if rule and (rule.force or not self.shadowed_page(path)):
+                target = rule.target
+                hops += 1
+                continue
+
+            file = page_file(path, self.root)
+            if file is None:
+                return Resolution(target, hops, via_stub, f"{path} does not exist")
+
+            stub = self.stubs.get(file)
+            if stub:
+                target = stub.target
+                hops += 1
+                via_stub = True
+                continue
+
+            return Resolution(target, hops, via_stub, None)
+
+    def compile(self):
+        """Return (compiled _redirects text, issues)."""
+        issues = []
+        out = []
+        generated = generated_lines(self.lines)
+        rules_by_line = {rule.line: rule for rule in self.rules}
+        targets = {}
+
+        for rule in self.rules:
+            if rule.source in targets and targets[rule.source] != rule.target:
+                issues.append(Issue("conflict", rule.source, f"line {rule.line} redirects to {rule.target}, "
+                                                             f"an earlier rule to {targets[rule.source]}"))
+            targets.setdefault(rule.source, rule.target)
+
+            file = self.shadowed_page(rule.source)
+            if file and not rule.force:
+                issues.append(Issue("conflict", rule.source, f"rule shadows the page {file} (and is ignored unless forced with !)"))
+
+        for number, line in enumerate(self.lines, 1):
+            if number in generated or line.strip() in (BEGIN_MARKER, END_MARKER):
+                continue
+            rule = rules_by_line.get(number)
+            if not rule:
+                out.append(line.rstrip())
+                continue
+
+            resolved = self.resolve(rule.target)
+            if resolved.error:
+                issues.append(Issue("dead", rule.source, resolved.error))
+                out.append(f"{rule.source} {rule.target} {status_field(rule.status, rule.force)}")
+                continue
+            if resolved.hops:
+                issues.append(Issue("chain", rule.source, f"{resolved.hops + 1} hops via {rule.target}"))
+                status = STUB_STATUS if resolved.via_stub else rule.status
+                out.append(f"{rule.source} {resolved.target} {status_field(status, rule.force)} # via {rule.target}")
+            else:
+                out.append(f"{rule.source} {rule.target} {status_field(rule.status, rule.force)}")
+
+        # Stub pages themselves, for links that skip the short URL. The stub file
+        # exists at each alias, so the rules are forced; an alias that would
+        # also hide a real page is left out.
+        block = []
+        for file, stub in sorted(self.stubs.items()):
+            resolved = self.resolve(stub.target)
+            if resolved.error:
+                issues.append(Issue("dead", stub.site_path, f"stub target: {resolved.error}"))
+                continue
+            for alias in stub_aliases(stub):
+                if alias in targets:
+                    if not self.same_destination(self.resolve(targets[alias]).target, resolved.target):
+                        issues.append(Issue("conflict", alias, f"rule target differs from the {file} stub"))
+                    continue
+                page = self.shadowed_page(alias)
+                if page:
+                    issues.append(Issue("conflict", alias, f"{file} stub alias would shadow the page {page}; not generated"))
+                    continue
+                block.append(f"{alias} {resolved.target} {status_field(STUB_STATUS, force=True)}")
+
+        while out and not out[-1]:
+            out.pop()
+        out += ["", BEGIN_MARKER, *block, END_MARKER]
+        return "\n".join(out) + "\n", issues
+
+    def stub_pages(self):
+        """Return ({repo-relative path: page}, issues) for the meta-refresh pages GitHub Pages needs.
+
+        Stubs that already point at their final URL are left out, as are
+        rules whose path a page (real or stub) already serves: on GitHub
+        Pages that page wins, as it does for an unforced rule.
+        """
+        pages = {}
+        issues = []
+
+        for file, stub in sorted(self.stubs.items()):
+            resolved = self.resolve(stub.target)
+            if not resolved.error and resolved.hops:
+                pages[file] = stub_page(resolved.target, stub.delay)
+
+        # A checkout on a case-insensitive filesystem can't hold both IF.html and if.html
+        taken = {path.lower() for path in iter_html_files(self.root)}
+        for rule in self.rules:
+            if page_file(rule.source, self.root) or self.resolve(rule.target).error:
+                continue
+            file = stub_file(rule.source)
+            if file is None:
+                issues.append(Issue("conflict", rule.source, "no stub page can serve this path on GitHub Pages"))
+                continue
+            if file in pages:
+                continue
+            if file.lower() in taken:
+                issues.append(Issue("conflict", rule.source, f"{file} differs only in case from an existing page; no stub written"))
+                continue
+            pages[file] = stub_page(self.resolve(rule.target).target)
+            taken.add(file.lower())
+
+        return pages, issues
+
+    def external_targets(self):
+        targets = {stub.target for stub in self.stubs.values()} | {rule.target for rule in self.rules}
+        return sorted(target for target in targets if self.internal_path(target) is None)
+
+
+def url_status(url, timeout=10):
+    """HTTP status of `url` (following redirects), or an error string."""
+    request = urllib.request.Request(url, method="HEAD", headers={"User-Agent": "bitcoinpark-redirect-check"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        # Some hosts reject HEAD; only trust a 4xx if GET agrees
+        if e.code == 405 or e.code == 403:
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    return response.status
+            except urllib.error.HTTPError as e2:
+                return e2.code
+            except (urllib.error.URLError, OSError) as e2:
+                return str(e2)
+        return e.code
+    except (urllib.error.URLError, OSError) as e:
+        return str(e)
+
+
+def check_urls(compiler, jobs=8):
+    issues = []
+    urls = compiler.external_targets()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for url, status in zip(urls, pool.map(url_status, urls)):
+            if not isinstance(status, int) or status >= 400:
+                issues.append(Issue("dead", url, f"external target answered {status}"))
+    return issues
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collapse redirect chains in _redirects.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--write", action="store_true", help="rewrite _redirects in place")
+    mode.add_argument("--check", action="store_true", help="exit 1 if _redirects is stale or has errors")
+    parser.add_argument("--check-urls", action="store_true", help="request every external target")
+    args = parser.parse_args(argv)
+
+    compiler = Compiler()
+    compiled, issues = compiler.compile()
+    issues += compiler.stub_pages()[1]
+    if args.check_urls:
+        issues += check_urls(compiler)
+
+    errors = []
+    for issue in issues:
+        known = KNOWN_ISSUES.get((issue.kind, issue.source))
+        if known:
+            print(f"{issue.kind:<9} {issue.source}: {issue.message} [known: {known}]", file=sys.stderr)
+            continue
+        print(f"{issue.kind:<9} {issue.source}: {issue.message}", file=sys.stderr)
+        if issue.kind != "chain":
+            errors.append(issue)
+
+    with open(REDIRECTS_FILE) as f:
+        current = f.read()
+
+    if args.check:
+        stale = compiled != current
+        if stale:
+            print("_redirects is not compiled; run scripts/compile_redirects.py --write", file=sys.stderr)
+        return 1 if stale or errors else 0
+
+    if args.write:
+        if compiled != current:
+            with open(REDIRECTS_FILE, "w") as f:
+                f.write(compiled)
+        chains = sum(issue.kind == "chain" for issue in issues)
+        print(f"Wrote {REDIRECTS_FILE} ({chains} chains collapsed, {len(errors)} problems)", file=sys.stderr)
+    else:
+        sys.stdout.write(compiled)
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,31 @@
 #!/usr/bin/env node
-// Generates schedule.ics from the schedule Google Sheet (via the Apps Script JSON endpoint).
-// Run: node scripts/generate-schedule-ics.js
-// Output is deterministic for a given sheet state, so the CI workflow only commits real changes.
+// Generates the calendar feeds from the schedule Google Sheet (via the Apps Script JSON endpoint):
+//   schedule.ics              every event (the original feed, kept for existing subscribers)
+//   calendar/upcoming.ics     events in the next 90 days
+//   calendar/nashville.ics    one feed per campus
+//   calendar/austin.ics
+//   calendar/<year>.ics       past years, written once and then frozen
+//   schedule.json             snapshot of the sheet rows that schedule.html loads first
+// Run: node scripts/generate-schedule-ics.js [--check] [--force]
+// Each output stores a hash of its rows (and of this script) and is only
+// rewritten when that changes. --check only reports: exit 0 if
+// every feed is up to date, 1 if any would change. --force rewrites every
+// feed, year archives included. Errors exit 2.
 
+const crypto = require('crypto');
 const fs = require('fs');
 const path = require('path');
 
 const FEED_URL = process.env.SCHEDULE_FEED_URL || 'https://script.google.com/macros/s/AKfycbxOrOe84ly3hnCGC-7OfzAmtiNd4OwpzLywLC0wA58piuws1CL0aeCHreQYkFtF3-83/exec';
-const OUT_FILE = path.join(__dirname, '..', 'schedule.ics');
+const ROOT = path.join(__dirname, '..');
+const OUT_FILE = path.join(ROOT, 'schedule.ics');
+const SNAPSHOT_FILE = path.join(ROOT, 'schedule.json');
+const CALENDAR_DIR = path.join(ROOT, 'calendar');
+const UPCOMING_DAYS = 90;
+const CAMPUSES = ['Nashville', 'Austin'];
+
+const CHECK = process.argv.includes('--check');
+const FORCE = process.argv.includes('--force');
 
 const MONTHS = { Jan: 1, Feb: 2, Mar: 3, Apr: 4, May: 5, Jun: 6, Jul: 7, Aug: 8, Sep: 9, Oct: 10, Nov: 11, Dec: 12 };
 
@@ -99,34 +117,61 @@ function foldLine(line) {
     return out.join('\r\n');
 }
 
-async function main() {
-    const res = await fetch(FEED_URL);
-    if (!res.ok) throw new Error(`Feed request failed: ${res.status}`);
-    const events = await res.json();
-    if (!Array.isArray(events) || events.length === 0) {
-        throw new Error('Feed returned no events; refusing to overwrite schedule.ics');
+// Key-sorted, whitespace-trimmed copy of a row, so the hash ignores key order
+// and stray spaces the sheet doesn't show.
+function normaliseRow(row) {
+    const out = {};
+    for (const key of Object.keys(row || {}).sort()) {
+        const value = row[key];
+        out[key.trim()] = typeof value === 'string' ? value.trim() : value;
     }
+    return out;
+}
 
-    const lines = [
-        'BEGIN:VCALENDAR',
-        'VERSION:2.0',
-        'PRODID:-//Bitcoin Park//Schedule//EN',
-        'CALSCALE:GREGORIAN',
-        'METHOD:PUBLISH',
-        'X-WR-CALNAME:Bitcoin Park Events',
-        'X-WR-CALDESC:Events at Bitcoin Park in Nashville and Austin. bitcoinpark.com/schedule',
-        'X-PUBLISHED-TTL:PT6H',
-        'REFRESH-INTERVAL;VALUE=DURATION:PT6H',
-        ...VTIMEZONE,
-    ];
+// Anything that changes a feed: its rows and the generator itself.
+function sourceHash(rows) {
+    return crypto.createHash('sha256')
+        .update(fs.readFileSync(__filename))
+        .update(JSON.stringify(rows.map(normaliseRow)))
+        .digest('hex');
+}
 
-    // DTSTAMP/LAST-MODIFIED must be the generation time, not the event date:
-    // subscribers (notably Google) may skip merging a changed event whose
-    // DTSTAMP is identical to the copy they already hold.
-    const buildStamp = new Date().toISOString().replace(/[-:]/g, '').replace(/\.\d+/, '');
+function storedHash(file) {
+    if (!fs.existsSync(file)) return null;
+    if (file.endsWith('.json')) return JSON.parse(fs.readFileSync(file, 'utf8')).source || null;
+    // Unfold continuation lines before looking for the property
+    const m = /^X-SOURCE-HASH:(\w+)/m.exec(fs.readFileSync(file, 'utf8').replace(/\r?\n /g, ''));
+    return m ? m[1] : null;
+}
+
+// The rows schedule.html needs, in date order: blank rows dropped, strings
+// trimmed, column order kept (the page falls back to column positions).
+function snapshot(rows, hash) {
+    const dateKey = row => {
+        const d = parseSheetDate(row['start date']);
+        return d ? fmtDate(d) : '99999999';
+    };
+    // schedule.html takes its columns from the first row, and sorting changes
+    // which row that is, so every row carries every column in feed order
+    const columns = [...new Set(rows.flatMap(row => Object.keys(row || {})))];
+    const events = rows
+        .filter(row => row && Object.values(row).some(value => String(value ?? '').trim()))
+        .map(row => Object.fromEntries(columns.map(k => [k, typeof row[k] === 'string' ? row[k].trim() : (row[k] ?? '')])))
+        .sort((a, b) => dateKey(a).localeCompare(dateKey(b)));
+    return JSON.stringify({ source: hash, events }) + '\n';
+}
+
+// Calendar date "now" on the campuses' wall clock.
+function todayInCentral() {
+    const [y, mo, d] = new Date().toLocaleDateString('en-CA', { timeZone: TZID }).split('-').map(Number);
+    return { y, mo, d };
+}
+
+// One VEVENT per usable row; rows without a name or a valid start date are skipped.
+function buildEvents(rows, buildStamp) {
+    const events = [];
 
-    let count = 0;
-    for (const row of events) {
+    for (const row of rows) {
         const name = String(row['event name'] || '').trim();
         const start = parseSheetDate(row['start date']);
         if (!name || !start) continue;
@@ -136,12 +181,12 @@ async function main() {
         const desc = [String(row['description'] || '').trim(), link].filter(Boolean).join('\n');
         const uid = `${fmtDate(start)}-${name.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-|-$/g, '')}@bitcoinpark.com`;
 
-        lines.push(
+        const lines = [
             'BEGIN:VEVENT',
             `UID:${uid}`,
             `DTSTAMP:${buildStamp}`,
-            `LAST-MODIFIED:${buildStamp}`
-        );
+            `LAST-MODIFIED:${buildStamp}`,
+        ];
 
         const startTime = parseSheetTime(row['start time']);
         const endTime = parseSheetTime(row['end time']);
@@ -177,16 +222,127 @@ async function main() {
         if (desc) lines.push(`DESCRIPTION:${escapeText(desc)}`);
         if (link) lines.push(`URL:${link}`);
         lines.push('END:VEVENT');
-        count++;
+
+        events.push({ row, start, end, location, lines });
+    }
+
+    return events;
+}
+
+// Every feed to publish. Frozen feeds cover finished years: once written they
+// never change, so subscribers can cache them indefinitely.
+function feeds(events, today) {
+    const from = fmtDate(today);
+    const until = fmtDate(addDays(today, UPCOMING_DAYS));
+    const list = [
+        {
+            file: OUT_FILE,
+            name: 'Bitcoin Park Events',
+            desc: 'Events at Bitcoin Park in Nashville and Austin. bitcoinpark.com/schedule',
+            events,
+        },
+        {
+            file: path.join(CALENDAR_DIR, 'upcoming.ics'),
+            name: 'Bitcoin Park Events (Upcoming)',
+            desc: `Events at Bitcoin Park in the next ${UPCOMING_DAYS} days. bitcoinpark.com/schedule`,
+            events: events.filter(e => fmtDate(e.end) >= from && fmtDate(e.start) <= until),
+        },
+    ];
+
+    for (const campus of CAMPUSES) {
+        list.push({
+            file: path.join(CALENDAR_DIR, `${campus.toLowerCase()}.ics`),
+            name: `Bitcoin Park ${campus} Events`,
+            desc: `Events at Bitcoin Park ${campus}. bitcoinpark.com/schedule`,
+            events: events.filter(e => e.location.toLowerCase().includes(campus.toLowerCase())),
+        });
     }
 
-    lines.push('END:VCALENDAR');
+    const years = [...new Set(events.map(e => e.start.y))].filter(y => y < today.y).sort();
+    for (const year of years) {
+        list.push({
+            file: path.join(CALENDAR_DIR, `${year}.ics`),
+            name: `Bitcoin Park Events ${year}`,
+            desc: `Events at Bitcoin Park in ${year}. bitcoinpark.com/schedule`,
+            events: events.filter(e => e.start.y === year),
+            frozen: true,
+        });
+    }
 
-    fs.writeFileSync(OUT_FILE, lines.map(foldLine).join('\r\n') + '\r\n');
-    console.log(`Wrote ${count} events to ${OUT_FILE}`);
+    return list;
+}
+
+function renderCalendar(feed, hash) {
+    // Frozen archives are never regenerated, so there is nothing to poll for
+    const ttl = feed.frozen ? 'P1W' : 'PT6H';
+    const lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Bitcoin Park//Schedule//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        `X-WR-CALNAME:${feed.name}`,
+        `X-WR-CALDESC:${feed.desc}`,
+        `X-PUBLISHED-TTL:${ttl}`,
+        `REFRESH-INTERVAL;VALUE=DURATION:${ttl}`,
+        `X-SOURCE-HASH:${hash}`,
+        ...VTIMEZONE,
+        ...feed.events.flatMap(e => e.lines),
+        'END:VCALENDAR',
+    ];
+    return lines.map(foldLine).join('\r\n') + '\r\n';
+}
+
+async function main() {
+    const res = await fetch(FEED_URL);
+    if (!res.ok) throw new Error(`Feed request failed: ${res.status}`);
+    const rows = await res.json();
+    if (!Array.isArray(rows) || rows.length === 0) {
+        throw new Error('Feed returned no events; refusing to overwrite schedule.ics');
+    }
+
+    // DTSTAMP/LAST-MODIFIED must be the generation time, not the event date:
+    // subscribers (notably Google) may skip merging a changed event whose
+    // DTSTAMP is identical to the copy they already hold.
+    const buildStamp = new Date().toISOString().replace(/[-:]/g, '').replace(/\.\d+/, '');
+    const events = buildEvents(rows, buildStamp);
+
+    // A feed is stale when its rows changed; frozen archives only when missing
+    const stale = [];
+    for (const feed of feeds(events, todayInCentral())) {
+        feed.hash = sourceHash(feed.events.map(e => e.row));
+        const current = feed.frozen ? fs.existsSync(feed.file) : storedHash(feed.file) === feed.hash;
+        if (FORCE || !current) stale.push(feed);
+    }
+
+    const snapshotHash = sourceHash(rows);
+    if (FORCE || storedHash(SNAPSHOT_FILE) !== snapshotHash) {
+        stale.push({ file: SNAPSHOT_FILE, hash: snapshotHash, snapshot: true });
+    }
+
+    const names = stale.map(feed => path.relative(ROOT, feed.file)).join(', ');
+    if (CHECK) {
+        console.log(stale.length ? `Out of date: ${names}` : 'All schedule files are up to date');
+        process.exit(stale.length ? 1 : 0);
+    }
+    if (!stale.length) {
+        console.log('Schedule sheet unchanged, all schedule files are up to date');
+        return;
+    }
+
+    fs.mkdirSync(CALENDAR_DIR, { recursive: true });
+    for (const feed of stale) {
+        if (feed.snapshot) {
+            fs.writeFileSync(feed.file, snapshot(rows, feed.hash));
+            console.log(`Wrote schedule snapshot to ${path.relative(ROOT, feed.file)}`);
+            continue;
+        }
+        fs.writeFileSync(feed.file, renderCalendar(feed, feed.hash));
+        console.log(`Wrote ${feed.events.length} events to ${path.relative(ROOT, feed.file)}`);
+    }
 }
 
 main().catch(err => {
     console.error(err.message || err);
-    process.exit(1);
+    process.exit(2);
 });
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Check what each page costs to load against per-page budgets.
+
+For the site's index pages (/index.html and every section's index.html),
+this resolves the local assets the page references (images, stylesheets,
+scripts, media, icons, CSS url()s including those in linked stylesheets)
+and computes:
+
+  bytes     the HTML plus every distinct local asset, as stored on disk
+  requests  the HTML plus every distinct asset URL, local or external
+  largest   the biggest single local asset
+
+Each metric is compared with the page's entry in scripts/page_budgets.json,
+or the "default" entry for pages not listed there, and the script exits 1
+with a report when any page is over. Redirect stub pages are skipped.
+
+Only the src of an <img> counts: srcset and <picture> sources are
+alternatives, and a browser fetches one of them.
+
+Usage:
+  python scripts/page_budget.py                    # check the index pages
+  python scripts/page_budget.py --all              # every page, not just index pages
+  python scripts/page_budget.py --root build/site  # measure the published output
+  python scripts/page_budget.py --update           # rewrite budgets from the current sizes
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from collections import namedtuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+from redirect_stubs import REPO_ROOT, iter_html_files, parse_attrs, parse_refresh, site_url
+
+BUDGETS_FILE = os.path.join(REPO_ROOT, "scripts", "page_budgets.json")
+METRICS = ("bytes", "requests", "largest")
+
+# --update leaves this much room above the current size before a page fails
+HEADROOM = 0.10
+
+ASSET_TAG = re.compile(r"<(img|script|link|source|video|audio|track|iframe|embed|object|input)\b[^>]*>", re.IGNORECASE)
+CSS_URL = re.compile(r"""url\(\s*(?:"([^"]*)"|'([^']*)'|([^)'"\s]+))\s*\)""", re.IGNORECASE)
+CSS_IMPORT = re.compile(r"""@import\s+(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+LINK_RELS = {"stylesheet", "icon", "shortcut", "apple-touch-icon", "preload", "modulepreload", "manifest"}
+
+# One page's cost; `largest` is (bytes, site path)
+PageCost = namedtuple("PageCost", ["page", "bytes", "requests", "largest", "missing"])
+
+
+def asset_urls(tag):
+    """URLs a tag makes the browser fetch while loading the page."""
+    name = re.match(r"<([\w-]+)", tag).group(1).lower()
+    attrs = parse_attrs(tag)
+
+    if name == "link":
+        rels = set(attrs.get("rel", "").lower().split())
+        return [attrs["href"]] if rels & LINK_RELS and attrs.get("href") else []
+    if name == "source":
+        # <source> in <video>/<audio> uses src; in <picture> it is an alternative to the <img>
+        return [attrs["src"]] if attrs.get("src") else []
+    if name == "input":
+        return [attrs["src"]] if attrs.get("type", "").lower() == "image" and attrs.get("src") else []
+    if name == "object":
+        return [attrs["data"]] if attrs.get("data") else []
+
+    return [attrs[key] for key in ("src", "poster") if attrs.get(key)]
+
+
+def css_urls(css):
+    urls = [next(v for v in m.groups() if v is not None) for m in CSS_URL.finditer(css)]
+    urls += [next(v for v in m.groups() if v is not None) for m in CSS_IMPORT.finditer(css)]
+    return urls
+
+
+class Site:
+    def __init__(self, root=REPO_ROOT):
+        self.root = root
+        self.base = site_url(REPO_ROOT)
+
+    def resolve(self, url, site_path):
+        """(site path, local file or None) for a URL on this site; None for external URLs and data URIs."""
+        url = url.strip()
+        if not url or url.startswith(("data:", "#", "javascript:", "mailto:", "tel:")):
+            return None
+        absolute = urljoin(urljoin(self.base, site_path), url)
+        parts = urlsplit(absolute)
+        if f"{parts.scheme}://{parts.netloc}/" != self.base:
+            return absolute, None
+        path = unquote(parts.path)
+        file = os.path.join(self.root, path.lstrip("/"))
+        if path.endswith("/"):
+            file = os.path.join(file, "index.html")
+        return path, (file if os.path.isfile(file) else "")
+
+    def measure(self, page_path):
+        """PageCost for a repo-relative HTML path."""
+        site_path = "/" + page_path.replace(os.sep, "/")
+        with open(os.path.join(self.root, page_path), encoding="utf-8", errors="replace") as f:
+            page = f.read()
+
+        refs = [url for match in ASSET_TAG.finditer(page) for url in asset_urls(match.group(0))]
+        refs += css_urls(page)  # <style> blocks and style="" attributes
+
+        assets = {}  # site path or external URL -> local file, "" if missing, None if external
+        pending = [(url, site_path) for url in refs]
+        while pending:
+            url, from_path = pending.pop()
+            resolved = self.resolve(url, from_path)
+            if not resolved or resolved[0] in assets:
+                continue
+            path, file = resolved
+            assets[path] = file
+            # Stylesheets pull in their own images, fonts and imports
+            if file and file.endswith(".css"):
+                with open(file, encoding="utf-8", errors="replace") as f:
+                    pending += [(u, path) for u in css_urls(f.read())]
+
+        html_bytes = len(page.encode())
+        local = {path: os.path.getsize(file) for path, file in assets.items() if file}
+        largest = max(((size, path) for path, size in local.items()), default=(0, ""))
+        missing = sorted(path for path, file in assets.items() if file == "")
+
+        return PageCost(page_path, html_bytes + sum(local.values()), 1 + len(assets), largest, missing)
+
+
+def index_pages(root, include_all=False):
+    """Pages to measure: index pages (or every page), without redirect stubs."""
+    for path in iter_html_files(root):
+        if not include_all and os.path.basename(path) != "index.html":
+            continue
+        with open(os.path.join(root, path), encoding="utf-8", errors="replace") as f:
+            if parse_refresh(f.read()):
+                continue
+        yield path
+
+
+def load_budgets(path=BUDGETS_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+def budget_for(budgets, page):
+    return {**budgets["default"], **budgets.get("pages", {}).get(page.replace(os.sep, "/"), {})}
+
+
+def over_budget(cost, budget):
+    """[(metric, actual, limit)] for every metric the page exceeds."""
+    actual = {"bytes": cost.bytes, "requests": cost.requests, "largest": cost.largest[0]}
+    return [(metric, actual[metric], budget[metric]) for metric in METRICS if metric in budget and actual[metric] > budget[metric]]
+
+
+def fmt_bytes(n):
+    if n >= 1024 * 1024:
+        return f"{n / 1024 / 1024:.1f} MB"
+    return f"{n / 1024:.0f} KB"
+
+
+def fmt_metric(metric, value):
+    return str(value) if metric == "requests" else fmt_bytes(value)
+
+
+def with_headroom(value, metric):
+    if metric == "requests":
+        return value + max(2, math.ceil(value * HEADROOM))
+    # Round up to a whole KB so the config stays readable
+    return math.ceil(value * (1 + HEADROOM) / 1024) * 1024
+
+
+def print_report(costs, failures):
+    print(f"{'page':<48} {'bytes':>9} {'requests':>9} {'largest':>9}  largest asset")
+    print("-" * 100)
+    for cost in costs:
+        flag = " !" if cost.page in failures else ""
+        print(f"{cost.page:<48} {fmt_bytes(cost.bytes):>9} {cost.requests:>9} {fmt_bytes(cost.largest[0]):>9}  {cost.largest[1]}{flag}")
+
+    for cost in costs:
+        for path in cost.missing:
+            print(f"warning: {cost.page} references missing {path}", file=sys.stderr)
+
+    if not failures:
+        print(f"\nAll {len(costs)} pages within budget.")
+        return
+
+    print(f"\n{len(failures)} page(s) over budget:")
+    for page, problems in failures.items():
+        for metric, actual, limit in problems:
+            print(f"  {page}: {metric} {fmt_metric(metric, actual)} > budget {fmt_metric(metric, limit)}")
+    print(f"\nShrink the page, or if the increase is intended, raise its budget in {os.path.relpath(BUDGETS_FILE, REPO_ROOT)}.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check page weight and request count against budgets.")
+    parser.add_argument("--root", default=REPO_ROOT, help="site to measure (default: the repo)")
+    parser.add_argument("--all", action="store_true", help="measure every page, not just index pages")
+    parser.add_argument("--budgets", default=BUDGETS_FILE)
+    parser.add_argument("--update", action="store_true", help="set each page's budget to its current size plus headroom")
+    parser.add_argument("--json", action="store_true", help="print the measurements as JSON")
+    args = parser.parse_args(argv)
+
+    site = Site(os.path.abspath(args.root))
+    costs = [site.measure(page) for page in index_pages(site.root, args.all)]
+
+    if args.update:
+        budgets = load_budgets(args.budgets) if os.path.exists(args.budgets) else {"default": {}}
+        budgets["pages"] = {
+            cost.page.replace(os.sep, "/"): {
+                "bytes": with_headroom(cost.bytes, "bytes"),
+                "requests": with_headroom(cost.requests, "requests"),
+                "largest": with_headroom(cost.largest[0], "largest"),
+            }
+            for cost in costs
+        }
+        with open(args.budgets, "w") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"Wrote budgets for {len(costs)} pages to {args.budgets}")
+        return 0
+
+    budgets = load_budgets(args.budgets)
+    failures = {}
+    for cost in costs:
+        problems = over_budget(cost, budget_for(budgets, cost.page))
+        if problems:
+            failures[cost.page] = problems
+
+    if args.json:
+        print(json.dumps([
+            {**cost._asdict(), "largest": {"bytes": cost.largest[0], "path": cost.largest[1]},
+             "over": [metric for metric, _, _ in failures.get(cost.page, [])]}
+            for cost in costs
+        ], indent=2))
+    else:
+        print_report(costs, failures)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
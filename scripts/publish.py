@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""Publish the static site to build/site, the GitHub Pages artifact, as small as possible.
+
+GitHub Pages ignores _redirects, so redirects first become pages: stubs
+that chain through another redirect are rewritten to point at the final URL,
+and rules whose path no page serves get a stub page (see
+compile_redirects.py, Compiler.stub_pages). Each page then goes through
+three stages:
+
+  1. images     large <img> tags become <picture>/srcset (see build_images.py)
+  2. shared CSS <style> blocks used verbatim by several pages move to
+                /_css/<hash>.css, fetched once and reused by every page
+                (relative url()s are rebased to site-absolute paths first)
+  3. minify     HTML whitespace and comments, inline CSS and inline JS
+
+GitHub Pages gzips text responses itself and sets its own cache headers, so
+nothing here writes precompressed files or header rules; the report shows
+the gzipped size a visitor downloads. .github/workflows/deploy-site.yml runs
+this script and deploys build/site.
+
+Builds are incremental: .publish-manifest.json records a hash of each page
+after stages 1-2, and pages whose hash is unchanged skip minifying. Other
+files are hard-linked into build/site as they are.
+
+Usage:
+  python scripts/publish.py                  # full publish
+  python scripts/publish.py --no-images      # skip the image variants (fast)
+  python scripts/publish.py --force          # ignore the manifest
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from urllib.parse import urljoin, urlsplit
+
+import build_images
+from compile_redirects import Compiler
+from build_images import OUT_DIR, build_variants, image_refs, iter_site_files, mirror_file, rewrite_page
+from redirect_stubs import REPO_ROOT, site_url
+
+CSS_DIR = "_css"
+MANIFEST_NAME = ".publish-manifest.json"
+
+# Bump when the output format changes so every page is rebuilt
+PUBLISH_VERSION = 2
+
+# Only blocks at least this big are worth an extra request on first view
+SHARED_CSS_MIN_BYTES = 2048
+# Text files: minified where we know how, and gzipped in transit by GitHub Pages
+TEXT_EXTS = (".html", ".css", ".js", ".mjs", ".svg", ".json", ".ics", ".xml", ".txt", ".webmanifest")
+
+STYLE_BLOCK = re.compile(r"<style\b([^>]*)>(.*?)</style\s*>", re.IGNORECASE | re.DOTALL)
+RAW_BLOCK = re.compile(r"(<(script|style|pre|textarea)\b([^>]*)>)(.*?)(</\2\s*>)|<!--(.*?)-->", re.IGNORECASE | re.DOTALL)
+TYPE_ATTR = re.compile(r"""\btype\s*=\s*["']?([^"'\s>]+)""", re.IGNORECASE)
+CSS_TYPE_ONLY = re.compile(r"""type\s*=\s*["']?text/css["']?""", re.IGNORECASE)
+JS_TYPES = ("", "text/javascript", "application/javascript", "module")
+
+CSS_URL = re.compile(r"""\burl\(\s*(["']?)([^"')]*?)\1\s*\)|@import\s+(["'])([^"']*)\3""", re.IGNORECASE)
+CSS_SKIP = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/""", re.DOTALL)
+
+JS_IDENT = re.compile(r"[A-Za-z0-9_$\\\u0080-\uffff]")
+JS_WORD = re.compile(r"[A-Za-z0-9_$\\\u0080-\uffff]+")
+JS_SPACE = " \t\r\n\f\v\u00a0\ufeff"
+# A "/" after one of these starts a regex literal rather than a division
+JS_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+JS_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "void", "delete", "new", "throw", "instanceof", "yield", "await"}
+
+
+# ============ MINIFY ============
+
+def minify_css(css):
+    """Strip comments and whitespace from CSS, leaving strings alone."""
+    out = []
+    pos = 0
+
+    def squeeze(code):
+        code = re.sub(r"\s+", " ", code)
+        code = re.sub(r"\s*([{};,>])\s*", r"\1", code)
+        # Not before ":", which would turn "a :hover" into "a:hover"
+        return re.sub(r":\s+", ":", code)
+
+    for match in CSS_SKIP.finditer(css):
+        out.append(squeeze(css[pos:match.start()]))
+        if match.group(1):
+            out.append(match.group(1))
+        pos = match.end()
+    out.append(squeeze(css[pos:]))
+    return "".join(out).replace(";}", "}").strip()
+
+
+def js_string_end(js, i):
+    """Index just past the string or template literal starting at js[i]."""
+    quote = js[i]
+    j = i + 1
+    while j < len(js):
+        c = js[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == quote:
+            return j + 1
+        if quote == "`" and js.startswith("${", j):
+            j = js_template_expr_end(js, j + 2)
+            continue
+        j += 1
+    return len(js)
+
+
+def js_template_expr_end(js, j):
+    depth = 1
+    while j < len(js):
+        c = js[j]
+        if c in "'\"`":
+            j = js_string_end(js, j)
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    return len(js)
+
+
+def js_regex_end(js, i):
+    """Index just past the regex literal at js[i], or None if it isn't one."""
+    j = i + 1
+    in_class = False
+    while j < len(js):
+        c = js[j]
+        if c == "\n":
+            return None
+        if c == "\\":
+            j += 2
+            continue
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            flags = JS_WORD.match(js, j + 1)
+            return flags.end() if flags else j + 1
+        j += 1
+    return None
+
+
+def regex_allowed(tokens):
+    significant = [token for token in tokens[-6:] if not token.isspace()]
+    if not significant:
+        return True
+    last = significant[-1]
+    if JS_IDENT.match(last[-1]):
+        return last in JS_REGEX_KEYWORDS
+    # "i++ / 2": a postfix ++/-- ends an expression, so "/" divides
+    if last in "+-" and significant[-2:-1] == [last] and len(significant) > 2:
+        before = significant[-3][-1]
+        if JS_IDENT.match(before) or before in ")]":
+            return False
+    return last[-1] in JS_REGEX_AFTER
+
+
+def minify_js(js):
+    """Strip comments, indentation and spaces from JavaScript.
+
+    Line breaks are kept wherever automatic semicolon insertion could depend
+    on them, so this never changes what the code means; it is not a renaming
+    minifier.
+    """
+    tokens = []
+    gap = ""
+    i = 0
+
+    while i < len(js):
+        c = js[i]
+        if c in JS_SPACE:
+            j = i
+            while j < len(js) and js[j] in JS_SPACE:
+                j += 1
+            gap = "\n" if "\n" in js[i:j] or gap == "\n" else " "
+            i = j
+            continue
+        if js.startswith("//", i):
+            j = js.find("\n", i)
+            i = len(js) if j < 0 else j
+            continue
+        if js.startswith("/*", i):
+            j = js.find("*/", i + 2)
+            j = len(js) if j < 0 else j + 2
+            gap = "\n" if "\n" in js[i:j] or gap == "\n" else (gap or " ")
+            i = j
+            continue
+
+        if c in "'\"`":
+            j = js_string_end(js, i)
+        elif c == "/" and regex_allowed(tokens) and js_regex_end(js, i):
+            j = js_regex_end(js, i)
+        elif JS_IDENT.match(c):
+            j = JS_WORD.match(js, i).end()
+        else:
+            j = i + 1
+        token = js[i:j]
+
+        if gap and tokens:
+            prev = tokens[-1][-1]
+            if gap == "\n" and prev not in "{;,(" and token[0] not in "})":
+                tokens.append("\n")
+            elif JS_IDENT.match(prev) and JS_IDENT.match(token[0]):
+                tokens.append(" ")
+            elif prev in "+-" and token[0] in "+-":
+                tokens.append(" ")
+            elif prev == "/" and token[0] == "/":
+                tokens.append(" ")
+            elif tokens[-1].isdigit() and token[0] == ".":
+                tokens.append(" ")  # "1 .toString()" is not "1.toString()"
+        gap = ""
+        tokens.append(token)
+        i = j
+
+    return "".join(tokens)
+
+
+def minify_json(text):
+    try:
+        return json.dumps(json.loads(text), separators=(",", ":"), ensure_ascii=False)
+    except ValueError:
+        return text.strip()
+
+
+def minify_html(page):
+    """Collapse whitespace and drop comments; script, style, pre and textarea are handled separately."""
+    out = []
+    pos = 0
+
+    def squeeze(text):
+        return re.sub(r"\s+", lambda m: "\n" if "\n" in m.group(0) else " ", text)
+
+    for match in RAW_BLOCK.finditer(page):
+        out.append(squeeze(page[pos:match.start()]))
+        pos = match.end()
+
+        if match.group(6) is not None:
+            # Conditional comments still mean something to old IE
+            if match.group(6).startswith("[if"):
+                out.append(match.group(0))
+            continue
+
+        open_tag, name, attrs, body, close_tag = match.group(1, 2, 3, 4, 5)
+        name = name.lower()
+        type_match = TYPE_ATTR.search(attrs)
+        kind = type_match.group(1).lower() if type_match else ""
+
+        if name == "style":
+            body = minify_css(body)
+        elif name == "script" and kind in JS_TYPES:
+            body = minify_js(body)
+        elif name == "script" and kind.endswith("json"):
+            body = minify_json(body)
+        out.append(squeeze(open_tag) + body + close_tag)
+
+    out.append(squeeze(page[pos:]))
+    return "".join(out).strip() + "\n"
+
+
+# ============ SHARED CSS ============
+
+def rebase_css_urls(css, site_path):
+    """`css` with relative url()s and @imports made site-absolute, as resolved from the page at site_path.
+
+    Moving a <style> block into /_css/ changes the base its relative URLs
+    resolve against; site-absolute URLs mean the same from anywhere.
+    """
+    def rebase(url):
+        if not url or url.startswith(("/", "#", "data:")) or urlsplit(url).scheme:
+            return url
+        return urljoin(site_path, url)
+
+    def replace(match):
+        if match.group(4) is None:
+            return f"url({match.group(1)}{rebase(match.group(2))}{match.group(1)})"
+        return f"@import {match.group(3)}{rebase(match.group(4))}{match.group(3)}"
+
+    return CSS_URL.sub(replace, css)
+
+
+def shareable_blocks(path, page):
+    """(match, body) for every plain <style> block of a page, with its URLs rebased."""
+    site_path = "/" + path.replace(os.sep, "/")
+    for match in STYLE_BLOCK.finditer(page):
+        if match.group(1).strip() and not CSS_TYPE_ONLY.fullmatch(match.group(1).strip()):
+            continue  # media or other attributes; leave it inline
+        yield match, rebase_css_urls(match.group(2).strip(), site_path)
+
+
+def shared_styles(pages):
+    """<style> blocks that appear in more than one page, as {rebased body: site path of the CSS file}.
+
+    Blocks count as the same when they are once their URLs are rebased, so a
+    block whose relative URLs point at different files from different
+    directories is not shared.
+    """
+    used_by = {}
+    for path, page in pages.items():
+        for _, body in shareable_blocks(path, page):
+            if len(body) >= SHARED_CSS_MIN_BYTES:
+                used_by.setdefault(body, set()).add(path)
+
+    shared = {}
+    for body, paths in used_by.items():
+        if len(paths) > 1:
+            digest = hashlib.sha256(minify_css(body).encode()).hexdigest()[:12]
+            shared[body] = f"/{CSS_DIR}/{digest}.css"
+    return shared
+
+
+def link_shared_styles(path, page, shared):
+    """`page` with its shared <style> blocks replaced by links to their CSS files."""
+    out = []
+    pos = 0
+    for match, body in shareable_blocks(path, page):
+        href = shared.get(body)
+        if href:
+            out.append(page[pos:match.start()])
+            out.append(f'<link rel="stylesheet" href="{href}">')
+            pos = match.end()
+    out.append(page[pos:])
+    return "".join(out)
+
+
+# ============ OUTPUT ============
+
+def write_file(path, data):
+    if os.path.lexists(path):
+        os.remove(path)  # may be a hard link into the repo
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def transfer_size(data):
+    """Bytes sent for a text file, which GitHub Pages serves gzipped."""
+    return min(len(data), len(gzip.compress(data, mtime=0)))
+
+
+def read_manifest(path):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return manifest["files"] if manifest.get("version") == PUBLISH_VERSION else {}
+
+
+def write_manifest(path, files):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": PUBLISH_VERSION, "files": files}, f, indent=1, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def code_hash():
+    """Hash of the publishing code; a change to it rebuilds everything."""
+    digest = hashlib.sha256()
+    for module in (__file__, build_images.__file__):
+        with open(module, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish the site to build/site.")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--no-images", action="store_true", help="skip responsive image variants")
+    parser.add_argument("--force", action="store_true", help="rebuild every page, ignoring the manifest")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="image encoding threads")
+    args = parser.parse_args(argv)
+
+    base = site_url()
+    files = list(iter_site_files())
+    pages = {}
+    for path in files:
+        if path.endswith(".html"):
+            with open(os.path.join(REPO_ROOT, path), encoding="utf-8", errors="replace") as f:
+                pages[path] = f.read()
+
+    # Single-hop redirect pages, replacing chained stubs or added for rules
+    redirects, issues = Compiler().stub_pages()
+    for issue in issues:
+        print(f"warning: {issue.source}: {issue.message}", file=sys.stderr)
+    for path, page in redirects.items():
+        if path not in pages:
+            files.append(path)
+        pages[path] = page
+
+    # Stage 1: image variants for every page at once
+    images = {}
+    if not args.no_images:
+        for path, page in pages.items():
+            for _, _, image in image_refs(page, "/" + path.replace(os.sep, "/"), base):
+                images.setdefault(image, []).append(path)
+        images, _ = build_variants(images, out_dir=args.out_dir, jobs=args.jobs)
+
+    # Stage 2: shared stylesheets
+    shared = shared_styles(pages)
+    for body, href in shared.items():
+        css = minify_css(body).encode()
+        out_path = os.path.join(args.out_dir, href.lstrip("/"))
+        if not os.path.exists(out_path):
+            write_file(out_path, css)
+
+    manifest_path = os.path.join(args.out_dir, MANIFEST_NAME)
+    manifest = {} if args.force else read_manifest(manifest_path)
+    code = code_hash()
+    built = skipped = 0
+    before = after = 0
+
+    for path in files:
+        src = os.path.join(REPO_ROOT, path)
+        dst = os.path.join(args.out_dir, path)
+        if not path.endswith(TEXT_EXTS):
+            mirror_file(src, dst)
+            continue
+
+        if path in pages:
+            page = pages[path]
+            if images:
+                page = rewrite_page(page, "/" + path.replace(os.sep, "/"), images, base)
+            data = link_shared_styles(path, page, shared).encode()
+        else:
+            with open(src, "rb") as f:
+                data = f.read()
+
+        key = hashlib.sha256(code.encode() + data).hexdigest()
+        if manifest.get(path, {}).get("key") == key and os.path.exists(dst):
+            skipped += 1
+            continue
+
+        if path in redirects and not os.path.exists(src):
+            source = redirects[path].encode()
+        else:
+            with open(src, "rb") as f:
+                source = f.read()
+
+        if path in pages:
+            data = minify_html(data.decode()).encode()
+        elif path.endswith(".css"):
+            data = minify_css(data.decode()).encode()
+        elif path.endswith((".js", ".mjs")):
+            data = minify_js(data.decode()).encode()
+
+        write_file(dst, data)
+        sent = transfer_size(data)
+        manifest[path] = {"key": key, "bytes": len(source), "minified": len(data), "transfer": sent}
+        built += 1
+        before += transfer_size(source)
+        after += sent
+
+    write_manifest(manifest_path, manifest)
+    print(f"{built} files published, {skipped} unchanged, {len(shared)} shared stylesheets, "
+          f"{len(redirects)} redirect pages -> {args.out_dir}")
+    if built:
+        print(f"{before / 1024:.0f} KB -> {after / 1024:.0f} KB transferred ({100 - after * 100 / before:.0f}% smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Vector QR codes (SVG or PDF) for payment, ticket and registration links.
+
+Codes are drawn as a single path of filled module runs, so they stay sharp
+at any print size and take a few KB. qrcode is only used to compute the
+module matrix. Every code is memoised on disk by URL, format and style,
+so rebuilding a flyer or re-running the batch only does new work for new
+links.
+
+Usage:
+  python scripts/qr_codes.py https://pay.zaprite.com/pl_XsT26aenI2
+  python scripts/qr_codes.py --all                  # every redirect target in the repo
+  python scripts/qr_codes.py --all --format pdf --fill "#031169" --out-dir build/qr
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import re
+import sys
+from collections import namedtuple
+
+import qrcode
+
+from redirect_stubs import REPO_ROOT, absolute_url, find_stubs, read_rules, site_url
+
+CACHE_DIR = os.path.join(REPO_ROOT, ".cache", "qr")
+OUT_DIR = os.path.join(REPO_ROOT, "build", "qr")
+FORMATS = ("svg", "pdf")
+
+# Bump when the drawing code changes so stale cache entries are ignored
+CACHE_VERSION = 1
+
+# Default printed size for PDF output, in points (1.5in, as on the flyers)
+PDF_SIZE_PT = 108
+
+ERROR_LEVELS = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+Style = namedtuple("Style", ["fill", "background", "error", "border"])
+DEFAULT_STYLE = Style(fill="#000000", background="#FFFFFF", error="M", border=4)
+
+
+def matrix(url, style=DEFAULT_STYLE):
+    """QR module matrix for `url`, including the quiet-zone border."""
+    qr = qrcode.QRCode(error_correction=ERROR_LEVELS[style.error], border=style.border)
+    qr.add_data(url)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def dark_runs(modules):
+    """Yield (x, y, length) for each horizontal run of dark modules."""
+    for y, row in enumerate(modules):
+        x = 0
+        while x < len(row):
+            if row[x]:
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                yield start, y, x - start
+            else:
+                x += 1
+
+
+def to_svg(modules, style):
+    size = len(modules)
+    path = "".join(f"M{x} {y}h{n}v1h-{n}z" for x, y, n in dark_runs(modules))
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="{style.background}"/>'
+        f'<path fill="{style.fill}" d="{path}"/></svg>\n'
+    ).encode()
+
+
+def pdf_rgb(color):
+    """"#RRGGBB" as a PDF colour operand string."""
+    r, g, b = (int(color.lstrip("#")[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    return f"{r:.3f} {g:.3f} {b:.3f}"
+
+
+def to_pdf(modules, style, size_pt=PDF_SIZE_PT):
+    """A one-page vector PDF exactly `size_pt` square."""
+    n = len(modules)
+    scale = size_pt / n
+
+    ops = [f"{pdf_rgb(style.background)} rg 0 0 {size_pt} {size_pt} re f", f"{pdf_rgb(style.fill)} rg"]
+    ops += [f"{x * scale:.3f} {(n - y - 1) * scale:.3f} {length * scale:.3f} {scale:.3f} re" for x, y, length in dark_runs(modules)]
+    ops.append("f")
+    content = "\n".join(ops).encode()
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {size_pt} {size_pt}] /Contents 4 0 R /Resources << >> >>".encode(),
+        b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def cache_path(url, fmt, style, cache_dir):
+    key = hashlib.sha256(f"{CACHE_VERSION}|{fmt}|{tuple(style)}|{url}".encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.{fmt}")
+
+
+def qr_code(url, fmt="svg", style=DEFAULT_STYLE, cache_dir=CACHE_DIR):
+    """Return the QR code for `url` as SVG or PDF bytes, memoised on disk when cache_dir is set.
+
+    Returns (data, cached) where cached says whether the code came from disk.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {FORMATS}")
+
+    path = cache_path(url, fmt, style, cache_dir) if cache_dir else None
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read(), True
+
+    modules = matrix(url, style)
+    data = to_svg(modules, style) if fmt == "svg" else to_pdf(modules, style)
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    return data, False
+
+
+def qr_data_uri(url, style=DEFAULT_STYLE, cache_dir=CACHE_DIR):
+    """SVG QR code for `url` as a data URI, for inlining into HTML."""
+    data, _ = qr_code(url, "svg", style, cache_dir)
+    return "data:image/svg+xml;base64," + base64.b64encode(data).decode()
+
+
+def slug(site_path):
+    """File name for a redirect: "/tems25/agenda.html" -> "tems25-agenda"."""
+    name = re.sub(r"\.html$", "", site_path.strip("/"))
+    name = re.sub(r"/index$", "", name)
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", name) or "index"
+
+
+def redirect_targets(root=REPO_ROOT):
+    """(name, url) for every redirect in the repo: stub pages, then external _redirects rules.
+
+    Rules that point at another page on the site are aliases of a stub and
+    are skipped.
+    """
+    base = site_url(root)
+    targets = [(slug(stub.site_path), absolute_url(stub.target, base)) for stub in find_stubs(root)]
+    names = {name for name, _ in targets}
+
+    for rule in read_rules(root):
+        name = slug(rule.source)
+        if rule.target.startswith(("http://", "https://")) and name not in names:
+            targets.append((name, rule.target))
+            names.add(name)
+
+    return targets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate vector QR codes.")
+    parser.add_argument("urls", nargs="*", help="URLs to encode")
+    parser.add_argument("--all", action="store_true", help="encode every redirect target in the repo")
+    parser.add_argument("--format", choices=FORMATS, default="svg")
+    parser.add_argument("--fill", default=DEFAULT_STYLE.fill, help="module colour (#RRGGBB)")
+    parser.add_argument("--background", default=DEFAULT_STYLE.background, help="background colour (#RRGGBB)")
+    parser.add_argument("--error", choices=ERROR_LEVELS, default=DEFAULT_STYLE.error, help="error correction level")
+    parser.add_argument("--border", type=int, default=DEFAULT_STYLE.border, help="quiet zone in modules")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="ignore and don't update the on-disk cache")
+    args = parser.parse_args(argv)
+
+    if not args.urls and not args.all:
+        parser.error("give URLs or --all")
+
+    style = Style(args.fill, args.background, args.error, args.border)
+    cache_dir = None if args.no_cache else CACHE_DIR
+
+    targets = [(slug(re.sub(r"^\w+://", "", url)), url) for url in args.urls]
+    if args.all:
+        targets += redirect_targets()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    generated = 0
+
+    for name, url in targets:
+        data, cached = qr_code(url, args.format, style, cache_dir)
+        generated += not cached
+        out_path = os.path.join(args.out_dir, f"{name}.{args.format}")
+        with open(out_path, "wb") as f:
+            f.write(data)
+        print(f"{out_path}\t{url}")
+
+    unique = len({url for _, url in targets})
+    print(f"{len(targets)} QR codes ({unique} unique URLs, {generated} generated, {len(targets) - generated} cached)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
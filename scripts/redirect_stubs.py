@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Discover the site's redirects: meta-refresh stub pages and _redirects rules.
+
+Many short links (ark.html, pay.html, tems26ticket.html, ...) are tiny HTML
+pages whose only job is a <meta http-equiv="refresh"> to a Zaprite, ticket
+or form URL. Others are rules in the _redirects file. This module finds both
+so other scripts can act on every redirect target in one pass.
+
+Usage:
+  python scripts/redirect_stubs.py          # list stubs and rules as TSV
+"""
+
+import html
+import os
+import re
+import sys
+from collections import namedtuple
+from urllib.parse import urljoin
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Directories that are not part of the published site
+SKIP_DIRS = {".git", ".github", "_dashboard", "node_modules", "build", "scripts"}
+
+# A stub page: `path` is relative to the repo root, `target` is absolute or site-relative
+Stub = namedtuple("Stub", ["path", "site_path", "target", "delay"])
+
+# A _redirects rule: "/from /to 301", or "/from /to 302!" to apply even where a file exists (`force`)
+Rule = namedtuple("Rule", ["line", "source", "target", "status", "force"], defaults=(False,))
+
+META_TAG = re.compile(r"<meta\b[^>]*>", re.IGNORECASE)
+HTTP_EQUIV_REFRESH = re.compile(r"""http-equiv\s*=\s*["']?refresh""", re.IGNORECASE)
+CONTENT_ATTR = re.compile(r"""content\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+REFRESH_CONTENT = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:[;,]\s*(?:url\s*=\s*)?['\"]?([^'\"]*)['\"]?)?\s*$", re.IGNORECASE)
+COMMENT = re.compile(r"(?:^|\s)#")
+STATUS = re.compile(r"^(\d{3})(!?)$")
+ATTR = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""")
+
+
+def site_url(root=REPO_ROOT):
+    """Public base URL of the site, from the CNAME file."""
+    with open(os.path.join(root, "CNAME")) as f:
+        return "https://" + f.read().strip() + "/"
+
+
+def parse_attrs(tag):
+    """Attributes of a start tag such as <img ...>, in order, as a dict (values unescaped)."""
+    body = re.sub(r"^<[\w-]+|/?>$", "", tag)
+    attrs = {}
+    for match in ATTR.finditer(body):
+        value = next((v for v in match.groups()[1:] if v is not None), "")
+        attrs[match.group(1).lower()] = html.unescape(value)
+    return attrs
+
+
+def parse_refresh(page):
+    """Return (delay, url) from a page's meta refresh tag, or None."""
+    for tag in META_TAG.findall(page):
+        if not HTTP_EQUIV_REFRESH.search(tag):
+            continue
+        content = CONTENT_ATTR.search(tag)
+        if not content:
+            continue
+        match = REFRESH_CONTENT.match(html.unescape(content.group(1) or content.group(2)))
+        if match and match.group(2):
+            return float(match.group(1)), match.group(2).strip()
+    return None
+
+
+def iter_html_files(root=REPO_ROOT):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+        for name in sorted(filenames):
+            if name.endswith(".html"):
+                yield os.path.relpath(os.path.join(dirpath, name), root)
+
+
+def find_stubs(root=REPO_ROOT):
+    """Every page with a meta refresh, with its target resolved against the page's location."""
+    stubs = []
+
+    for path in iter_html_files(root):
+        with open(os.path.join(root, path), encoding="utf-8", errors="replace") as f:
+            refresh = parse_refresh(f.read())
+        if not refresh:
+            continue
+
+        delay, url = refresh
+        site_path = "/" + path.replace(os.sep, "/")
+        stubs.append(Stub(path, site_path, urljoin(site_path, url), delay))
+
+    return stubs
+
+
+def read_rules(root=REPO_ROOT):
+    """Rules from the _redirects file, skipping comments and blank lines."""
+    rules = []
+
+    with open(os.path.join(root, "_redirects")) as f:
+        for line_no, line in enumerate(f, 1):
+            # A comment starts at a "#" that begins a token; "#" inside a URL is a fragment
+            fields = COMMENT.split(line, 1)[0].split()
+            if len(fields) < 2:
+                continue
+            status = STATUS.match(fields[2]) if len(fields) > 2 else None
+            if status:
+                rules.append(Rule(line_no, fields[0], fields[1], int(status.group(1)), bool(status.group(2))))
+            else:
+                rules.append(Rule(line_no, fields[0], fields[1], 301))
+
+    return rules
+
+
+def absolute_url(target, base):
+    """Absolute URL for a stub or rule target (site-relative targets use `base`)."""
+    return urljoin(base, target)
+
+
+def main():
+    for stub in find_stubs():
+        print(f"stub\t{stub.site_path}\t{stub.target}")
+    for rule in read_rules():
+        print(f"rule\t{rule.source}\t{rule.target}\t{rule.status}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Single-hop stub pages for GitHub Pages, built from stubs and _redirects rules.
+
+Run from scripts/: python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compile_redirects import Compiler
+from redirect_stubs import parse_refresh
+
+REDIRECTS = """\
+/short /chained.html 301
+/section /section/other.html 301
+/IF https://example.org/if 302
+/doc.pdf https://example.org/doc.pdf 301
+"""
+
+
+def stub(url):
+    return f'<html><head><meta http-equiv="refresh" content="0; url={url}"></head></html>'
+
+
+class StubPagesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        files = {
+            "CNAME": "example.com\n",
+            "_redirects": REDIRECTS,
+            "chained.html": stub("/final.html"),
+            "final.html": stub("https://example.org/final"),
+            "direct.html": stub("https://example.org/direct"),
+            "via-section.html": stub("/section"),
+            "if.html": stub("https://example.org/if"),
+            os.path.join("section", "index.html"): "<html><body>real page</body></html>",
+        }
+        for path, text in files.items():
+            os.makedirs(os.path.dirname(os.path.join(self.root, path)), exist_ok=True)
+            with open(os.path.join(self.root, path), "w") as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def targets(self):
+        pages, issues = Compiler(self.root).stub_pages()
+        return {path: parse_refresh(page)[1] for path, page in pages.items()}, issues
+
+    def test_chained_stub_points_at_final_url(self):
+        targets, _ = self.targets()
+        self.assertEqual(targets["chained.html"], "https://example.org/final")
+        self.assertNotIn("final.html", targets)
+        self.assertNotIn("direct.html", targets)
+
+    def test_rule_without_a_page_gets_a_stub(self):
+        targets, _ = self.targets()
+        self.assertEqual(targets["short.html"], "https://example.org/final")
+
+    def test_real_page_beats_an_unforced_rule(self):
+        targets, _ = self.targets()
+        self.assertNotIn("section.html", targets)
+        self.assertNotIn("via-section.html", targets)
+
+    def test_paths_no_stub_can_serve_are_reported(self):
+        targets, issues = self.targets()
+        self.assertNotIn("IF.html", targets)
+        self.assertEqual(sorted(issue.source for issue in issues), ["/IF", "/doc.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
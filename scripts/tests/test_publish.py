@@ -0,0 +1,111 @@
+"""JS minification and shared stylesheet extraction in publish.py.
+
+Run from scripts/: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from publish import SHARED_CSS_MIN_BYTES, link_shared_styles, minify_js, rebase_css_urls, shared_styles
+
+
+class MinifyJsRegexTest(unittest.TestCase):
+    def test_division(self):
+        self.assertEqual(minify_js("var a = b / c / d;"), "var a=b/c/d;")
+        self.assertEqual(minify_js("x = f(y) / 2 / 3"), "x=f(y)/2/3")
+        self.assertEqual(minify_js("x = a[1] / 2 / 3"), "x=a[1]/2/3")
+        self.assertEqual(minify_js("x = i++ / 2 / 3"), "x=i++/2/3")
+
+    def test_regex_literals_kept_verbatim(self):
+        self.assertEqual(minify_js("var r = /a b+c/gi.test(s);"), "var r=/a b+c/gi.test(s);")
+        self.assertEqual(minify_js("y = s.replace(/[/ ]/g, '-')"), "y=s.replace(/[/ ]/g,'-')")
+        self.assertEqual(minify_js("x = a ? /\\/ x/ : b"), "x=a?/\\/ x/:b")
+
+    def test_regex_after_keyword(self):
+        self.assertEqual(minify_js("return /x y/.test(a)"), "return/x y/.test(a)")
+        self.assertEqual(minify_js("if (typeof /a/ === 'object') {}"), "if(typeof/a/==='object'){}")
+
+    def test_comment_markers_inside_regex_and_strings(self):
+        self.assertEqual(minify_js("u = /https?:\\/\\//; v = 'a // b'"), "u=/https?:\\/\\//;v='a // b'")
+
+
+class MinifyJsNewlineTest(unittest.TestCase):
+    def test_line_breaks_kept_where_asi_depends_on_them(self):
+        self.assertEqual(minify_js("a = b\n++c"), "a=b\n++c")
+        self.assertEqual(minify_js("return\nvalue"), "return\nvalue")
+        self.assertEqual(minify_js("let x = 1\n[1, 2].forEach(f)"), "let x=1\n[1,2].forEach(f)")
+        self.assertEqual(minify_js("a = b\n(c)"), "a=b\n(c)")
+
+    def test_line_breaks_dropped_where_safe(self):
+        self.assertEqual(minify_js("f(a,\n  b);\nif (x) {\n  y();\n}\n"), "f(a,b);if(x){y();}")
+
+    def test_comments_spanning_lines_still_separate(self):
+        self.assertEqual(minify_js("a = b /* note\n */ c()"), "a=b\nc()")
+        self.assertEqual(minify_js("x = y // trailing\nz()"), "x=y\nz()")
+
+    def test_spaces_that_change_tokens(self):
+        self.assertEqual(minify_js("a = b + +c - -d"), "a=b+ +c- -d")
+        self.assertEqual(minify_js("n = 1 .toString()"), "n=1 .toString()")
+        self.assertEqual(minify_js("var x = typeof y"), "var x=typeof y")
+
+
+class MinifyJsTemplateTest(unittest.TestCase):
+    def test_template_literals_kept_verbatim(self):
+        js = "s = `a  ${ b } //not a comment\n  /* nor this */`"
+        self.assertEqual(minify_js(js), js.replace(" = ", "="))
+
+    def test_nested_templates_and_braces(self):
+        js = "s = `x ${ `in ${ {k: 1}.k }` } y`; t = 1"
+        self.assertEqual(minify_js(js), "s=`x ${ `in ${ {k: 1}.k }` } y`;t=1")
+
+    def test_code_after_template(self):
+        self.assertEqual(minify_js("a(`}`)  ;  b = c / d"), "a(`}`);b=c/d")
+
+
+def style_page(css):
+    return f"<html><head><style>{css}</style></head><body></body></html>"
+
+
+class SharedStylesTest(unittest.TestCase):
+    PADDING = "p{margin:0}" * (SHARED_CSS_MIN_BYTES // 10)
+
+    def test_relative_urls_are_rebased(self):
+        css = self.PADDING + ".hero{background:url(../img/bg.png)}"
+        pages = {os.path.join("a", "one.html"): style_page(css), os.path.join("b", "two.html"): style_page(css)}
+
+        shared = shared_styles(pages)
+
+        self.assertEqual(len(shared), 1)
+        (body,) = shared
+        self.assertIn("url(/img/bg.png)", body)
+        for path, page in pages.items():
+            self.assertNotIn("<style>", link_shared_styles(path, page, shared))
+
+    def test_same_text_resolving_to_different_files_is_not_shared(self):
+        css = self.PADDING + ".hero{background:url(bg.png)}"
+        pages = {os.path.join("a", "one.html"): style_page(css), os.path.join("b", "two.html"): style_page(css)}
+
+        shared = shared_styles(pages)
+
+        self.assertEqual(shared, {})
+        for path, page in pages.items():
+            self.assertEqual(link_shared_styles(path, page, shared), page)
+
+    def test_small_blocks_stay_inline(self):
+        pages = {"one.html": style_page("p{margin:0}"), "two.html": style_page("p{margin:0}")}
+        self.assertEqual(shared_styles(pages), {})
+
+    def test_rebase_leaves_absolute_urls(self):
+        css = 'a{b:url(/x.png)}c{d:url("https://e/f.png")}g{h:url(data:image/png;base64,AA==)}i{j:url(#k)}'
+        self.assertEqual(rebase_css_urls(css, "/dir/page.html"), css)
+
+    def test_rebase_imports_and_quoted_urls(self):
+        css = "@import 'base.css'; a{b:url(\"../up.png\")}"
+        self.assertEqual(rebase_css_urls(css, "/dir/page.html"), "@import '/dir/base.css'; a{b:url(\"/up.png\")}")
+
+
+if __name__ == "__main__":
+    unittest.main()